@@ -1,12 +1,41 @@
+import io
 import os
+import math
+import uuid
+import cProfile
+import pstats
+import time
+from collections import OrderedDict
 import h5py
 import numpy as np
 import json
 import requests
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from werkzeug.utils import secure_filename
 from flask_cors import CORS
 from dotenv import load_dotenv
+from utils.budget_serializer import (budget_summary, encoded_size, iter_summary_json, iter_summary_ndjson,
+                                     tokens_to_bytes)
+from utils.chunked_upload import ChunkedUploadManager, UploadError
+from utils.http_encoding import (COMPRESSIBLE_MIMETYPES, MIN_COMPRESS_BYTES, compress, compress_stream,
+                                 negotiate_encoding)
+from utils.explainers import DEFAULT_GRID, DEFAULT_NUM_SAMPLES, array_hash, canonical_params, explain
+from utils.jobs import JobManager, TERMINAL_STATES
+from utils.keras_h5 import extract_keras_summary
+from utils.llm_analysis import AnalysisService, ProviderError, provider_from_env
+from utils.metrics import (REGISTRY, H5_BYTES_READ, H5_OBJECTS_VISITED, H5_OPEN_SECONDS, H5_WALK_SECONDS,
+                           HTTP_REQUEST_SECONDS, UPLOAD_BYTES, UPLOAD_THROUGHPUT)
+from utils.model_cost import (COST_MODEL_VERSION, DEFAULT_DTYPE, DTYPE_BYTES, CostError, estimate_cost,
+                              input_shapes_key, parse_input_shapes, profile_model, rank_costs)
+from utils.model_diff import diff_models
+from utils.model_formats import MODEL_FORMATS, SIGNATURE_BYTES, SUMMARIZERS, model_format, sniff_format
+from utils.model_registry import ModelRegistry
+from utils.numpy_runtime import DEFAULT_BATCH_SIZE, ModelPool, UnsupportedModelError
+from utils.summary_cache import SummaryCache, file_fingerprint, hash_file
+from utils.tile_pyramid import (TileError, build_pyramid, load_pyramid_meta, matrix_shape,
+                                parse_span, pyramid_dir, read_matrix_slice, read_tile)
+from utils.weight_stats import (DEFAULT_HISTOGRAM_BINS, TENSOR_FORMATS, compute_weight_stats, list_model_tensors,
+                                open_weight_tensor)
 
 # Load environment variables
 load_dotenv()
@@ -15,17 +44,77 @@ app = Flask(__name__)
 
 MAX_FILE_SIZE_MB = 100  # Maximum file size in MB
 MAX_COMPLETION_TOKENS = 32768  # Maximum completion tokens
+UPLOAD_RESPONSE_MAX_BYTES = 6000  # Budget for the summary echoed back after an upload
+SUMMARY_CACHE_MAX_ENTRIES = 256  # Parsed summaries kept in memory
+SUMMARY_CACHE_MAX_MB = 64  # Memory budget for cached summaries
+SUMMARY_FORMAT_VERSION = 3  # Bump when extract_model_summary's output changes
+MAX_HISTOGRAM_BINS = 256  # Upper bound for weight-statistics histograms
+MAX_PAGE_SIZE = 100  # Largest page served by the model listing
+MAX_PREDICT_BATCH_SIZE = 256  # Largest batch the inference runtime will run at once
+LOADED_MODEL_POOL_SIZE = 4  # Models kept in memory for inference
+MAX_PARSE_WORKERS = int(os.getenv('MAX_PARSE_WORKERS', '0')) or None  # Defaults to cores - 1
+PROFILES_KEPT = 32  # Recent per-request profiles available under /metrics/profiles
+PROFILE_TOP_FUNCTIONS = 40  # Rows in a profile breakdown
+ANALYSIS_SUMMARY_MAX_BYTES = 6000  # Budget for the summary embedded in an analysis prompt
+ANALYSIS_MAX_TOKENS = 1024  # Completion tokens requested per analysis
+MAX_CONCURRENT_ANALYSES = int(os.getenv('MAX_CONCURRENT_ANALYSES', '2'))  # Upstream LLM calls in flight
+ANALYSIS_KEEPALIVE_SECONDS = 15  # SSE comment sent while waiting on the provider
+MAX_COST_BATCH_SIZE = 65536  # Largest batch size cost estimates are scaled to
 
 
-UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
+UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER') or os.path.join(os.path.dirname(__file__), 'uploads')
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 
+CACHE_FOLDER = os.getenv('CACHE_FOLDER') or os.path.join(os.path.dirname(__file__), 'cache')
+TILE_FOLDER = os.path.join(CACHE_FOLDER, 'tiles')  # Memory-mapped weight heatmap pyramids
+
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['ALLOWED_EXTENSIONS'] = {'h5'}
+app.config['ALLOWED_EXTENSIONS'] = set(MODEL_FORMATS)
+# Reject oversized bodies before they are read (small allowance for multipart framing)
+app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE_MB * 1024 * 1024 + 64 * 1024
 
 CORS(app)
 
+# Parsed summaries keyed on file identity, so polling clients don't re-walk the H5 file
+summary_cache = SummaryCache(
+    os.path.join(CACHE_FOLDER, 'summaries'),
+    max_entries=SUMMARY_CACHE_MAX_ENTRIES,
+    max_bytes=SUMMARY_CACHE_MAX_MB * 1024 * 1024,
+    version=SUMMARY_FORMAT_VERSION
+)
+
+# Weight statistics are expensive (two streaming passes), so they get their own cache
+weight_stats_cache = SummaryCache(
+    os.path.join(CACHE_FOLDER, 'weight_stats'),
+    max_entries=SUMMARY_CACHE_MAX_ENTRIES,
+    max_bytes=SUMMARY_CACHE_MAX_MB * 1024 * 1024
+)
+
+# Bounded process pool for parsing uploads off the request threads
+job_manager = JobManager(max_workers=MAX_PARSE_WORKERS)
+
+# Indexed registry of uploaded models; replaces scanning the uploads folder
+registry = ModelRegistry(os.path.join(UPLOAD_FOLDER, 'registry.sqlite3'))
+
+# Resumable chunked uploads staged next to the cache
+chunked_uploads = ChunkedUploadManager(
+    os.path.join(CACHE_FOLDER, 'partial_uploads'),
+    max_bytes=MAX_FILE_SIZE_MB * 1024 * 1024
+)
+
+# Built inference graphs, so repeated predictions skip config parsing and weight loads
+model_pool = ModelPool(max_models=LOADED_MODEL_POOL_SIZE)
+
+# LLM analyses: cached in the registry, one upstream call per distinct prompt
+analysis_service = AnalysisService(
+    provider_from_env(),
+    load=registry.get_analysis,
+    store=registry.put_analysis,
+    max_concurrent=MAX_CONCURRENT_ANALYSES,
+    max_tokens=min(ANALYSIS_MAX_TOKENS, MAX_COMPLETION_TOKENS)
+)
+
 def check_file_size(file_path):
     """
     Check if file size is within the allowed limit
@@ -35,121 +124,45 @@ def check_file_size(file_path):
         raise ValueError(f"File size exceeds maximum limit of {MAX_FILE_SIZE_MB} MB")
 
 
-def truncate_payload(data, max_tokens=6000):
-    """
-    Aggressively truncate the payload to fit within token limits
-    """
-    while True:
-        # Convert to JSON
-        payload = json.dumps(data)
-        
-        # Check if payload exceeds limit
-        if len(payload.encode('utf-8')) <= max_tokens:
-            return data
-        
-        # Aggressive reduction strategies
-        if isinstance(data, dict):
-            # Remove least important keys first
-            keys_to_remove = [
-                'weights', 
-                'layers', 
-                'details', 
-                'json_path'
-            ]
-            for key in keys_to_remove:
-                if key in data:
-                    del data[key]
-        
-        # If still too large, further reduce
-        if isinstance(data, dict) and 'model_info' in data:
-            data['model_info'] = {
-                'model_name': data['model_info'].get('model_name', 'Unknown'),
-                'total_layers': data['model_info'].get('total_layers', 0),
-                'total_parameters': data['model_info'].get('total_parameters', 0)
-            }
-        
-        # Last resort: return minimal information
-        if len(json.dumps(data).encode('utf-8')) > max_tokens:
-            return {
-                'error': 'Payload exceeded size limits',
-                'message': 'Unable to transmit full model details'
-            }
+def truncate_payload(data, max_bytes=6000):
+    """
+    Aggressively truncate the payload to fit within a byte budget
+    """
+    if encoded_size(data) <= max_bytes:
+        return data
+
+    # Model summaries degrade layer detail in one budgeted pass
+    if isinstance(data, dict) and 'layers' in data:
+        budgeted = budget_summary(data, max_bytes)
+        if budgeted is not None:
+            return budgeted
+
+    # Last resort: return minimal information
+    return {
+        'error': 'Payload exceeded size limits',
+        'message': 'Unable to transmit full model details'
+    }
 
-import time
-from functools import wraps
-
-def rate_limit_handler(max_retries=3, backoff_factor=2):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            retries = 0
-            while retries < max_retries:
-                try:
-                    # Truncate payload before sending
-                    if 'data' in kwargs:
-                        kwargs['data'] = truncate_payload(kwargs['data'])
-                    
-                    response = func(*args, **kwargs)
-                    return response
-                
-                except Exception as e:
-                    if "Request too large" in str(e):
-                        retries += 1
-                        wait_time = backoff_factor ** retries
-                        print(f"Rate limit hit. Retrying in {wait_time} seconds...")
-                        time.sleep(wait_time)
-                    else:
-                        raise
-            
-            raise Exception("Max retries exceeded. Unable to process request.")
-        return wrapper
-    return decorator
 
 def truncate_model_summary(model_summary, max_tokens=32768):
     """
     Intelligently truncate the model summary to fit within token limits
     """
-    # Create a copy to avoid modifying the original
-    truncated_summary = model_summary.copy()
-    
-    # First, trim excessive details from layer weights
-    for layer in truncated_summary.get('layers', []):
-        if 'weights' in layer:
-            # Limit weights to essential information
-            trimmed_weights = []
-            for weight in layer['weights']:
-                trimmed_weight = {
-                    'name': weight['name'],
-                    'shape': weight['shape'][:2],  # Keep only first two dimensions
-                    'parameters': weight['parameters']
-                }
-                trimmed_weights.append(trimmed_weight)
-            layer['weights'] = trimmed_weights[:3]  # Keep only first 3 weights
-    
-    # Limit total layers
-    truncated_summary['layers'] = truncated_summary.get('layers', [])[:50]
-    
-    # Implement a recursive truncation to ensure token limit
-    while True:
-        # Convert to JSON to check token size
-        summary_json = json.dumps(truncated_summary)
-        
-        # If within token limit, return
-        if len(summary_json.encode('utf-8')) <= max_tokens:
-            return truncated_summary
-        
-        # If still too large, further reduce details
-        if truncated_summary['layers']:
-            # Remove the last layer
-            truncated_summary['layers'].pop()
-        else:
-            # If no layers left, return a minimal summary
-            return {
-                'model_name': truncated_summary.get('model_name', 'Unknown'),
-                'total_layers': 0,
-                'total_parameters': 0,
-                'message': 'Summary truncated due to size limitations'
-            }
+    # Keep trimmed weights for up to 50 layers, then shed detail rather than layers
+    truncated_summary = budget_summary(
+        model_summary, tokens_to_bytes(max_tokens),
+        levels=(('weights', 50), ('detailed', 50), ('brief', 50), ('names', 50))
+    )
+    if truncated_summary is not None:
+        return truncated_summary
+
+    # If nothing fits, return a minimal summary
+    return {
+        'model_name': model_summary.get('model_name', 'Unknown'),
+        'total_layers': 0,
+        'total_parameters': 0,
+        'message': 'Summary truncated due to size limitations'
+    }
 
 
 def allowed_file(filename):
@@ -165,62 +178,33 @@ def intelligent_truncate_summary(model_summary, max_tokens=32768):
     2. Progressively reduce layer details
     3. Ensure critical information remains
     """
-    # Create a deep copy to avoid modifying original
     truncated = {
         'model_name': model_summary.get('model_name', 'Unknown Model'),
         'total_layers': model_summary.get('total_layers', 0),
         'total_parameters': model_summary.get('total_parameters', 0),
         'optimizer': model_summary.get('optimizer', 'Not specified'),
         'loss_function': model_summary.get('loss_function', 'Not specified'),
-        'layers': []
+        'layers': model_summary.get('layers', [])
     }
+    if 'model_class' in model_summary:
+        truncated['model_class'] = model_summary['model_class']
     
-    # Get original layers
-    original_layers = model_summary.get('layers', [])
-    
-    # Truncation phases
-    truncation_phases = [
-        # Phase 1: Keep most important layer details
-        lambda layers: [
-            {
-                'name': layer.get('name', 'Unknown Layer'),
-                'type': layer.get('type', 'Unknown'),
-                'parameters': layer.get('parameters', 0)
-            } for layer in layers[:100]  # Limit to first 100 layers
-        ],
-        
-        # Phase 2: Further reduce layer details
-        lambda layers: [
-            {
-                'name': layer.get('name', 'Unknown Layer'),
-                'parameters': layer.get('parameters', 0)
-            } for layer in layers[:50]  # Limit to first 50 layers
-        ],
-        
-        # Phase 3: Minimal layer information
-        lambda layers: [
-            {
-                'name': f"Layer {i+1}"
-            } for i in range(min(len(layers), 10))  # Limit to 10 layer names
-        ]
-    ]
-    
-    # Try each truncation phase
-    for phase in truncation_phases:
-        # Apply current phase truncation
-        truncated['layers'] = phase(original_layers)
-        
-        # Convert to JSON and check size
-        summary_json = json.dumps(truncated)
-        
-        # If within token limit, return
-        if len(summary_json.encode('utf-8')) <= max_tokens:
-            return truncated
+    # Truncation phases, richest first: (detail level, layer limit)
+    truncation_phases = (
+        ('detailed', 100),  # Phase 1: Keep most important layer details
+        ('brief', 50),      # Phase 2: Further reduce layer details
+        ('names', 10)       # Phase 3: Minimal layer information
+    )
+
+    # Pick the richest phase that fits in a single pass over the layers
+    budgeted = budget_summary(truncated, tokens_to_bytes(max_tokens), levels=truncation_phases)
+    if budgeted is not None:
+        return budgeted
     
     # Absolute minimal summary if all else fails
     return {
         'model_name': truncated['model_name'],
-        'total_layers': len(original_layers),
+        'total_layers': len(truncated['layers']),
         'total_parameters': truncated['total_parameters'],
         'truncation_note': 'Extensive truncation applied due to size constraints'
     }
@@ -229,9 +213,38 @@ def extract_model_summary(h5_file_path):
     """
     Modified extraction to handle large summaries
     """
+    file_format = model_format(h5_file_path)
+    if file_format in SUMMARIZERS:
+        # Other formats are summarized from their headers alone
+        try:
+            walk_start = time.perf_counter()
+            model_summary = SUMMARIZERS[file_format](h5_file_path)
+            H5_WALK_SECONDS.observe(time.perf_counter() - walk_start, strategy=f"{file_format}_header")
+            return intelligent_truncate_summary(model_summary)
+        except Exception as e:
+            print(f"Error in {file_format} summary extraction: {e}")
+            return {
+                'error': str(e),
+                'model_name': os.path.basename(h5_file_path),
+                'details': f"Could not read the {file_format} model"
+            }
+
     try:
-        with h5py.File(h5_file_path, 'r') as model_file:
-            # Initial model summary extraction (existing logic)
+        with H5_OPEN_SECONDS.time(operation='summary'):
+            model_file = h5py.File(h5_file_path, 'r')
+
+        with model_file:
+            # Fast path: Keras files describe their own topology, so read metadata only
+            walk_start = time.perf_counter()
+            model_summary = extract_keras_summary(model_file, os.path.basename(h5_file_path))
+            if model_summary is not None:
+                H5_WALK_SECONDS.observe(time.perf_counter() - walk_start, strategy='keras_config')
+                H5_OBJECTS_VISITED.inc(len(model_summary['layers']), kind='group')
+                H5_OBJECTS_VISITED.inc(sum(len(layer['weights']) for layer in model_summary['layers']),
+                                       kind='dataset')
+                return intelligent_truncate_summary(model_summary)
+
+            # Fallback for non-Keras files: walk every group and dataset
             model_summary = {
                 'model_name': os.path.basename(h5_file_path),
                 'total_layers': 0,
@@ -243,8 +256,11 @@ def extract_model_summary(h5_file_path):
                 'layers': []
             }
 
+            visited = {'group': 0, 'dataset': 0}
+
             # Existing exploration logic for layers and parameters
             def explore_groups(name, obj):
+                visited['group' if isinstance(obj, h5py.Group) else 'dataset'] += 1
                 if isinstance(obj, h5py.Group):
                     layer_params = 0
                     layer_details = {
@@ -260,7 +276,7 @@ def extract_model_summary(h5_file_path):
                                 weight = obj[weight_name]
                                 if isinstance(weight, h5py.Dataset):
                                     weight_shape = weight.shape
-                                    weight_params = np.prod(weight_shape)
+                                    weight_params = int(np.prod(weight_shape))
                                     layer_params += weight_params
 
                                     if 'kernel' in weight_name.lower():
@@ -274,7 +290,7 @@ def extract_model_summary(h5_file_path):
                             except Exception as weight_err:
                                 print(f"Error processing weight {weight_name}: {weight_err}")
 
-                    layer_details['parameters'] = int(layer_params)
+                    layer_details['parameters'] = layer_params
                     
                     if layer_params > 0:
                         model_summary['layers'].append(layer_details)
@@ -282,7 +298,11 @@ def extract_model_summary(h5_file_path):
                         model_summary['total_layers'] += 1
 
             # Traverse file structure
+            walk_start = time.perf_counter()
             model_file.visititems(explore_groups)
+            H5_WALK_SECONDS.observe(time.perf_counter() - walk_start, strategy='visititems')
+            for kind, count in visited.items():
+                H5_OBJECTS_VISITED.inc(count, kind=kind)
 
             # Intelligently truncate the summary
             return intelligent_truncate_summary(model_summary)
@@ -296,33 +316,774 @@ def extract_model_summary(h5_file_path):
         }
 
 
+# Recent request profiles by id, oldest first
+request_profiles = OrderedDict()
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    if request.headers.get('X-Profile'):
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+
+@app.after_request
+def record_request_metrics(response):
+    elapsed = time.perf_counter() - g.request_start
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    HTTP_REQUEST_SECONDS.observe(elapsed, method=request.method, route=route, status=response.status_code)
+
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        # Streamed bodies are produced after this point and aren't in the profile
+        profiler.disable()
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+        profile_id = uuid.uuid4().hex
+        request_profiles[profile_id] = f"{request.method} {request.full_path.rstrip('?')} -> {response.status_code}\n{report.getvalue()}"
+        while len(request_profiles) > PROFILES_KEPT:
+            request_profiles.popitem(last=False)
+        response.headers['X-Profile-Id'] = profile_id
+        response.headers['X-Profile-Url'] = f"/metrics/profiles/{profile_id}"
+        response.headers['Server-Timing'] = f"app;dur={elapsed * 1000:.3f}"
+        response.headers['Access-Control-Expose-Headers'] = ', '.join(filter(None, (
+            response.headers.get('Access-Control-Expose-Headers'), 'X-Profile-Id', 'X-Profile-Url', 'Server-Timing')))
+    return response
+
+
+@app.after_request
+def compress_response(response):
+    """
+    Compress buffered text/JSON bodies the client accepts; streamed bodies compress themselves
+    """
+    if (response.status_code != 200 or response.is_streamed or response.direct_passthrough or
+            'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES or
+            (response.content_length or 0) < MIN_COMPRESS_BYTES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+    response.set_data(compress(response.get_data(), encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Counters and histograms in the Prometheus text exposition format
+    """
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/metrics/profiles/<profile_id>', methods=['GET'])
+def get_request_profile(profile_id):
+    """
+    cProfile breakdown of a request sent with an `X-Profile: 1` header
+    """
+    report = request_profiles.get(profile_id)
+    if report is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return Response(report, mimetype='text/plain')
+
+
+def find_latest_model():
+    """
+    Return the path of the most recently uploaded model, or None
+    """
+    record = registry.latest()
+    return record['path'] if record is not None else None
+
+
+def get_summary(file_path):
+    """
+    Cached summary for a stored model, recording it in the registry on first parse
+    """
+    entry = summary_cache.get_entry(file_path)
+    if entry is not None:
+        return entry['value']
+
+    model_summary = summary_cache.get_or_compute(file_path, extract_model_summary)
+    record = registry.get_by_path(file_path)
+    if record is not None and not record['has_summary'] and 'error' not in model_summary:
+        registry.set_summary(record['id'], model_summary)
+    return model_summary
+
+
+def unique_upload_path(filename):
+    """
+    Path in the uploads folder for `filename` that doesn't clobber an earlier model
+    """
+    stem, ext = os.path.splitext(filename)
+    file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    suffix = 1
+    while os.path.exists(file_path):
+        file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{stem}_{suffix}{ext}")
+        suffix += 1
+    return file_path
+
+
+def unsupported_format_response(file_path, supported):
+    """
+    A 415 response when an endpoint can't handle the model's file format, else None
+    """
+    file_format = model_format(file_path)
+    if file_format not in supported:
+        return jsonify({'error': f"Not available for {file_format} models"}), 415
+    return None
+
+
+def no_model_response():
+    return jsonify({
+        'error': 'No H5 files found',
+        'details': 'Please upload a model file first'
+    }), 404
+
+
+def representation_etag(content_hash, *variant):
+    """
+    Strong ETag for one representation of a model's data: the content hash
+    pins the bytes of the model, `variant` whatever else shapes the body
+    """
+    return '-'.join([content_hash, f"v{SUMMARY_FORMAT_VERSION}", *(str(part) for part in variant)])
+
+
+def with_validators(response, etag):
+    response.set_etag(etag)
+    # Clients may keep a copy but must revalidate: "latest" can point at a new model
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def not_modified(etag):
+    """
+    A 304 response when the client already holds `etag`, else None
+    """
+    if request.if_none_match.contains_weak(etag):
+        return with_validators(Response(status=304), etag)
+    return None
+
+
 @app.route('/api/model-summary', methods=['GET'])
 def get_model_summary():
-    # Find the most recent H5 file in the uploads folder
-    h5_files = [
-        os.path.join(UPLOAD_FOLDER, f) 
-        for f in os.listdir(UPLOAD_FOLDER) 
-        if f.endswith('.h5')
-    ]
-
-    if not h5_files:
-        return jsonify({
-            'error': 'No H5 files found',
-            'details': 'Please upload a model file first'
-        }), 404
+    """
+    Summary of the latest model, with its registry `model_id`, as JSON, or as NDJSON
+    (header line, then one line per layer) with ?format=ndjson or Accept: application/x-ndjson.
+    ?max_bytes=N or ?max_tokens=N bound the body. Answers 304 to a matching If-None-Match without touching the summary.
+    """
+    record = registry.latest()
+    if record is None:
+        return no_model_response()
+
+    # Optional byte or token budget, applied by the same single-pass serializer as the upload response
+    max_bytes = request.args.get('max_bytes', type=int)
+    max_tokens = request.args.get('max_tokens', type=int)
+    for name, value in (('max_bytes', max_bytes), ('max_tokens', max_tokens)):
+        if value is not None and value < 1:
+            return jsonify({'error': f'{name} must be at least 1'}), 400
+    if max_tokens is not None:
+        token_bytes = tokens_to_bytes(max_tokens)
+        max_bytes = min(token_bytes, max_bytes) if max_bytes is not None else token_bytes
+    ndjson = request.args.get('format') == 'ndjson' or request.accept_mimetypes.best == 'application/x-ndjson'
+    encoding = negotiate_encoding(request.accept_encodings)
+    if max_bytes is not None and max_bytes < MIN_COMPRESS_BYTES:
+        encoding = None
+
+    # The body carries the record id, so identical content uploaded again gets a new tag
+    etag = representation_etag(record['content_hash'], record['id'], 'summary', 'ndjson' if ndjson else 'json',
+                               'full' if max_bytes is None else max_bytes, encoding or 'identity')
+    cached_response = not_modified(etag)
+    if cached_response is not None:
+        return cached_response
+
+    model_summary = get_summary(record['path'])
 
-    # Get the most recently modified H5 file
-    latest_h5_file = max(h5_files, key=os.path.getmtime)
-    
-    model_summary = extract_model_summary(latest_h5_file)
-    
     if not isinstance(model_summary, dict) or 'error' in model_summary:
         return jsonify(model_summary), 500
-    
-    return jsonify(model_summary)
+    # Lets clients ask for this exact model later (e.g. /api/analyze?model_id=)
+    model_summary = {'model_id': record['id'], **model_summary}
+
+    if ndjson:
+        chunks, mimetype = iter_summary_ndjson(model_summary, max_bytes), 'application/x-ndjson'
+    else:
+        chunks, mimetype = iter_summary_json(model_summary, max_bytes), 'application/json'
+
+    response = Response(compress_stream(chunks, encoding) if encoding else chunks, mimetype=mimetype)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return with_validators(response, etag)
+
+
+@app.route('/api/analyze', methods=['GET'])
+def analyze_model():
+    """
+    LLM analysis of a model (?model_id=, default the latest), streamed as
+    server-sent `token` events and a final `done` (or `error`) event.
+    ?format=json waits for the whole completion instead.
+    """
+    model_id = request.args.get('model_id', type=int)
+    record = registry.get(model_id) if model_id is not None else registry.latest()
+    if record is None:
+        return no_model_response() if model_id is None else (jsonify({'error': 'Model not found'}), 404)
+
+    model_summary = get_summary(record['path'])
+    if 'error' in model_summary:
+        return jsonify(model_summary), 500
+    # The prompt is built from a budgeted summary, so its size (and cost) is bounded
+    prompt_summary = truncate_payload(model_summary, ANALYSIS_SUMMARY_MAX_BYTES)
+
+    if request.args.get('format') == 'json':
+        text = []
+        try:
+            for event, data in analysis_service.analyze(prompt_summary):
+                if event == 'token':
+                    text.append(data)
+                elif event == 'done':
+                    info = data
+        except ProviderError as e:
+            return jsonify({'error': str(e)}), e.status_code
+        return jsonify({'model_id': record['id'], 'analysis': ''.join(text), **info})
+
+    def generate():
+        try:
+            for event, data in analysis_service.analyze(prompt_summary, keepalive=ANALYSIS_KEEPALIVE_SECONDS):
+                if event == 'keepalive':
+                    yield ": keep-alive\n\n"
+                elif event == 'token':
+                    yield f"event: token\ndata: {json.dumps({'text': data})}\n\n"
+                else:
+                    yield f"event: done\ndata: {json.dumps({'model_id': record['id'], **data})}\n\n"
+        except ProviderError as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e), 'status': e.status_code})}\n\n"
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
+
+@app.route('/api/weight-stats', methods=['GET'])
+def get_weight_stats():
+    """
+    Per-layer / per-tensor weight statistics for the latest model, cached per file and bin count
+    """
+    bins = request.args.get('bins', DEFAULT_HISTOGRAM_BINS, type=int)
+    if not 1 <= bins <= MAX_HISTOGRAM_BINS:
+        return jsonify({'error': f'bins must be between 1 and {MAX_HISTOGRAM_BINS}'}), 400
+
+    latest_h5_file = find_latest_model()
+    if latest_h5_file is None:
+        return no_model_response()
+    unsupported = unsupported_format_response(latest_h5_file, TENSOR_FORMATS)
+    if unsupported is not None:
+        return unsupported
+
+    cached = weight_stats_cache.get_entry(latest_h5_file)
+    stats_by_bins = dict(cached['value']) if cached is not None else {}
+
+    if str(bins) not in stats_by_bins:
+        fingerprint = file_fingerprint(latest_h5_file)
+        try:
+            stats_by_bins[str(bins)] = compute_weight_stats(
+                latest_h5_file, bins=bins, executor=job_manager.executor)
+            H5_BYTES_READ.inc(stats_by_bins[str(bins)]['bytes_read'], operation='weight_stats')
+        except Exception as e:
+            print(f"Error computing weight statistics: {e}")
+            return jsonify({
+                'error': str(e),
+                'model_name': os.path.basename(latest_h5_file)
+            }), 500
+        weight_stats_cache.put(latest_h5_file, stats_by_bins,
+                               content_hash=cached['content_hash'] if cached else None,
+                               fingerprint=fingerprint)
+
+    return jsonify({
+        'model_name': os.path.basename(latest_h5_file),
+        **stats_by_bins[str(bins)]
+    })
+
+def model_record_response(record):
+    """
+    A registry record with its summary, revalidated by ETag before the summary is loaded
+    """
+    if record is None:
+        return jsonify({'error': 'Model not found'}), 404
+
+    encoding = negotiate_encoding(request.accept_encodings)
+    etag = representation_etag(record['content_hash'], 'record', record['id'], encoding or 'identity')
+    cached_response = not_modified(etag)
+    if cached_response is not None:
+        return cached_response
+
+    record = registry.get(record['id'], include_summary=True)
+    if record['summary'] is None:
+        # Not parsed yet (or parse failed); fill it in from the cache / parser
+        record['summary'] = get_summary(record['path'])
+    return with_validators(jsonify(record), etag)
+
+
+@app.route('/api/models', methods=['GET'])
+def list_models():
+    """
+    Newest-first page of registered models: ?limit=N&cursor=<next_cursor>
+    """
+    limit = request.args.get('limit', 20, type=int)
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
+
+    try:
+        models, next_cursor = registry.list(limit, request.args.get('cursor'))
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+
+    return jsonify({
+        'models': models,
+        'total': registry.count(),
+        'next_cursor': next_cursor
+    })
+
+
+@app.route('/api/models/latest', methods=['GET'])
+def get_latest_model():
+    record = registry.latest()
+    if record is None:
+        return no_model_response()
+    return model_record_response(record)
+
+
+@app.route('/api/models/<int:model_id>', methods=['GET'])
+def get_model(model_id):
+    return model_record_response(registry.get(model_id))
+
+
+@app.route('/api/models/by-hash/<content_hash>', methods=['GET'])
+def get_model_by_hash(content_hash):
+    return model_record_response(registry.get_by_hash(content_hash))
+
+
+@app.route('/api/models/<int:model_a>/diff/<int:model_b>', methods=['GET'])
+def diff_model_pair(model_a, model_b):
+    """
+    Layer and weight changes from model_a to model_b, cached per content-hash pair
+    """
+    record_a, record_b = registry.get(model_a), registry.get(model_b)
+    if record_a is None or record_b is None:
+        return jsonify({'error': 'Model not found'}), 404
+
+    result = registry.get_diff(record_a['content_hash'], record_b['content_hash'])
+    if result is None:
+        unsupported = (unsupported_format_response(record_a['path'], ('h5',)) or
+                       unsupported_format_response(record_b['path'], ('h5',)))
+        if unsupported is not None:
+            return unsupported
+        try:
+            result = diff_models(record_a['path'], record_b['path'], executor=job_manager.executor)
+            H5_BYTES_READ.inc(result['stats']['bytes_read'], operation='diff')
+        except Exception as e:
+            print(f"Error diffing models {model_a} and {model_b}: {e}")
+            return jsonify({'error': str(e)}), 500
+        registry.put_diff(record_a['content_hash'], record_b['content_hash'], result)
+
+    describe = lambda record: {k: record[k] for k in ('id', 'filename', 'content_hash')}
+    return jsonify({
+        'model_a': describe(record_a),
+        'model_b': describe(record_b),
+        **result
+    })
+
+
+def cost_profile(record, input_shapes=None):
+    """
+    Per-sample cost profile of a registered model, cached per content hash and input-shape override
+    """
+    shapes_key = input_shapes_key(input_shapes)
+    profile = registry.get_cost_profile(record['content_hash'], shapes_key, COST_MODEL_VERSION)
+    if profile is None:
+        profile = profile_model(record['path'], input_shapes)
+        registry.put_cost_profile(record['content_hash'], shapes_key, COST_MODEL_VERSION, profile)
+    return profile
+
+
+def read_cost_options():
+    """
+    (batch_size, dtype, input shapes) from the query string, raising CostError when invalid
+    """
+    batch_size = request.args.get('batch_size', 1, type=int)
+    if not 1 <= batch_size <= MAX_COST_BATCH_SIZE:
+        raise CostError(f'batch_size must be between 1 and {MAX_COST_BATCH_SIZE}')
+    dtype = request.args.get('dtype', DEFAULT_DTYPE)
+    if dtype not in DTYPE_BYTES:
+        raise CostError(f"dtype must be one of {', '.join(DTYPE_BYTES)}")
+    return batch_size, dtype, parse_input_shapes(request.args.get('input_shape'))
+
+
+@app.route('/api/models/<int:model_id>/cost', methods=['GET'])
+def get_model_cost(model_id):
+    """
+    Estimated per-layer and total MACs / FLOPs, activation and weight memory,
+    and peak live-activation memory: ?batch_size=N&dtype=float16&input_shape=224,224,3
+    """
+    record = registry.get(model_id)
+    if record is None:
+        return jsonify({'error': 'Model not found'}), 404
+
+    try:
+        batch_size, dtype, input_shapes = read_cost_options()
+        result = estimate_cost(cost_profile(record, input_shapes), batch_size, dtype)
+    except CostError as e:
+        return jsonify({'error': str(e)}), e.status_code
+    except Exception as e:
+        print(f"Error estimating costs of model {model_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+    return jsonify({'model_id': model_id, 'filename': record['filename'], **result})
+
+
+@app.route('/api/models/cost', methods=['GET'])
+def rank_model_costs():
+    """
+    Models ranked by estimated cost, cheapest first: ?ids=1,2,3&sort=flops
+    (default: the newest MAX_PAGE_SIZE models) plus the options of get_model_cost
+    """
+    try:
+        batch_size, dtype, input_shapes = read_cost_options()
+        ids = request.args.get('ids')
+        if ids:
+            try:
+                ids = list(dict.fromkeys(int(model_id) for model_id in ids.split(',')))
+            except ValueError:
+                raise CostError('ids must be a comma-separated list of model ids')
+            if len(ids) > MAX_PAGE_SIZE:
+                raise CostError(f'At most {MAX_PAGE_SIZE} models can be ranked at once')
+            records = [registry.get(model_id) or {'id': model_id} for model_id in ids]
+        else:
+            records, _ = registry.list(MAX_PAGE_SIZE)
+
+        ranked, skipped = [], []
+        for record in records:
+            if 'content_hash' not in record:
+                skipped.append({'model_id': record['id'], 'error': 'Model not found', 'status': 404})
+                continue
+            try:
+                ranked.append((record, cost_profile(record, input_shapes)))
+            except CostError as e:
+                skipped.append({'model_id': record['id'], 'error': str(e), 'status': e.status_code})
+            except Exception as e:
+                print(f"Error estimating costs of model {record['id']}: {e}")
+                skipped.append({'model_id': record['id'], 'error': str(e), 'status': 500})
+
+        order = rank_costs([profile for _, profile in ranked], batch_size, dtype, request.args.get('sort', 'flops'))
+    except CostError as e:
+        return jsonify({'error': str(e)}), e.status_code
+    except Exception as e:
+        print(f"Error ranking model costs: {e}")
+        return jsonify({'error': str(e)}), 500
+
+    return jsonify({
+        'batch_size': batch_size,
+        'dtype': dtype,
+        'sort': request.args.get('sort', 'flops'),
+        'models': [{
+            'model_id': ranked[index][0]['id'],
+            'filename': ranked[index][0]['filename'],
+            'content_hash': ranked[index][0]['content_hash'],
+            'unsupported_layers': len(ranked[index][1]['unsupported']),
+            **totals
+        } for index, totals in order],
+        'skipped': skipped
+    })
+
+
+def read_array_request(key):
+    """
+    Read an input array and options from the request: a raw .npy body
+    (options in the query string) or JSON with the array under `key`
+    """
+    if request.mimetype == 'application/x-npy':
+        options = {name: int(value) if value.lstrip('-').isdigit() else value
+                   for name, value in request.args.items()}
+        return np.load(io.BytesIO(request.get_data()), allow_pickle=False), options
+
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict) or key not in payload:
+        raise ValueError(f'Request needs an "{key}" array')
+    options = {name: value for name, value in payload.items() if name != key}
+    return np.asarray(payload[key], dtype=np.float32), options
+
+
+@app.route('/api/models/<int:model_id>/predict', methods=['POST'])
+def predict(model_id):
+    """
+    Batched CPU inference. Accepts {"inputs": [...], "batch_size": N} as JSON
+    or a raw .npy array (Content-Type: application/x-npy); answers in kind.
+    """
+    record = registry.get(model_id)
+    if record is None:
+        return jsonify({'error': 'Model not found'}), 404
+    unsupported = unsupported_format_response(record['path'], ('h5',))
+    if unsupported is not None:
+        return unsupported
+
+    try:
+        inputs, options = read_array_request('inputs')
+    except ValueError as e:
+        return jsonify({'error': 'Invalid input array', 'details': str(e)}), 400
+
+    batch_size = options.get('batch_size', DEFAULT_BATCH_SIZE)
+
+    # bool is an int subclass; `"batch_size": true` is not a batch size
+    if not isinstance(batch_size, int) or isinstance(batch_size, bool) or \
+            not 1 <= batch_size <= MAX_PREDICT_BATCH_SIZE:
+        return jsonify({'error': f'batch_size must be between 1 and {MAX_PREDICT_BATCH_SIZE}'}), 400
+    if inputs.ndim == 0 or inputs.shape[0] == 0:
+        return jsonify({'error': 'inputs must have a leading sample axis'}), 400
+
+    try:
+        model = model_pool.get(record['content_hash'], record['path'])
+        start = time.perf_counter()
+        outputs = model.predict(inputs, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+    except UnsupportedModelError as e:
+        return jsonify({'error': 'Model is not supported by the inference runtime', 'details': str(e)}), 422
+    except ValueError as e:
+        return jsonify({'error': 'Input does not match the model', 'details': str(e)}), 400
+    except Exception as e:
+        print(f"Error running model {model_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+    if request.accept_mimetypes.best == 'application/x-npy':
+        buffer = io.BytesIO()
+        np.save(buffer, outputs, allow_pickle=False)
+        return Response(buffer.getvalue(), mimetype='application/x-npy')
+
+    return jsonify({
+        'model_id': model_id,
+        'shape': list(outputs.shape),
+        'predictions': outputs.tolist(),
+        'elapsed_ms': round(elapsed * 1000, 3),
+        'samples_per_sec': len(inputs) / elapsed if elapsed else None
+    })
+
+
+@app.route('/api/models/<int:model_id>/explain/<any(lime, shap):method>', methods=['POST'])
+def explain_prediction(model_id, method):
+    """
+    LIME / KernelSHAP attributions over a superpixel grid for one input.
+    JSON: {"input": [...], "target", "num_samples", "grid", "baseline", "seed"}
+    """
+    record = registry.get(model_id)
+    if record is None:
+        return jsonify({'error': 'Model not found'}), 404
+    unsupported = unsupported_format_response(record['path'], ('h5',))
+    if unsupported is not None:
+        return unsupported
+
+    try:
+        sample, options = read_array_request('input')
+    except ValueError as e:
+        return jsonify({'error': 'Invalid input array', 'details': str(e)}), 400
+    if sample.ndim > 1 and sample.shape[0] == 1:
+        sample = sample[0]
+
+    params = {
+        'grid': options.get('grid', DEFAULT_GRID),
+        'num_samples': options.get('num_samples') or DEFAULT_NUM_SAMPLES[method],
+        'baseline': options.get('baseline', 'mean'),
+        'target': options.get('target'),
+        'seed': options.get('seed', 0)
+    }
+    input_hash = array_hash(sample)
+    params_key = canonical_params(params)
+
+    result = registry.get_explanation(record['content_hash'], input_hash, method, params_key)
+    if result is None:
+        try:
+            model = model_pool.get(record['content_hash'], record['path'])
+            result = explain(method, model, sample, file_path=record['path'],
+                             content_hash=record['content_hash'], executor=job_manager.executor,
+                             workers=job_manager.max_workers, **params)
+        except UnsupportedModelError as e:
+            return jsonify({'error': 'Model is not supported by the inference runtime', 'details': str(e)}), 422
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': 'Invalid explanation request', 'details': str(e)}), 400
+        except Exception as e:
+            print(f"Error explaining model {model_id}: {e}")
+            return jsonify({'error': str(e)}), 500
+        registry.put_explanation(record['content_hash'], input_hash, method, params_key, result)
+
+    return jsonify({'model_id': model_id, 'input_hash': input_hash, **result})
+
+
+def tensor_record(model_id):
+    record = registry.get(model_id)
+    if record is None:
+        raise TileError('Model not found', 404)
+    if model_format(record['path']) not in TENSOR_FORMATS:
+        raise TileError(f"Tensors of {model_format(record['path'])} models can't be read", 415)
+    return record
+
+
+def tensor_shape(record, name):
+    """
+    Shape of a model's weight tensor, raising TileError for paths that aren't weights
+    """
+    paths = {dataset_path for _, _, dataset_path in list_model_tensors(record['path'])}
+    if name not in paths:
+        raise TileError('Tensor not found', 404)
+    with open_weight_tensor(record['path'], name) as dataset:
+        return dataset.shape
+
+
+def tensor_pyramid(model_id, name):
+    """
+    Directory and metadata of a tensor's tile pyramid, built on the worker pool on first use
+    """
+    record = tensor_record(model_id)
+    target_dir = pyramid_dir(TILE_FOLDER, record['content_hash'], name)
+    meta = load_pyramid_meta(target_dir)
+    if meta is None:
+        tensor_shape(record, name)
+        job_manager.executor.submit(build_pyramid, record['path'], name, target_dir).result()
+        meta = load_pyramid_meta(target_dir)
+        # One pass for the quantization scale, one to fill the levels
+        H5_BYTES_READ.inc(2 * math.prod(meta['shape']) * np.dtype(meta['dtype']).itemsize, operation='tiles')
+    return target_dir, meta
+
+
+@app.route('/api/models/<int:model_id>/tensors/<path:name>/tiles', methods=['GET'])
+def get_tensor_tiles(model_id, name):
+    """
+    Zoom levels and quantization ranges of a weight tensor's heatmap pyramid
+    """
+    try:
+        _, meta = tensor_pyramid(model_id, name)
+    except TileError as e:
+        return jsonify({'error': str(e)}), e.status_code
+    except Exception as e:
+        print(f"Error building tiles for {name}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+    return jsonify({
+        'model_id': model_id,
+        'tile_url': f"/api/models/{model_id}/tensors/{name}/tiles/{{z}}/{{x}}/{{y}}",
+        **meta
+    })
+
+
+@app.route('/api/models/<int:model_id>/tensors/<path:name>/tiles/<int:z>/<int:x>/<int:y>', methods=['GET'])
+def get_tensor_tile(model_id, name, z, x, y):
+    """
+    One uint8 heatmap tile (row-major, shape in X-Tile-Shape); ?mode=mean|max
+    """
+    try:
+        target_dir, meta = tensor_pyramid(model_id, name)
+        tile = read_tile(target_dir, meta, z, x, y, request.args.get('mode', 'mean'))
+    except TileError as e:
+        return jsonify({'error': str(e)}), e.status_code
+    except Exception as e:
+        print(f"Error reading tile {z}/{x}/{y} of {name}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+    return Response(tile.tobytes(), mimetype='application/octet-stream', headers={
+        'X-Tile-Shape': f"{tile.shape[0]},{tile.shape[1]}",
+        'Access-Control-Expose-Headers': 'X-Tile-Shape'
+    })
+
+
+@app.route('/api/models/<int:model_id>/tensors/<path:name>/values', methods=['GET'])
+def get_tensor_values(model_id, name):
+    """
+    Raw values of a window of a tensor's 2-D view, read as HDF5 hyperslabs.
+    Rows come from `Range: rows=<first>-<last>` (answered with 206) or
+    `?rows=start:stop`; columns from `?cols=start:stop`.
+    """
+    try:
+        record = tensor_record(model_id)
+        rows, cols = matrix_shape(tensor_shape(record, name))
+
+        range_header = request.headers.get('Range')
+        if range_header is not None:
+            unit, _, span = range_header.partition('=')
+            first, sep, last = span.partition('-')
+            if unit.strip() != 'rows' or not sep or not first.isdigit() or not (last.isdigit() or last == ''):
+                raise TileError('Range must look like rows=<first>-<last>', 416)
+            row_span = parse_span(f"{first}:{int(last) + 1 if last else ''}", rows, 'Range')
+        else:
+            row_span = parse_span(request.args.get('rows'), rows, 'rows')
+        col_span = parse_span(request.args.get('cols'), cols, 'cols')
+
+        values = read_matrix_slice(record['path'], name, row_span, col_span)
+        H5_BYTES_READ.inc(values.nbytes, operation='slice')
+    except TileError as e:
+        return jsonify({'error': str(e)}), e.status_code
+    except Exception as e:
+        print(f"Error reading values of {name}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+    status = 206 if range_header is not None else 200
+    headers = {
+        'Accept-Ranges': 'rows',
+        'Access-Control-Expose-Headers': 'Content-Range',
+    }
+    if range_header is not None:
+        headers['Content-Range'] = f"rows {row_span[0]}-{row_span[1] - 1}/{rows}"
+
+    if request.accept_mimetypes.best == 'application/x-npy':
+        buffer = io.BytesIO()
+        np.save(buffer, values, allow_pickle=False)
+        return Response(buffer.getvalue(), status=status, mimetype='application/x-npy', headers=headers)
+
+    response = jsonify({
+        'model_id': model_id,
+        'path': name,
+        'matrix_shape': [rows, cols],
+        'rows': list(row_span),
+        'cols': list(col_span),
+        'values': values.tolist()
+    })
+    response.status_code = status
+    response.headers.extend(headers)
+    return response
+
+
+def make_upload_finisher(model_id, file_path, fingerprint, content_hash=None):
+    """
+    Build the callback that stores a finished parse: fills the summary cache
+    and the registry, and shapes the job result
+    """
+    def finish(model_summary):
+        if not isinstance(model_summary, dict) or 'error' in model_summary:
+            raise ValueError(model_summary.get('error', 'Unknown error')
+                             if isinstance(model_summary, dict) else 'Invalid summary')
+
+        summary_cache.put(file_path, model_summary,
+                          content_hash=content_hash or hash_file(file_path),
+                          fingerprint=fingerprint)
+        registry.set_summary(model_id, model_summary)
+
+        # Aggressive truncation before returning; the registry already persists the full summary
+        return {
+            "message": "File processed successfully",
+            "model_id": model_id,
+            "model_info": truncate_payload(model_summary, UPLOAD_RESPONSE_MAX_BYTES)
+        }
+
+    return finish
+
+
+def job_response(job_id, status_code=200):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    job['status_url'] = f"/api/jobs/{job_id}"
+    job['events_url'] = f"/api/jobs/{job_id}/events"
+    return jsonify(job), status_code
+
 
 @app.route('/upload', methods=['POST'])
-@rate_limit_handler()
 def upload_file():
     if 'model' not in request.files:
         return jsonify({"error": "No file part"}), 400
@@ -334,36 +1095,202 @@ def upload_file():
 
     if file and allowed_file(file.filename):
         filename = secure_filename(file.filename)
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        file_path = unique_upload_path(filename)
+
+        # Sniff the signature before writing anything to disk
+        file_format = model_format(filename)
+        if sniff_format(file.stream.read(SIGNATURE_BYTES)) != file_format:
+            return jsonify({"error": f"File is not a valid .{filename.rsplit('.', 1)[1].lower()} model"}), 415
+        file.stream.seek(0)
+
+        # The file is about to be replaced, so any cached summary is stale
+        summary_cache.invalidate(file_path)
         file.save(file_path)
 
         try:
-            model_summary = extract_model_summary(file_path)
-            
-        
-            # Aggressive truncation before returning
-            truncated_summary = truncate_payload(model_summary)
-        
-
-            # Save extracted info to a JSON file
-            json_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{filename}_contents.json")
-            with open(json_path, 'w') as json_file:
-                json.dump(model_summary, json_file, indent=2)
+            check_file_size(file_path)
+        except ValueError as e:
+            os.remove(file_path)
+            return jsonify({"error": str(e)}), 413
 
-            return jsonify({
-                "message": "File processed successfully",
-                "model_info": model_summary,
-                "json_path": json_path,
-                "message": "File processed with size limitations",
-                "model_info": truncated_summary
-            }), 200
+        # The multipart body is read while saving, so this spans the whole transfer
+        received = os.path.getsize(file_path)
+        UPLOAD_BYTES.inc(received, kind='multipart')
+        UPLOAD_THROUGHPUT.observe(received / max(time.perf_counter() - g.request_start, 1e-9), kind='multipart')
 
-        except Exception as e:
-            return jsonify({
-                "error": f"Failed to process H5 file: {str(e)}"
-            }), 500
+        return register_upload(file_path, hash_file(file_path))
 
     return jsonify({"error": "Invalid file type"}), 400
 
+
+def register_upload(file_path, content_hash):
+    """
+    Record a stored upload in the registry and parse it unless identical content was seen before
+    """
+    record, created = registry.register(file_path, content_hash, os.path.getsize(file_path))
+
+    if not created and os.path.abspath(record['path']) != os.path.abspath(file_path):
+        # Same bytes as an existing model: keep the original copy only
+        os.remove(file_path)
+
+    model_summary = None
+    if record['has_summary']:
+        model_summary = registry.get(record['id'], include_summary=True)['summary']
+    elif not created:
+        model_summary = summary_cache.get(record['path'])
+        if model_summary is not None:
+            registry.set_summary(record['id'], model_summary)
+
+    if model_summary is not None:
+        return jsonify({
+            "message": "Model already uploaded",
+            "model_id": record['id'],
+            "model_info": truncate_payload(model_summary, UPLOAD_RESPONSE_MAX_BYTES)
+        }), 200
+
+    return submit_parse_job(record['id'], record['path'], content_hash)
+
+
+def submit_parse_job(model_id, file_path, content_hash=None):
+    """
+    Parse a stored upload on the worker pool; the client polls the job instead of holding a thread
+    """
+    fingerprint = file_fingerprint(file_path)
+    try:
+        job_id = job_manager.submit(
+            extract_model_summary, file_path,
+            on_success=make_upload_finisher(model_id, file_path, fingerprint, content_hash),
+            description=f"Parse {os.path.basename(file_path)}"
+        )
+    except Exception as e:
+        return jsonify({
+            "error": f"Failed to process H5 file: {str(e)}"
+        }), 500
+
+    return job_response(job_id, 202)
+
+
+def upload_error_response(error):
+    payload = {"error": str(error)}
+    if error.offset is not None:
+        payload["offset"] = error.offset
+    return jsonify(payload), error.status_code
+
+
+@app.route('/upload/chunked', methods=['POST'])
+def init_chunked_upload():
+    """
+    Start a resumable upload: {"filename": ..., "size": bytes, "sha256": optional hex digest}
+    """
+    params = request.get_json(silent=True) or {}
+    filename = secure_filename(params.get('filename', ''))
+
+    if not filename or not allowed_file(filename):
+        return jsonify({"error": "Invalid file type"}), 400
+
+    try:
+        session = chunked_uploads.init(filename, params.get('size'), params.get('sha256'))
+    except UploadError as e:
+        return upload_error_response(e)
+
+    return jsonify(session), 201
+
+
+@app.route('/upload/chunked/<upload_id>', methods=['GET'])
+def get_chunked_upload(upload_id):
+    """
+    Report how many bytes have been received so an interrupted client can resume
+    """
+    try:
+        return jsonify(chunked_uploads.status(upload_id))
+    except UploadError as e:
+        return upload_error_response(e)
+
+
+@app.route('/upload/chunked/<upload_id>', methods=['PUT'])
+def append_chunked_upload(upload_id):
+    """
+    Append the raw request body at the byte offset given by `?offset=` or the `Upload-Offset` header
+    """
+    offset = request.args.get('offset', request.headers.get('Upload-Offset'))
+    try:
+        offset = int(offset)
+    except (TypeError, ValueError):
+        return jsonify({"error": "A numeric offset is required"}), 400
+
+    start = time.perf_counter()
+    try:
+        new_offset = chunked_uploads.append(upload_id, offset, request.stream)
+    except UploadError as e:
+        return upload_error_response(e)
+
+    UPLOAD_BYTES.inc(new_offset - offset, kind='chunked')
+    UPLOAD_THROUGHPUT.observe((new_offset - offset) / max(time.perf_counter() - start, 1e-9), kind='chunked')
+
+    return jsonify({"upload_id": upload_id, "offset": new_offset})
+
+
+@app.route('/upload/chunked/<upload_id>/complete', methods=['POST'])
+def complete_chunked_upload(upload_id):
+    """
+    Verify the assembled file, move it into the uploads folder and queue it for parsing
+    """
+    try:
+        session = chunked_uploads.status(upload_id)
+        file_path = unique_upload_path(session['filename'])
+        summary_cache.invalidate(file_path)
+        _, content_hash = chunked_uploads.finalize(upload_id, file_path)
+    except UploadError as e:
+        return upload_error_response(e)
+
+    return register_upload(file_path, content_hash)
+
+
+@app.route('/upload/chunked/<upload_id>', methods=['DELETE'])
+def abort_chunked_upload(upload_id):
+    try:
+        chunked_uploads.status(upload_id)
+    except UploadError as e:
+        return upload_error_response(e)
+
+    chunked_uploads.abort(upload_id)
+    return '', 204
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    return job_response(job_id)
+
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """
+    Server-sent events stream of a job's status until it finishes
+    """
+    if job_manager.get(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    def generate():
+        last_status = None
+        while True:
+            job = job_manager.wait_for_change(job_id, last_status)
+            if job is None:
+                return
+            if job['status'] == last_status:
+                # Keep idle connections alive through proxies
+                yield ": keep-alive\n\n"
+                continue
+            last_status = job['status']
+            yield f"event: status\ndata: {json.dumps(job)}\n\n"
+            if job['status'] in TERMINAL_STATES:
+                return
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
+# Models uploaded before the registry existed are indexed once
+if registry.count() == 0:
+    registry.import_directory(UPLOAD_FOLDER, allowed_file, hash_file)
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
\ No newline at end of file
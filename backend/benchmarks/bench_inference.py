@@ -0,0 +1,103 @@
+"""
+Batched vs per-sample throughput of the NumPy inference runtime.
+
+Run from the backend folder:
+
+    python -m benchmarks.bench_inference                             # generated CNN, 512 samples
+    python -m benchmarks.bench_inference --batch-size 128 --samples 2048
+    python -m benchmarks.bench_inference --model uploads/my_cnn_model_1.h5 --samples 64
+
+Without --model a small Keras-style CNN (Conv2D, BatchNormalization,
+MaxPooling2D, Flatten, Dense) is written to a temporary file. Each batch
+size is timed with utils.numpy_runtime.measure_throughput: one batched
+predict over all samples against one predict per sample.
+"""
+import argparse
+import json
+import os
+import tempfile
+
+import h5py
+import numpy as np
+
+from utils.numpy_runtime import DEFAULT_BATCH_SIZE, NumpyModel, measure_throughput
+
+
+def _layer(class_name, name, **config):
+    return {'class_name': class_name, 'config': {'name': name, **config}}
+
+
+def write_cnn_model(path, image_size=32, channels=3, filters=32, classes=10, seed=0):
+    """
+    Keras 2 style H5 of a small image classifier, weights stored as
+    model_weights/<layer>/<layer>/<weight>:0
+    """
+    rng = np.random.default_rng(seed)
+    pooled = (image_size - 2) // 2
+    weights = {
+        'conv2d': {'kernel': (3, 3, channels, filters), 'bias': (filters,)},
+        'batch_normalization': {'gamma': (filters,), 'beta': (filters,),
+                                'moving_mean': (filters,), 'moving_variance': (filters,)},
+        'dense': {'kernel': (pooled * pooled * filters, 128), 'bias': (128,)},
+        'dense_1': {'kernel': (128, classes), 'bias': (classes,)},
+    }
+    layers = [
+        _layer('InputLayer', 'input_1', batch_input_shape=[None, image_size, image_size, channels]),
+        _layer('Conv2D', 'conv2d', filters=filters, kernel_size=[3, 3], strides=[1, 1], padding='valid',
+               activation='relu', use_bias=True),
+        _layer('BatchNormalization', 'batch_normalization', axis=-1, epsilon=1e-3),
+        _layer('MaxPooling2D', 'max_pooling2d', pool_size=[2, 2], padding='valid'),
+        _layer('Flatten', 'flatten'),
+        _layer('Dense', 'dense', units=128, activation='relu', use_bias=True),
+        _layer('Dropout', 'dropout', rate=0.5),
+        _layer('Dense', 'dense_1', units=classes, activation='softmax', use_bias=True),
+    ]
+
+    with h5py.File(path, 'w') as model_file:
+        model_file.attrs['model_config'] = json.dumps(
+            {'class_name': 'Sequential', 'config': {'name': 'sequential', 'layers': layers}})
+        root = model_file.create_group('model_weights')
+        root.attrs['layer_names'] = [layer['config']['name'].encode('utf-8') for layer in layers]
+        for layer in layers:
+            name = layer['config']['name']
+            group = root.create_group(name)
+            names = []
+            for weight, shape in weights.get(name, {}).items():
+                values = rng.standard_normal(shape).astype(np.float32) * 0.05
+                if weight == 'moving_variance':
+                    values = np.abs(values) + 1
+                group.create_dataset(f"{name}/{weight}:0", data=values)
+                names.append(f"{name}/{weight}:0".encode('utf-8'))
+            group.attrs['weight_names'] = names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model', help='Keras H5 model to run (default: a generated CNN)')
+    parser.add_argument('--samples', type=int, default=512, help='Samples per measurement')
+    parser.add_argument('--batch-size', type=int, action='append',
+                        help=f"Batch size to measure (repeatable; default {DEFAULT_BATCH_SIZE})")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='inference-bench-') as scratch:
+        model_path = args.model
+        if model_path is None:
+            model_path = os.path.join(scratch, 'cnn.h5')
+            write_cnn_model(model_path)
+
+        model = NumpyModel(model_path)
+        if not model.input_shape or None in model.input_shape:
+            raise SystemExit(f"{model_path} has no fixed input shape to generate samples for")
+        inputs = np.random.default_rng(0).standard_normal(
+            (args.samples,) + tuple(model.input_shape)).astype(np.float32)
+
+        print(f"{os.path.basename(model_path)}: input {tuple(model.input_shape)}, {args.samples} samples")
+        print(f"{'batch':>6}{'batched/s':>12}{'per-sample/s':>14}{'speedup':>9}")
+        for batch_size in args.batch_size or [DEFAULT_BATCH_SIZE]:
+            result = measure_throughput(model, inputs, batch_size=batch_size)
+            print(f"{batch_size:>6}{result['batched_samples_per_sec']:>12.1f}"
+                  f"{result['per_sample_samples_per_sec']:>14.1f}{result['speedup']:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
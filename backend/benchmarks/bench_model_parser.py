@@ -0,0 +1,176 @@
+"""
+Throughput and memory of utils.model_parser against the regex parser it replaced.
+
+Run from the backend folder:
+
+    python -m benchmarks.bench_model_parser                  # 20k-layer inputs (a few MB each)
+    python -m benchmarks.bench_model_parser --layers 200000  # tens of MB
+
+Each format is written to a temporary file and parsed from disk. Peak memory
+is the tracemalloc peak during the parse, so it covers Python allocations
+only, including the returned summary itself. The legacy parser cannot read
+JSON at all (it called json.load on an exhausted handle); for JSON the
+baseline is json.load of the whole document.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from utils.model_parser import parse_model_file
+
+
+def legacy_extract_model_details(content):
+    """
+    The regex-based extractor utils.model_parser used before the streaming parsers
+    """
+    model_data = {
+        'total_layers': 0,
+        'total_parameters': 0,
+        'optimizer': 'N/A',
+        'loss_function': 'N/A',
+        'layers': []
+    }
+
+    layers_match = re.findall(r'layer(\d+)', content, re.IGNORECASE)
+    model_data['total_layers'] = len(layers_match)
+
+    params_match = re.findall(r'(\d+)\s*parameters', content, re.IGNORECASE)
+    if params_match:
+        model_data['total_parameters'] = sum(int(p) for p in params_match)
+
+    if 'adam' in content.lower():
+        model_data['optimizer'] = 'Adam'
+    if 'sgd' in content.lower():
+        model_data['optimizer'] = 'SGD'
+
+    if 'cross_entropy' in content.lower():
+        model_data['loss_function'] = 'Cross Entropy'
+    if 'mse' in content.lower():
+        model_data['loss_function'] = 'Mean Squared Error'
+
+    layer_matches = re.findall(r'(Dense|Conv2D|LSTM)\s*\(\s*(\d+)\s*\)', content)
+    model_data['layers'] = [
+        {
+            'name': f'{layer_type} Layer',
+            'type': layer_type,
+            'parameters': int(params)
+        } for layer_type, params in layer_matches
+    ]
+
+    return model_data
+
+
+def legacy_parse_model_file(file_path):
+    with open(file_path, 'r') as f:
+        content = f.read()
+    if file_path.endswith('.json'):
+        return json.loads(content)
+    return legacy_extract_model_details(content)
+
+
+def write_summary_text(path, layers):
+    """
+    Keras 2 style `model.summary()` output with a 'Connected to' column
+    """
+    rule = '_' * 98
+    with open(path, 'w') as f:
+        f.write(f'Model: "model"\n{rule}\n')
+        f.write(f" {'Layer (type)':<31}{'Output Shape':<21}{'Param #':<12}{'Connected to':<33}\n")
+        f.write('=' * 98 + '\n')
+        previous = None
+        for i in range(layers):
+            name = f"dense_{i} (Dense)"
+            inbound = f"['{previous}[0][0]']" if previous else '[]'
+            f.write(f" {name:<31}{'(None, 64)':<21}{4160:<12}{inbound:<33}\n")
+            f.write(' ' * 98 + '\n')
+            previous = f"dense_{i}"
+        f.write('=' * 98 + '\n')
+        f.write(f"Total params: {4160 * layers:,}\nTrainable params: {4160 * layers:,}\n"
+                f"Non-trainable params: 0\n{rule}\n")
+
+
+def write_config_json(path, layers):
+    """
+    A functional model config in the shape of `model.to_json()`
+    """
+    layer_list = []
+    previous = None
+    for i in range(layers):
+        layer_list.append({
+            'class_name': 'Dense',
+            'config': {'name': f"dense_{i}", 'units': 64, 'activation': 'relu', 'use_bias': True,
+                       'kernel_initializer': {'class_name': 'GlorotUniform', 'config': {'seed': None}}},
+            'name': f"dense_{i}",
+            'inbound_nodes': [[[previous, 0, 0, {}]]] if previous else []
+        })
+        previous = f"dense_{i}"
+    with open(path, 'w') as f:
+        json.dump({'class_name': 'Functional', 'config': {'name': 'model', 'layers': layer_list},
+                   'training_config': {'optimizer_config': {'class_name': 'Adam'}, 'loss': 'mse'}},
+                  f, indent=2)
+
+
+def write_python_source(path, layers):
+    with open(path, 'w') as f:
+        f.write('import tensorflow as tf\nfrom tensorflow.keras import layers\n\n')
+        f.write('model = tf.keras.Sequential([\n')
+        for i in range(layers):
+            f.write(f"    layers.Dense(64, activation='relu', name='dense_{i}'),\n")
+        f.write('])\n')
+        f.write("model.compile(optimizer='adam', loss='mse')\n")
+
+
+FORMATS = {
+    'summary.txt': write_summary_text,
+    'config.json': write_config_json,
+    'model.py': write_python_source,
+}
+
+
+def measure(parse, path, repeat):
+    """
+    Median wall time over `repeat` plain runs, then one traced run for peak memory
+    (tracemalloc slows allocation-heavy code several times over)
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parse(path)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    parse(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(times), peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--layers', type=int, default=20000, help='Layers per generated input')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (median time)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='parser-bench-') as scratch:
+        print(f"{'input':<14}{'size MB':>9}  {'parser':<8}{'seconds':>9}{'MB/s':>9}{'peak MB':>9}{'layers':>9}")
+        for filename, writer in FORMATS.items():
+            path = os.path.join(scratch, filename)
+            writer(path, args.layers)
+            size_mb = os.path.getsize(path) / 1024 / 1024
+
+            for label, parse in (('legacy', legacy_parse_model_file), ('stream', parse_model_file)):
+                seconds, peak, result = measure(parse, path, args.repeat)
+                if 'error' in result:
+                    raise SystemExit(f"{label} parser failed on {filename}: {result['error']}")
+                layer_count = len(result.get('layers', result.get('config', {}).get('layers', [])))
+                print(f"{filename:<14}{size_mb:>9.1f}  {label:<8}{seconds:>9.3f}{size_mb / seconds:>9.1f}"
+                      f"{peak / 1024 / 1024:>9.1f}{layer_count:>9}")
+
+
+if __name__ == '__main__':
+    main()
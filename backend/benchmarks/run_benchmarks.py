@@ -0,0 +1,378 @@
+"""
+Benchmarks for the backend's parse, truncation, upload and summary paths.
+
+Run from the backend folder:
+
+    python -m benchmarks.run_benchmarks                    # quick profile, compare to baseline
+    python -m benchmarks.run_benchmarks --profile full     # up to 10k layers / ~95 MB tensors
+    python -m benchmarks.run_benchmarks --update-baseline  # record this machine's numbers
+
+Every measurement runs in a fresh spawned process with its own upload and
+cache folders, so peak RSS and cold caches are not polluted by earlier runs.
+Timings are medians over --repeat runs. The process exits with status 1
+when a benchmark is slower (or uses more memory) than the stored baseline
+by more than the tolerance.
+
+benchmarks/baseline.json is a reference quick-profile run, recorded with
+--update-baseline on the machine named in its "machine" entry. Baselines
+are machine-specific: before comparing on other hardware, re-record it
+(or pass --baseline with a path of your own) from a clean checkout.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.synthetic_models import write_synthetic_model
+from utils.jobs import TERMINAL_STATES
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+TIME_NOISE_FLOOR = 0.005  # Seconds; smaller slowdowns are ignored as timer noise
+RSS_NOISE_FLOOR_MB = 16  # Smaller RSS growth is ignored as allocator noise
+JOB_TIMEOUT = 600  # Seconds to wait for an upload's parse job
+
+QUICK_CASES = [
+    {'layers': 10},
+    {'layers': 100, 'depth': 2},
+    {'layers': 1000},
+    {'layers': 100, 'tensor_mb': 10},
+    {'layers': 100, 'tensor_mb': 10, 'chunked': True},
+    {'layers': 1000, 'keras_metadata': False},
+]
+
+PROFILES = {
+    'quick': QUICK_CASES,
+    'full': QUICK_CASES + [
+        {'layers': 10000},
+        {'layers': 1000, 'depth': 4},
+        {'layers': 10, 'tensor_mb': 95},
+        {'layers': 10, 'tensor_mb': 95, 'chunked': True},
+        {'layers': 10000, 'keras_metadata': False},
+    ]
+}
+
+
+def case_name(case):
+    name = f"L{case['layers']}-d{case.get('depth', 0)}-t{case.get('tensor_mb', 0)}mb"
+    name += '-chunked' if case.get('chunked') else '-contiguous'
+    if not case.get('keras_metadata', True):
+        name += '-no-config'
+    return name
+
+
+def _peak_rss_mb(who=resource.RUSAGE_SELF):
+    """
+    Peak resident set size in MB. Linux carries ru_maxrss across fork + exec,
+    so a spawned process would report its parent's peak; VmHWM is per process.
+    """
+    if who == resource.RUSAGE_SELF and os.path.exists('/proc/self/status'):
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _raw_summary(app_module, model_path):
+    """
+    The untruncated summary the truncation functions start from
+    """
+    import h5py
+    from utils.keras_h5 import extract_keras_summary
+
+    with h5py.File(model_path, 'r') as model_file:
+        summary = extract_keras_summary(model_file, os.path.basename(model_path))
+    return summary if summary is not None else app_module.extract_model_summary(model_path)
+
+
+def _wait_for_job(app_module, response):
+    payload = response.get_json()
+    if response.status_code != 202:
+        return payload
+    deadline = time.monotonic() + JOB_TIMEOUT
+    job = app_module.job_manager.get(payload['id'])
+    while job['status'] not in TERMINAL_STATES:
+        if time.monotonic() > deadline:
+            raise TimeoutError('Upload parse job did not finish')
+        job = app_module.job_manager.wait_for_change(payload['id'], job['status'], timeout=1.0, poll_interval=0.01)
+    if job['status'] == 'failed':
+        raise RuntimeError(f"Upload parse job failed: {job.get('error')}")
+    return job
+
+
+# Each setup returns the callable to time; work done in setup is not measured
+
+def setup_parse(app_module, model_path):
+    return lambda: app_module.extract_model_summary(model_path)
+
+
+def setup_truncation(name):
+    def setup(app_module, model_path):
+        summary = _raw_summary(app_module, model_path)
+        truncate = getattr(app_module, name)
+        return lambda: truncate(summary)
+    return setup
+
+
+def setup_upload(app_module, model_path):
+    with open(model_path, 'rb') as f:
+        payload = f.read()
+    client = app_module.app.test_client()
+    # Start the parse pool now so its spawn cost isn't billed to the upload
+    app_module.job_manager.executor.submit(os.getpid).result()
+
+    def upload():
+        import io
+        response = client.post('/upload', data={'model': (io.BytesIO(payload), os.path.basename(model_path))},
+                               content_type='multipart/form-data')
+        if response.status_code not in (200, 202):
+            raise RuntimeError(f"Upload failed: {response.get_json()}")
+        return _wait_for_job(app_module, response)
+    return upload
+
+
+def setup_model_summary(warm):
+    def setup(app_module, model_path):
+        from utils.summary_cache import hash_file
+
+        target = os.path.join(app_module.app.config['UPLOAD_FOLDER'], os.path.basename(model_path))
+        shutil.copyfile(model_path, target)
+        app_module.registry.register(target, hash_file(target), os.path.getsize(target))
+        client = app_module.app.test_client()
+
+        def get_summary():
+            response = client.get('/api/model-summary')
+            if response.status_code != 200:
+                raise RuntimeError(f"Summary request failed: {response.status_code}")
+            return response.get_data()
+
+        if warm:
+            get_summary()
+        return get_summary
+    return setup
+
+
+# name -> (setup, needs a fresh process per repeat)
+BENCHMARKS = {
+    'parse': (setup_parse, False),
+    'truncate_model_summary': (setup_truncation('truncate_model_summary'), False),
+    'intelligent_truncate_summary': (setup_truncation('intelligent_truncate_summary'), False),
+    'truncate_payload': (setup_truncation('truncate_payload'), False),
+    'upload': (setup_upload, True),
+    'model_summary_cold': (setup_model_summary(warm=False), True),
+    'model_summary_warm': (setup_model_summary(warm=True), False),
+}
+
+
+def _measure(benchmark, model_path, repeat, trace=True):
+    """
+    Runs in a fresh process: import the app against scratch folders, time `repeat`
+    calls, then (with `trace`) make one more call under tracemalloc for the Python peak
+    """
+    workdir = tempfile.mkdtemp(prefix='bench-')
+    os.environ['UPLOAD_FOLDER'] = os.path.join(workdir, 'uploads')
+    os.environ['CACHE_FOLDER'] = os.path.join(workdir, 'cache')
+    try:
+        import app as app_module
+
+        import_rss = _peak_rss_mb()
+        setup, _ = BENCHMARKS[benchmark]
+        run = setup(app_module, model_path)
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+
+        peak_rss = _peak_rss_mb()
+
+        # Tracing slows every allocation, so it is kept out of the timed calls
+        traced_peak = None
+        if trace:
+            tracemalloc.start()
+            run()
+            _, traced_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        # Reap the parse workers so their peak RSS is reported too
+        app_module.job_manager.shutdown()
+        for child in multiprocessing.active_children():
+            child.join(timeout=10)
+
+        return {
+            'timings': timings,
+            'import_rss_mb': import_rss,
+            'peak_rss_mb': peak_rss,
+            'worker_peak_rss_mb': _peak_rss_mb(resource.RUSAGE_CHILDREN),
+            'python_peak_mb': traced_peak / (1024 * 1024) if traced_peak is not None else None
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _in_fresh_process(benchmark, model_path, repeat, trace=True):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(_measure, benchmark, model_path, repeat, trace).result()
+
+
+def run_benchmark(benchmark, model_path, repeat):
+    _, fresh_process = BENCHMARKS[benchmark]
+    if fresh_process:
+        # The traced call gets a process of its own, so it is as cold as the timed ones
+        runs = [_in_fresh_process(benchmark, model_path, 1, trace=False) for _ in range(repeat)]
+        python_peak = _in_fresh_process(benchmark, model_path, 0)['python_peak_mb']
+    else:
+        runs = [_in_fresh_process(benchmark, model_path, repeat)]
+        python_peak = runs[0]['python_peak_mb']
+
+    timings = [t for run in runs for t in run['timings']]
+    seconds = statistics.median(timings)
+    size_mb = os.path.getsize(model_path) / (1024 * 1024)
+    return {
+        'seconds': seconds,
+        'min_seconds': min(timings),
+        'mb_per_sec': size_mb / seconds if seconds else None,
+        'peak_rss_mb': max(run['peak_rss_mb'] for run in runs),
+        'rss_growth_mb': max(run['peak_rss_mb'] - run['import_rss_mb'] for run in runs),
+        'worker_peak_rss_mb': max(run['worker_peak_rss_mb'] for run in runs),
+        'python_peak_mb': python_peak
+    }
+
+
+def find_regressions(results, baseline, tolerance, memory_tolerance):
+    """
+    Return human-readable regressions of `results` against `baseline`
+    """
+    regressions = []
+    for name, benchmarks in results.items():
+        for benchmark, current in benchmarks.items():
+            previous = baseline.get(name, {}).get(benchmark)
+            if previous is None:
+                continue
+            slower = current['seconds'] - previous['seconds']
+            if slower > TIME_NOISE_FLOOR and current['seconds'] > previous['seconds'] * (1 + tolerance):
+                regressions.append(f"{name} {benchmark}: {previous['seconds'] * 1000:.1f} ms -> "
+                                   f"{current['seconds'] * 1000:.1f} ms")
+            growth = current['rss_growth_mb'] - previous['rss_growth_mb']
+            if growth > RSS_NOISE_FLOOR_MB and current['rss_growth_mb'] > previous['rss_growth_mb'] * (1 + memory_tolerance):
+                regressions.append(f"{name} {benchmark}: RSS growth {previous['rss_growth_mb']:.0f} MB -> "
+                                   f"{current['rss_growth_mb']:.0f} MB")
+    return regressions
+
+
+def print_results(results, models):
+    print(f"{'case':<36} {'benchmark':<30} {'median ms':>10} {'MB/s':>9} {'peak RSS':>9} {'growth':>8} {'worker':>8}")
+    for name, benchmarks in results.items():
+        info = models[name]
+        print(f"{name}  ({info['size_mb']:.1f} MB, {info['total_parameters']:,} params)")
+        for benchmark, result in benchmarks.items():
+            throughput = f"{result['mb_per_sec']:.1f}" if result['mb_per_sec'] else '-'
+            print(f"{'':<36} {benchmark:<30} {result['seconds'] * 1000:>10.2f} {throughput:>9} "
+                  f"{result['peak_rss_mb']:>8.0f}M {result['rss_growth_mb']:>7.0f}M {result['worker_peak_rss_mb']:>7.0f}M")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='quick')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per benchmark')
+    parser.add_argument('--only', action='append', default=[],
+                        help='run only benchmarks or cases containing this text (repeatable)')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown (0.25 = 25%%)')
+    parser.add_argument('--memory-tolerance', type=float, default=0.25, help='allowed RSS growth increase')
+    parser.add_argument('--models-dir', help='keep generated models here and reuse them between runs')
+    parser.add_argument('--output', help='also write the results as JSON to this path')
+    args = parser.parse_args(argv)
+
+    models_dir = args.models_dir or tempfile.mkdtemp(prefix='bench-models-')
+    os.makedirs(models_dir, exist_ok=True)
+
+    results = {}
+    models = {}
+    try:
+        for case in PROFILES[args.profile]:
+            name = case_name(case)
+            benchmarks = [b for b in BENCHMARKS
+                          if not args.only or any(text in b or text in name for text in args.only)]
+            if not benchmarks:
+                continue
+
+            model_path = os.path.join(models_dir, f"{name}.h5")
+            info_path = model_path + '.json'
+            if not os.path.exists(info_path):
+                info = write_synthetic_model(model_path, **case)
+                with open(info_path, 'w') as f:
+                    json.dump(info, f)
+            with open(info_path) as f:
+                models[name] = {**json.load(f), 'size_mb': os.path.getsize(model_path) / (1024 * 1024)}
+
+            results[name] = {}
+            for benchmark in benchmarks:
+                print(f"{name}: {benchmark}...", file=sys.stderr, flush=True)
+                results[name][benchmark] = run_benchmark(benchmark, model_path, args.repeat)
+    finally:
+        if not args.models_dir:
+            shutil.rmtree(models_dir, ignore_errors=True)
+
+    print_results(results, models)
+    report = {
+        'profile': args.profile,
+        'machine': {'platform': platform.platform(), 'python': platform.python_version(),
+                    'cpus': os.cpu_count()},
+        'models': models,
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        # Merge, so a filtered run only replaces the numbers it measured
+        merged = baseline.get('results', {})
+        for name, benchmarks in results.items():
+            merged.setdefault(name, {}).update(benchmarks)
+        with open(args.baseline, 'w') as f:
+            json.dump({**report, 'results': merged}, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('machine') != report['machine']:
+        print(f"Note: {args.baseline} was recorded on a different machine "
+              f"({baseline.get('machine')}); re-record it with --update-baseline for meaningful comparisons")
+    regressions = find_regressions(results, baseline.get('results', {}), args.tolerance, args.memory_tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print(f"\nNo regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
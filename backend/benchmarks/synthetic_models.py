@@ -0,0 +1,124 @@
+import json
+import math
+
+import h5py
+import numpy as np
+
+
+WRITE_BLOCK_ELEMENTS = 4 * 1024 * 1024  # Values generated per write, so large tensors never sit in memory
+
+
+def _dense_layer(name, units):
+    return {
+        'class_name': 'Dense',
+        'config': {'name': name, 'units': units, 'activation': 'relu', 'use_bias': True}
+    }
+
+
+def _sequential(name, layers, input_dim=None):
+    config = {'name': name, 'layers': layers}
+    if input_dim is not None:
+        config['layers'] = [{'class_name': 'InputLayer',
+                             'config': {'name': f"{name}_input", 'batch_input_shape': [None, input_dim]}}] + layers
+    return {'class_name': 'Sequential', 'config': config}
+
+
+def _fill_dataset(dataset, rng):
+    """
+    Write random values in bounded slabs along the first axis
+    """
+    row_size = math.prod(dataset.shape[1:]) or 1
+    step = max(1, WRITE_BLOCK_ELEMENTS // row_size)
+    for start in range(0, dataset.shape[0], step):
+        stop = min(start + step, dataset.shape[0])
+        block = rng.standard_normal((stop - start,) + dataset.shape[1:], dtype=np.float32)
+        dataset[start:stop] = block * 0.05
+
+
+def _layer_units(layers, width, tensor_mb):
+    """
+    Units per Dense layer: `width` everywhere, except that the output layer is
+    widened so its kernel is `tensor_mb` megabytes of float32
+    """
+    units = [width] * layers
+    if tensor_mb and layers:
+        units[-1] = max(width, int(tensor_mb * 1024 * 1024 / 4 / width))
+    return units
+
+
+def write_synthetic_model(path, layers=10, depth=0, width=64, tensor_mb=0, chunked=False,
+                          keras_metadata=True, seed=0):
+    """
+    Write a Keras-style H5 model of `layers` Dense layers.
+
+    `depth` nests the layer stack inside that many Sequential sub-models (as
+    Keras does for models used as layers). `tensor_mb` widens the output
+    layer so its kernel reaches that size. `chunked` stores every tensor
+    with HDF5 chunking instead of contiguously. Without `keras_metadata` the
+    file carries only the weight groups, which sends the parser down the
+    generic `visititems` walk. Returns a description of what was written.
+    """
+    rng = np.random.default_rng(seed)
+    units = _layer_units(layers, width, tensor_mb)
+    layer_names = [f"dense_{i}" for i in range(layers)]
+
+    with h5py.File(path, 'w') as model_file:
+        weights_root = model_file.create_group('model_weights')
+
+        # Nested sub-models own one group at the top and prefix every weight name
+        prefixes = [f"sequential_{level + 1}" for level in range(depth)]
+        top_names = prefixes[:1] or layer_names
+        container = weights_root.create_group(prefixes[0]) if prefixes else weights_root
+
+        weight_names = []
+        fan_in = width
+        total_parameters = 0
+        largest_tensor = 0
+        for name, out_units in zip(layer_names, units):
+            inner = '/'.join(prefixes[1:] + [name])
+            group = container.require_group(inner) if prefixes else container.create_group(name)
+            layer_weights = []
+            for weight, shape in (('kernel:0', (fan_in, out_units)), ('bias:0', (out_units,))):
+                # chunks=True lets h5py pick the chunk shape
+                dataset = group.create_dataset(weight, shape=shape, dtype='float32', chunks=True if chunked else None)
+                _fill_dataset(dataset, rng)
+                layer_weights.append(f"{inner}/{weight}" if prefixes else f"{name}/{weight}")
+                total_parameters += math.prod(shape)
+                largest_tensor = max(largest_tensor, math.prod(shape) * 4)
+            if prefixes:
+                weight_names.extend(layer_weights)
+            else:
+                group.attrs['weight_names'] = [w.encode('utf-8') for w in layer_weights]
+            fan_in = out_units
+
+        if prefixes:
+            container.attrs['weight_names'] = [w.encode('utf-8') for w in weight_names]
+
+        if keras_metadata:
+            weights_root.attrs['layer_names'] = [n.encode('utf-8') for n in top_names]
+            model_config = [_dense_layer(name, out_units) for name, out_units in zip(layer_names, units)]
+            for prefix in reversed(prefixes[1:]):
+                model_config = [_sequential(prefix, model_config)]
+            if prefixes:
+                model_config = _sequential('model', [_sequential(prefixes[0], model_config)], input_dim=width)
+            else:
+                model_config = _sequential('model', model_config, input_dim=width)
+
+            model_file.attrs['model_config'] = json.dumps(model_config)
+            model_file.attrs['training_config'] = json.dumps({
+                'optimizer_config': {'class_name': 'Adam', 'config': {'learning_rate': 0.001}},
+                'loss': 'categorical_crossentropy'
+            })
+            model_file.attrs['keras_version'] = '2.15.0'
+            model_file.attrs['backend'] = 'tensorflow'
+
+    return {
+        'layers': layers,
+        'depth': depth,
+        'width': width,
+        'tensor_mb': tensor_mb,
+        'chunked': chunked,
+        'keras_metadata': keras_metadata,
+        'total_parameters': total_parameters,
+        'largest_tensor_bytes': largest_tensor
+    }
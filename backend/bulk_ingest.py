@@ -0,0 +1,281 @@
+"""
+Catalogue a directory tree of model files offline.
+
+Run from the backend folder:
+
+    python bulk_ingest.py /archive/checkpoints --output catalog.ndjson
+    python bulk_ingest.py /archive/checkpoints --output catalog.ndjson --workers 16
+
+Every supported model file (.h5, .keras, .safetensors, .onnx) under the
+root is hashed and summarized with app.extract_model_summary on a process
+pool, one file per task. Results are appended to the output as one JSON
+line per file and flushed as they arrive. Running again with the same
+output resumes the catalogue: files already recorded (same path, size and
+mtime) are skipped, and files whose content hash was already seen are
+recorded as duplicates without being parsed again. A file that crashes
+its worker process is recorded as an error; the other files that were on
+the pool at the time are rerun.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.model_formats import model_format
+from utils.summary_cache import hash_file
+
+
+PROGRESS_INTERVAL = 5.0  # Seconds between progress lines
+TASKS_PER_WORKER = 2  # Tasks kept queued per worker, so the pool never idles
+
+
+def find_model_files(root):
+    """
+    Yield (path, size, mtime_ns) of every supported model file under `root`, in a stable order
+    """
+    for directory, subdirs, files in os.walk(root):
+        subdirs.sort()
+        for name in sorted(files):
+            if model_format(name) is None:
+                continue
+            path = os.path.join(directory, name)
+            stat = os.stat(path)
+            yield path, stat.st_size, stat.st_mtime_ns
+
+
+def load_catalog(output_path):
+    """
+    Read the records of an earlier run. Returns ({(path, size, mtime_ns), ...},
+    {content_hash: path}). A half-written last line from an interrupted run
+    is cut off so appending continues on a clean line.
+    """
+    done = set()
+    hashes = {}
+    if not os.path.exists(output_path):
+        return done, hashes
+
+    good_bytes = 0
+    with open(output_path, 'rb') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if not line.endswith(b'\n'):
+                break
+            good_bytes += len(line)
+            done.add((record['path'], record['size'], record['mtime_ns']))
+            if record.get('status') == 'ok':
+                hashes.setdefault(record['content_hash'], record['path'])
+
+    if good_bytes < os.path.getsize(output_path):
+        with open(output_path, 'r+b') as f:
+            f.truncate(good_bytes)
+    return done, hashes
+
+
+def hash_task(path):
+    start = time.perf_counter()
+    return hash_file(path), time.perf_counter() - start
+
+
+def summary_task(path):
+    """
+    Runs in a worker: the same extraction the upload jobs use
+    """
+    import app as app_module
+
+    start = time.perf_counter()
+    model_summary = app_module.extract_model_summary(path)
+    return model_summary, time.perf_counter() - start
+
+
+class Progress:
+    def __init__(self, total_files, total_bytes, interval=PROGRESS_INTERVAL):
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.interval = interval
+        self.files = 0
+        self.bytes = 0
+        self.counts = {'ok': 0, 'duplicate': 0, 'error': 0}
+        self.start = time.perf_counter()
+        self.last_report = self.start
+
+    def add(self, record):
+        self.files += 1
+        self.bytes += record['size']
+        self.counts[record['status']] += 1
+        if time.perf_counter() - self.last_report >= self.interval:
+            self.report()
+
+    def report(self, final=False):
+        self.last_report = time.perf_counter()
+        elapsed = max(self.last_report - self.start, 1e-9)
+        mb_per_sec = self.bytes / (1024 * 1024) / elapsed
+        line = (f"{self.files}/{self.total_files} files, {self.bytes / (1024 * 1024):.1f} MB in {elapsed:.1f}s "
+                f"({self.files / elapsed:.1f} files/s, {mb_per_sec:.1f} MB/s); "
+                f"{self.counts['ok']} ok, {self.counts['duplicate']} duplicate, {self.counts['error']} failed")
+        if not final and self.bytes:
+            remaining = (self.total_bytes - self.bytes) / (self.bytes / elapsed)
+            line += f", ~{remaining:.0f}s left"
+        print(line, file=sys.stderr, flush=True)
+
+
+def ingest(root, output_path, workers=None, interval=PROGRESS_INTERVAL):
+    """
+    Catalogue `root` into `output_path`; returns the Progress of this run
+    """
+    done, hashes = load_catalog(output_path)
+    pending = [entry for entry in find_model_files(root)
+               if (os.path.relpath(entry[0], root), entry[1], entry[2]) not in done]
+    print(f"{len(done)} files already catalogued, {len(pending)} to go", file=sys.stderr, flush=True)
+
+    progress = Progress(len(pending), sum(size for _, size, _ in pending), interval)
+    workers = workers or os.cpu_count() or 1
+
+    # Workers import the app; keep its uploads, registry and caches out of the real ones
+    scratch = tempfile.mkdtemp(prefix='bulk-ingest-')
+    os.environ['UPLOAD_FOLDER'] = os.path.join(scratch, 'uploads')
+    os.environ['CACHE_FOLDER'] = os.path.join(scratch, 'cache')
+
+    queue = iter(pending)
+    parsing = {}  # content_hash -> record waiting for its summary
+    in_flight = {}
+    suspects = []  # Tasks lost with a crashed worker, rerun one at a time to find the culprit
+    tasks = {'hash': hash_task, 'summary': summary_task}
+    pool = None
+
+    def start_pool():
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+    try:
+        with open(output_path, 'a', encoding='utf-8') as output:
+            pool = start_pool()
+
+            def write(record):
+                output.write(json.dumps(record, separators=(',', ':')) + '\n')
+                output.flush()
+                progress.add(record)
+
+            def fail(stage, record, error):
+                if stage == 'summary':
+                    del parsing[record['content_hash']]
+                write({**record, 'status': 'error', 'error': error})
+
+            def rebuild():
+                """
+                A worker died (segfault, OOM kill) and took every task on the pool
+                with it. A task that was running alone is the cause and is recorded
+                as an error; otherwise all of them are rerun in isolation.
+                """
+                nonlocal pool
+                pool.shutdown(wait=True, cancel_futures=True)
+                pool = start_pool()
+                lost = list(in_flight.values())
+                in_flight.clear()
+                if len(lost) == 1:
+                    stage, _, record = lost[0]
+                    fail(stage, record, 'Worker process crashed')
+                else:
+                    suspects.extend(lost)
+
+            def submit(stage, path, record):
+                try:
+                    in_flight[pool.submit(tasks[stage], path)] = (stage, path, record)
+                except BrokenProcessPool:
+                    # The pool broke after the last wait(); this task never reached it
+                    suspects.append((stage, path, record))
+                    rebuild()
+
+            def refill():
+                while len(in_flight) < workers * TASKS_PER_WORKER:
+                    if suspects:
+                        if not in_flight:
+                            submit(*suspects.pop(0))
+                        return
+                    entry = next(queue, None)
+                    if entry is None:
+                        return
+                    path, size, mtime_ns = entry
+                    record = {
+                        'path': os.path.relpath(path, root),
+                        'size': size,
+                        'mtime_ns': mtime_ns,
+                        'format': model_format(path)
+                    }
+                    submit('hash', path, record)
+
+            refill()
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                crashed = False
+                for future in finished:
+                    if future not in in_flight:
+                        continue  # Requeued by a rebuild() earlier in this batch
+                    try:
+                        result, seconds = future.result()
+                    except BrokenProcessPool:
+                        # Left in flight for rebuild() to requeue
+                        crashed = True
+                        continue
+                    except Exception as e:
+                        stage, _, record = in_flight.pop(future)
+                        fail(stage, record, str(e))
+                        continue
+
+                    stage, path, record = in_flight.pop(future)
+                    if stage == 'hash':
+                        record['content_hash'] = result
+                        record['hash_seconds'] = round(seconds, 4)
+                        if result in hashes or result in parsing:
+                            original = hashes.get(result) or parsing[result]['path']
+                            write({**record, 'status': 'duplicate', 'duplicate_of': original})
+                        else:
+                            # Files with the same content that finish hashing meanwhile become duplicates
+                            parsing[result] = record
+                            submit('summary', path, record)
+                        continue
+
+                    del parsing[record['content_hash']]
+                    record['parse_seconds'] = round(seconds, 4)
+                    if 'error' in result:
+                        write({**record, 'status': 'error', 'error': result['error']})
+                    else:
+                        hashes[record['content_hash']] = record['path']
+                        write({**record, 'status': 'ok', 'summary': result})
+                if crashed:
+                    rebuild()
+                refill()
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    progress.report(final=True)
+    return progress
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('root', help='Directory to walk for model files')
+    parser.add_argument('--output', default='catalog.ndjson', help='NDJSON catalogue to create or resume')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--progress-interval', type=float, default=PROGRESS_INTERVAL,
+                        help='Seconds between progress lines')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        parser.error(f"{args.root} is not a directory")
+
+    progress = ingest(args.root, args.output, args.workers, args.progress_interval)
+    sys.exit(1 if progress.counts['error'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from utils.explainers import explain, make_segments
+
+
+class LinearModel:
+    """
+    Stand-in for NumpyModel: two outputs, both linear in the input
+    """
+
+    def __init__(self, input_shape):
+        self.input_shape = input_shape
+        self.coef = np.random.default_rng(0).standard_normal(input_shape)
+
+    def predict(self, batch, batch_size=None):
+        score = (batch * self.coef).reshape(len(batch), -1).sum(axis=1)
+        return np.stack([score, -score], axis=1)
+
+
+@pytest.mark.parametrize('shape, grid, expected', [
+    ((100, 3), 8, (8, 3)),
+    ((5, 5, 3), 8, (5, 5)),
+    ((32, 32, 3), 8, (8, 8)),
+])
+def test_segments_are_dense_and_clamped_per_axis(shape, grid, expected):
+    segments = make_segments(shape, grid)
+    assert segments.shape == shape[:2]
+    assert np.array_equal(np.unique(segments), np.arange(expected[0] * expected[1]))
+
+
+@pytest.mark.parametrize('method', ['lime', 'shap'])
+@pytest.mark.parametrize('shape, expected', [((100, 3), [8, 3]), ((5, 5, 3), [5, 5])])
+def test_explain_inputs_smaller_than_the_grid(method, shape, expected):
+    model = LinearModel(shape)
+    sample = np.random.default_rng(1).standard_normal(shape).astype(np.float32)
+
+    result = explain(method, model, sample, grid=8, num_samples=64)
+
+    assert result['segments']['grid'] == expected
+    assert result['segments']['count'] == expected[0] * expected[1]
+    assert np.array(result['weights']).shape == tuple(expected)
+
+
+def test_explain_rejects_non_integer_grid():
+    model = LinearModel((8, 8, 3))
+    with pytest.raises(ValueError):
+        explain('lime', model, np.zeros((8, 8, 3), np.float32), grid=4.5)
@@ -0,0 +1,174 @@
+import json
+
+from utils.metrics import SUMMARY_BUDGETED_BYTES, SUMMARY_LAYERS_OMITTED, SUMMARY_TRUNCATIONS
+
+
+BYTES_PER_TOKEN = 4  # Rough size of an LLM token in UTF-8 JSON
+MAX_TRIMMED_WEIGHTS = 3  # Weights kept per layer at the 'weights' detail level
+
+# Compact separators: what we measure is exactly what we send
+_encode = json.JSONEncoder(separators=(',', ':')).encode
+
+
+def _trimmed_weights(layer):
+    return [
+        {'name': w.get('name'), 'shape': w.get('shape'), 'parameters': w.get('parameters', 0)}
+        for w in layer.get('weights', [])[:MAX_TRIMMED_WEIGHTS]
+    ]
+
+
+def _detailed(layer):
+    projected = {
+        'name': layer.get('name', 'Unknown Layer'),
+        'type': layer.get('type', 'Unknown'),
+        'parameters': layer.get('parameters', 0)
+    }
+    if 'inbound' in layer:
+        projected['inbound'] = layer['inbound']
+    return projected
+
+
+# Layer projections from richest to leanest
+LAYER_PROJECTIONS = {
+    'full': lambda layer: layer,
+    'weights': lambda layer: {**_detailed(layer), 'weights': _trimmed_weights(layer)},
+    'detailed': _detailed,
+    'brief': lambda layer: {
+        'name': layer.get('name', 'Unknown Layer'),
+        'parameters': layer.get('parameters', 0)
+    },
+    'names': lambda layer: {'name': layer.get('name', 'Unknown Layer')}
+}
+
+DETAIL_LEVELS = tuple((level, None) for level in LAYER_PROJECTIONS)
+
+
+def encoded_size(value):
+    return len(_encode(value).encode('utf-8'))
+
+
+def tokens_to_bytes(max_tokens):
+    return max_tokens * BYTES_PER_TOKEN
+
+
+def _header(summary, level, omitted):
+    header = {k: v for k, v in summary.items() if k != 'layers'}
+    if omitted:
+        header['truncation'] = {'detail_level': level, 'layers_omitted': omitted}
+    return header
+
+
+def plan_summary(summary, budget, levels=DETAIL_LEVELS):
+    """
+    Choose how much of a summary fits in `budget` bytes of compact JSON.
+
+    `levels` is a sequence of (detail_level, max_layers) from richest to
+    leanest. Every layer's encoded cost is measured once per level in a single
+    pass, so the plan is linear in the number of layers. The richest level that
+    fits all of its layers wins; otherwise the leanest level keeps the longest
+    prefix that fits. A level's max_layers cap counts as fitting once the
+    capped prefix fits. Returns (level, layer_count) or None if even the header
+    does not fit.
+    """
+    plan = _plan_summary(summary, budget, levels)
+    if plan is None:
+        SUMMARY_TRUNCATIONS.inc(level='none')
+        return None
+
+    level, count, size = plan
+    SUMMARY_TRUNCATIONS.inc(level=level)
+    SUMMARY_BUDGETED_BYTES.observe(size)
+    omitted = len(summary.get('layers', [])) - count
+    if omitted:
+        SUMMARY_LAYERS_OMITTED.inc(omitted)
+    return level, count
+
+
+def _plan_summary(summary, budget, levels):
+    # Returns (level, layer_count, estimated encoded size) or None
+    layers = summary.get('layers', [])
+
+    # Reserve room for the truncation note at its worst case
+    worst_header = _header(summary, max((lvl for lvl, _ in levels), key=len), len(layers))
+    header_cost = encoded_size(worst_header) + len(',"layers":[]')
+
+    totals = [header_cost] * len(levels)
+    fits = [0] * len(levels)
+    caps = [min(cap, len(layers)) if cap is not None else len(layers) for _, cap in levels]
+    open_levels = set(range(len(levels)))
+
+    for index, layer in enumerate(layers):
+        if not open_levels:
+            break
+        for i in list(open_levels):
+            if index >= caps[i]:
+                open_levels.discard(i)
+                continue
+            level = levels[i][0]
+            cost = encoded_size(LAYER_PROJECTIONS[level](layer)) + (1 if index else 0)
+            if totals[i] + cost > budget:
+                open_levels.discard(i)
+                continue
+            totals[i] += cost
+            fits[i] = index + 1
+
+    if header_cost > budget:
+        return None
+
+    for i, (level, _) in enumerate(levels):
+        if fits[i] == caps[i]:
+            return level, fits[i], totals[i]
+    return levels[-1][0], fits[-1], totals[-1]
+
+
+def budget_summary(summary, budget, levels=DETAIL_LEVELS):
+    """
+    Return a copy of `summary` whose compact JSON encoding fits in `budget` bytes,
+    or None when not even the model-level fields fit
+    """
+    plan = plan_summary(summary, budget, levels)
+    if plan is None:
+        return None
+
+    level, count = plan
+    layers = summary.get('layers', [])
+    budgeted = _header(summary, level, len(layers) - count)
+    budgeted['layers'] = [LAYER_PROJECTIONS[level](layer) for layer in layers[:count]]
+    return budgeted
+
+
+def _stream_plan(summary, budget, levels):
+    if budget is None:
+        return 'full', len(summary.get('layers', []))
+    plan = plan_summary(summary, budget, levels)
+    return plan if plan is not None else (levels[-1][0], 0)
+
+
+def iter_summary_json(summary, budget=None, levels=DETAIL_LEVELS):
+    """
+    Stream a (budgeted) summary as compact JSON text, one layer per chunk
+    """
+    level, count = _stream_plan(summary, budget, levels)
+    layers = summary.get('layers', [])
+    header = _encode(_header(summary, level, len(layers) - count))
+    project = LAYER_PROJECTIONS[level]
+
+    yield header[:-1] + (',"layers":[' if header != '{}' else '"layers":[')
+    for index, layer in enumerate(layers[:count]):
+        yield (',' if index else '') + _encode(project(layer))
+    yield ']}'
+
+
+def iter_summary_ndjson(summary, budget=None, levels=DETAIL_LEVELS):
+    """
+    Stream a (budgeted) summary as newline-delimited JSON: the model-level
+    fields first, then one layer per line, so clients can render layers
+    without parsing the whole document
+    """
+    level, count = _stream_plan(summary, budget, levels)
+    layers = summary.get('layers', [])
+    project = LAYER_PROJECTIONS[level]
+
+    yield _encode(_header(summary, level, len(layers) - count)) + '\n'
+    for layer in layers[:count]:
+        yield _encode(project(layer)) + '\n'
@@ -0,0 +1,218 @@
+import os
+import re
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import threading
+
+from utils.model_formats import model_format, sniff_format
+
+
+STREAM_BLOCK_SIZE = 1024 * 1024  # Copy request bodies to disk 1 MB at a time
+SESSION_MAX_AGE = 24 * 60 * 60  # Abandoned uploads are discarded after a day
+
+
+class UploadError(ValueError):
+    """
+    Upload protocol violation; carries the HTTP status the route should return
+    """
+
+    def __init__(self, message, status_code=400, offset=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.offset = offset
+
+
+def check_model_signature(header, filename):
+    """
+    The content's signature must match the format its extension claims, as on /upload
+    """
+    if sniff_format(header) != model_format(filename):
+        extension = os.path.splitext(filename)[1].lstrip('.').lower()
+        raise UploadError(f"File is not a valid .{extension} model", 415)
+
+
+class ChunkedUploadManager:
+    """
+    Resumable init / append / finalize uploads staged on disk.
+
+    Each session is a `<id>.part` file plus a `<id>.json` descriptor, so an
+    interrupted transfer can resume from the bytes already on disk even after
+    a server restart. Chunks are streamed straight to the part file with
+    bounded memory while a SHA-256 of the content is updated incrementally.
+    """
+
+    def __init__(self, staging_dir, max_bytes, validate_header=check_model_signature):
+        self.staging_dir = staging_dir
+        self.max_bytes = max_bytes
+        self.validate_header = validate_header
+        self._hashers = {}  # upload_id -> (hashed_offset, hashlib object)
+        self._locks = {}
+        self._lock = threading.Lock()
+
+        if not os.path.exists(staging_dir):
+            os.makedirs(staging_dir)
+
+    def _paths(self, upload_id):
+        # Ids are generated by us; reject anything that could escape the staging dir
+        if not upload_id.isalnum():
+            raise UploadError('Unknown upload', 404)
+        base = os.path.join(self.staging_dir, upload_id)
+        return f"{base}.part", f"{base}.json"
+
+    def _session_lock(self, upload_id):
+        with self._lock:
+            return self._locks.setdefault(upload_id, threading.Lock())
+
+    def _load(self, upload_id):
+        part_path, meta_path = self._paths(upload_id)
+        try:
+            with open(meta_path, 'r') as f:
+                session = json.load(f)
+        except (OSError, ValueError):
+            raise UploadError('Unknown upload', 404)
+        session['offset'] = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        return session
+
+    def _hasher_at(self, upload_id, part_path, offset):
+        """
+        Return a SHA-256 object covering exactly the first `offset` bytes of the part file
+        """
+        hashed_offset, hasher = self._hashers.get(upload_id, (0, None))
+        if hasher is None or hashed_offset != offset:
+            # Lost the running hash (restart, or an earlier chunk was cut short): rebuild it
+            hasher = hashlib.sha256()
+            remaining = offset
+            with open(part_path, 'rb') as f:
+                while remaining > 0:
+                    block = f.read(min(STREAM_BLOCK_SIZE, remaining))
+                    if not block:
+                        break
+                    hasher.update(block)
+                    remaining -= len(block)
+        return hasher
+
+    def cleanup(self, max_age=SESSION_MAX_AGE):
+        """
+        Remove sessions that have not been touched for `max_age` seconds
+        """
+        cutoff = time.time() - max_age
+        for entry in os.scandir(self.staging_dir):
+            if entry.name.endswith(('.part', '.json')) and entry.stat().st_mtime < cutoff:
+                upload_id = entry.name.rsplit('.', 1)[0]
+                self._hashers.pop(upload_id, None)
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def init(self, filename, total_size, expected_sha256=None):
+        """
+        Start an upload session for `filename` of `total_size` bytes
+        """
+        if not isinstance(total_size, int) or total_size <= 0:
+            raise UploadError('A positive total size is required')
+        if total_size > self.max_bytes:
+            raise UploadError(
+                f"File size exceeds maximum limit of {self.max_bytes // (1024 * 1024)} MB", 413)
+
+        if expected_sha256 is not None and not (
+                isinstance(expected_sha256, str) and re.fullmatch(r'[0-9a-fA-F]{64}', expected_sha256)):
+            raise UploadError('sha256 must be a 64-character hex digest')
+
+        self.cleanup()
+
+        upload_id = uuid.uuid4().hex
+        part_path, meta_path = self._paths(upload_id)
+        session = {
+            'upload_id': upload_id,
+            'filename': filename,
+            'size': total_size,
+            'sha256': expected_sha256.lower() if expected_sha256 is not None else None,
+            'created_at': time.time()
+        }
+        open(part_path, 'wb').close()
+        with open(meta_path, 'w') as f:
+            json.dump(session, f)
+
+        session['offset'] = 0
+        return session
+
+    def status(self, upload_id):
+        return self._load(upload_id)
+
+    def append(self, upload_id, offset, stream):
+        """
+        Append the bytes read from `stream` at `offset`, which must equal the
+        number of bytes already received. Returns the new offset.
+        """
+        with self._session_lock(upload_id):
+            session = self._load(upload_id)
+            part_path, _ = self._paths(upload_id)
+
+            if offset != session['offset']:
+                raise UploadError(
+                    f"Expected offset {session['offset']}, got {offset}", 409, session['offset'])
+
+            hasher = self._hasher_at(upload_id, part_path, offset)
+            written = offset
+            try:
+                with open(part_path, 'ab') as f:
+                    while True:
+                        block = stream.read(STREAM_BLOCK_SIZE)
+                        if not block:
+                            break
+
+                        if written + len(block) > session['size']:
+                            raise UploadError('Chunk runs past the declared file size', 413, written)
+
+                        # Validate the payload type before anything beyond the header hits the disk
+                        if written == 0 and self.validate_header is not None:
+                            self.validate_header(block, session['filename'])
+
+                        f.write(block)
+                        hasher.update(block)
+                        written += len(block)
+            finally:
+                # Whatever reached the disk is a valid prefix; resume from there
+                self._hashers[upload_id] = (written, hasher)
+
+            return written
+
+    def finalize(self, upload_id, dest_path):
+        """
+        Verify the completed upload and move it to `dest_path`.
+        Returns (size, sha256 hex digest).
+        """
+        with self._session_lock(upload_id):
+            session = self._load(upload_id)
+            part_path, meta_path = self._paths(upload_id)
+
+            if session['offset'] != session['size']:
+                raise UploadError(
+                    f"Upload incomplete: {session['offset']} of {session['size']} bytes",
+                    409, session['offset'])
+
+            content_hash = self._hasher_at(upload_id, part_path, session['offset']).hexdigest()
+            if session['sha256'] and session['sha256'] != content_hash:
+                self.abort(upload_id)
+                raise UploadError('Checksum mismatch; upload discarded', 422)
+
+            shutil.move(part_path, dest_path)
+            os.remove(meta_path)
+            self._hashers.pop(upload_id, None)
+
+        with self._lock:
+            self._locks.pop(upload_id, None)
+        return session['size'], content_hash
+
+    def abort(self, upload_id):
+        part_path, meta_path = self._paths(upload_id)
+        self._hashers.pop(upload_id, None)
+        for path in (part_path, meta_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,280 @@
+import json
+import time
+import hashlib
+
+import numpy as np
+
+from utils.numpy_runtime import COMPUTE_DTYPE, ModelPool, resize_images
+
+
+DEFAULT_GRID = 8  # Superpixels per side for image inputs
+MAX_GRID = 16
+MAX_FEATURE_SEGMENTS = 256  # 1-D inputs wider than this are grouped into contiguous runs
+DEFAULT_NUM_SAMPLES = {'lime': 1000, 'shap': 2048}
+MAX_NUM_SAMPLES = 20000
+EVAL_BATCH_SIZE = 32  # Perturbed inputs materialized and run at once
+PARALLEL_MIN_SAMPLES = 256  # Below this, shipping work to the pool costs more than it saves
+LIME_KERNEL_WIDTH = 0.25
+BASELINES = ('mean', 'zeros', 'segment_mean')
+EXPLANATION_VERSION = 2  # Bump when results change shape or value; cached explanations are keyed on it
+
+# Models loaded inside pool workers, reused across chunks of the same job
+_worker_models = ModelPool(max_models=2)
+
+
+def array_hash(array):
+    """
+    Content hash of an array, including its dtype and shape
+    """
+    array = np.ascontiguousarray(array)
+    digest = hashlib.sha256(f"{array.dtype.str}{array.shape}".encode('utf-8'))
+    digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def canonical_params(params):
+    return json.dumps({**params, 'version': EXPLANATION_VERSION}, sort_keys=True, separators=(',', ':'))
+
+
+def fit_input(sample, input_shape):
+    """
+    Bring one sample to the model's input shape; images of another size are resized
+    """
+    sample = np.asarray(sample, dtype=COMPUTE_DTYPE)
+    if not input_shape or None in input_shape or sample.shape == tuple(input_shape):
+        return sample
+    if sample.ndim == 3 and len(input_shape) == 3 and sample.shape[-1] == input_shape[-1]:
+        return resize_images(sample[None], input_shape[0], input_shape[1])[0]
+    raise ValueError(f"Expected input shape ({', '.join(map(str, input_shape))}), got {sample.shape}")
+
+
+def segment_grid(shape, grid=DEFAULT_GRID):
+    """
+    Superpixel rows and columns for an (H, W, ...) input: `grid` per axis,
+    fewer along an axis shorter than that
+    """
+    return min(grid, shape[0]), min(grid, shape[1])
+
+
+def make_segments(shape, grid=DEFAULT_GRID):
+    """
+    Segment label map with dense ids 0..n-1: a segment_grid layout of superpixels
+    for (H, W, ...) inputs, one segment per feature (or contiguous group) for 1-D inputs
+    """
+    if len(shape) >= 2:
+        grid_rows, grid_cols = segment_grid(shape, grid)
+        rows = np.arange(shape[0]) * grid_rows // shape[0]
+        cols = np.arange(shape[1]) * grid_cols // shape[1]
+        labels = rows[:, None] * grid_cols + cols[None, :]
+    else:
+        groups = min(shape[0], MAX_FEATURE_SEGMENTS)
+        labels = np.arange(shape[0]) * groups // shape[0]
+    # Ids without pixels would be counted as segments the perturbations can never switch
+    _, dense = np.unique(labels, return_inverse=True)
+    return dense.reshape(labels.shape)
+
+
+def make_baseline(sample, segments, kind='mean'):
+    """
+    Replacement values for 'switched off' segments
+    """
+    if kind == 'zeros':
+        return np.zeros_like(sample)
+    if kind == 'mean':
+        axes = tuple(range(segments.ndim))
+        return np.broadcast_to(sample.mean(axis=axes, keepdims=True), sample.shape).copy()
+    if kind == 'segment_mean':
+        # Every superpixel replaced by its own average colour
+        flat_segments = segments.ravel()
+        values = sample.reshape(flat_segments.size, -1)
+        counts = np.bincount(flat_segments)
+        sums = np.zeros((counts.size, values.shape[1]), dtype=np.float64)
+        np.add.at(sums, flat_segments, values)
+        return (sums / counts[:, None])[flat_segments].reshape(sample.shape).astype(COMPUTE_DTYPE)
+    raise ValueError(f"Unknown baseline: {kind}")
+
+
+def perturb(sample, baseline, segments, masks):
+    """
+    Materialize a batch of perturbed inputs: mask row i keeps segment j of
+    `sample` when masks[i, j] is set and takes `baseline` elsewhere
+    """
+    keep = masks[:, segments]
+    keep = keep.reshape(keep.shape + (1,) * (sample.ndim - segments.ndim))
+    return np.where(keep, sample, baseline)
+
+
+def evaluate_masks(model, sample, baseline, segments, masks, batch_size=EVAL_BATCH_SIZE):
+    """
+    Model outputs for every mask row, built and run one batch at a time so
+    only `batch_size` perturbed inputs exist in memory
+    """
+    outputs = None
+    for start in range(0, len(masks), batch_size):
+        batch = perturb(sample, baseline, segments, masks[start:start + batch_size])
+        predictions = model.predict(batch, batch_size=batch_size).reshape(len(batch), -1)
+        if outputs is None:
+            outputs = np.empty((len(masks), predictions.shape[1]), dtype=np.float64)
+        outputs[start:start + len(batch)] = predictions
+    return outputs
+
+
+def evaluate_chunk(file_path, content_hash, sample, baseline, segments, masks, batch_size=EVAL_BATCH_SIZE):
+    """
+    Worker-process entry point for one slice of the perturbation masks
+    """
+    model = _worker_models.get(content_hash, file_path)
+    return evaluate_masks(model, sample, baseline, segments, masks, batch_size)
+
+
+def weighted_lstsq(features, targets, weights):
+    """
+    Solve min ||sqrt(w) * (X b - Y)||² for every output column of Y at once
+    """
+    root = np.sqrt(weights)[:, None]
+    coef, _, _, _ = np.linalg.lstsq(features * root, targets * root, rcond=None)
+    return coef
+
+
+def _weighted_r2(features, targets, weights, coef):
+    residual = targets - features @ coef
+    mean = np.average(targets, axis=0, weights=weights)
+    total = (weights[:, None] * (targets - mean) ** 2).sum(axis=0)
+    explained = 1 - (weights[:, None] * residual ** 2).sum(axis=0) / np.where(total > 0, total, 1)
+    return np.where(total > 0, explained, 1.0)
+
+
+def lime(evaluate, n_segments, num_samples, rng, kernel_width=LIME_KERNEL_WIDTH):
+    """
+    LIME with random on/off superpixel masks and an exponential kernel on
+    cosine distance; the weighted linear surrogate is fitted for all outputs together
+    """
+    masks = rng.random((num_samples, n_segments)) < 0.5
+    masks[0] = True  # The unperturbed input anchors the fit
+    outputs = evaluate(masks)
+
+    active = masks.sum(axis=1)
+    distance = 1 - active / np.sqrt(np.maximum(active, 1) * n_segments)
+    weights = np.sqrt(np.exp(-distance ** 2 / kernel_width ** 2))
+
+    features = np.hstack([masks.astype(np.float64), np.ones((num_samples, 1))])
+    coef = weighted_lstsq(features, outputs, weights)
+    return {
+        'weights': coef[:-1],
+        'intercept': coef[-1],
+        'score': _weighted_r2(features, outputs, weights, coef),
+        'prediction': outputs[0]
+    }
+
+
+def kernel_shap(evaluate, n_segments, num_samples, rng):
+    """
+    KernelSHAP: coalition sizes drawn from the Shapley kernel (so every sample
+    has equal weight), complements paired for variance reduction, and the
+    efficiency constraint sum(phi) = f(x) - f(baseline) eliminated before the solve
+    """
+    sizes = np.arange(1, n_segments)
+    size_weights = (n_segments - 1) / (sizes * (n_segments - sizes))
+
+    half = max(1, num_samples // 2)
+    drawn = rng.choice(sizes, size=half, p=size_weights / size_weights.sum())
+    ranks = rng.random((half, n_segments)).argsort(axis=1)
+    coalitions = ranks < drawn[:, None]
+    coalitions = np.vstack([coalitions, ~coalitions])
+
+    edges = np.array([np.ones(n_segments, bool), np.zeros(n_segments, bool)])
+    outputs = evaluate(np.vstack([edges, coalitions]))
+    full, empty, sampled = outputs[0], outputs[1], outputs[2:]
+
+    z = coalitions.astype(np.float64)
+    total = full - empty
+    features = z[:, :-1] - z[:, -1:]
+    targets = sampled - empty - z[:, -1:] * total
+    phi_head = weighted_lstsq(features, targets, np.ones(len(z)))
+    phi = np.vstack([phi_head, total - phi_head.sum(axis=0)])
+
+    return {
+        'weights': phi,
+        'base_value': empty,
+        'prediction': full
+    }
+
+
+EXPLAINERS = {'lime': lime, 'shap': kernel_shap}
+
+
+def explain(method, model, sample, file_path=None, content_hash=None, grid=DEFAULT_GRID,
+            num_samples=None, baseline='mean', target=None, seed=0, executor=None, workers=1):
+    """
+    Explain one input with LIME or KernelSHAP over a superpixel grid.
+
+    Perturbations are generated as boolean mask matrices and evaluated in
+    batches; with an `executor`, large jobs are split across worker processes.
+    """
+    if method not in EXPLAINERS:
+        raise ValueError(f"Unknown explanation method: {method}")
+    # JSON numbers may arrive as floats or booleans, which break the segment indexing below
+    for name, value in (('grid', grid), ('num_samples', num_samples), ('seed', seed), ('target', target)):
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+            raise ValueError(f"{name} must be an integer")
+    if not 2 <= grid <= MAX_GRID:
+        raise ValueError(f"grid must be between 2 and {MAX_GRID}")
+    num_samples = num_samples or DEFAULT_NUM_SAMPLES[method]
+    if not 16 <= num_samples <= MAX_NUM_SAMPLES:
+        raise ValueError(f"num_samples must be between 16 and {MAX_NUM_SAMPLES}")
+    if baseline not in BASELINES:
+        raise ValueError(f"baseline must be one of: {', '.join(BASELINES)}")
+
+    sample = fit_input(sample, model.input_shape)
+    segments = make_segments(sample.shape, grid)
+    grid_shape = segment_grid(sample.shape, grid) if segments.ndim >= 2 else None
+    n_segments = int(segments.max()) + 1
+    if n_segments < 2:
+        raise ValueError('Input is too small to split into segments')
+    background = make_baseline(sample, segments, baseline)
+
+    evaluated = {'count': 0}
+
+    def evaluate(masks):
+        evaluated['count'] += len(masks)
+        if executor is None or workers <= 1 or len(masks) < PARALLEL_MIN_SAMPLES or file_path is None:
+            return evaluate_masks(model, sample, background, segments, masks)
+        chunks = np.array_split(masks, workers)
+        return np.vstack(list(executor.map(
+            evaluate_chunk, *zip(*[(file_path, content_hash, sample, background, segments, chunk)
+                                   for chunk in chunks if len(chunk)])
+        )))
+
+    start = time.perf_counter()
+    result = EXPLAINERS[method](evaluate, n_segments, num_samples, np.random.default_rng(seed))
+    elapsed = time.perf_counter() - start
+
+    prediction = result['prediction']
+    if target is None:
+        target = int(np.argmax(prediction))
+    if not 0 <= target < len(prediction):
+        raise ValueError(f"target must be between 0 and {len(prediction) - 1}")
+
+    weights = result['weights'][:, target]
+    explanation = {
+        'method': method,
+        'target': target,
+        'predicted_class': int(np.argmax(prediction)),
+        'prediction': prediction.tolist(),
+        'segments': {
+            'grid': list(grid_shape) if grid_shape else None,
+            'count': n_segments,
+            'input_shape': list(sample.shape)
+        },
+        'weights': (weights.reshape(grid_shape) if grid_shape else weights).tolist(),
+        'num_samples': num_samples,
+        'evaluations': evaluated['count'],
+        'elapsed_ms': round(elapsed * 1000, 3)
+    }
+    if method == 'lime':
+        explanation['intercept'] = float(result['intercept'][target])
+        explanation['score'] = float(result['score'][target])
+    else:
+        explanation['base_value'] = float(result['base_value'][target])
+    return explanation
+
@@ -0,0 +1,74 @@
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+
+MIN_COMPRESS_BYTES = 1024  # Smaller bodies cost more in headers and CPU than they save
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # Streaming-friendly; 11 is far slower for little gain on JSON
+FLUSH_EVERY_BYTES = 16 * 1024  # Streamed output is flushed to the client at least this often
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/x-ndjson', 'text/plain')
+
+
+def supported_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate_encoding(accept_encodings):
+    """
+    Pick the best content coding the client accepts ('br', 'gzip' or None)
+    from a werkzeug Accept-Encoding header
+    """
+    best = accept_encodings.best_match(supported_encodings())
+    return best if best and accept_encodings[best] > 0 else None
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class _StreamCompressor:
+    def __init__(self, encoding):
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            self.process = self._compressor.process
+            self.flush = self._compressor.flush
+            self.finish = self._compressor.finish
+        else:
+            # wbits=31 writes a gzip header and trailer
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+            self.process = self._compressor.compress
+            self.flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self.finish = self._compressor.flush
+
+
+def compress_stream(chunks, encoding, flush_every=FLUSH_EVERY_BYTES):
+    """
+    Compress an iterable of str/bytes chunks on the fly.
+
+    The first chunk and then every `flush_every` input bytes are flushed, so
+    the client can decode the head of the document (e.g. the first layers)
+    before the rest is produced.
+    """
+    compressor = _StreamCompressor(encoding)
+    pending = 0
+    first = True
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        out = compressor.process(chunk)
+        pending += len(chunk)
+        if first or pending >= flush_every:
+            out += compressor.flush()
+            pending = 0
+            first = False
+        if out:
+            yield out
+    yield compressor.finish()
@@ -0,0 +1,173 @@
+import os
+import time
+import uuid
+import threading
+import multiprocessing
+from collections import OrderedDict
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.metrics import REGISTRY, collect_metrics
+
+
+TERMINAL_STATES = ('succeeded', 'failed')
+
+
+class JobManager:
+    """
+    Run CPU-bound work (H5 parsing, statistics) on a bounded process pool and
+    track each submission as a job that clients can poll.
+
+    The pool is created lazily and uses the 'spawn' start method, since the
+    Flask server is multi-threaded and h5py state must not be forked. A pool
+    broken by a dying worker (e.g. a segfault in h5py) is replaced on next use.
+    """
+
+    def __init__(self, max_workers=None, max_jobs=1000):
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.max_jobs = max_jobs
+        self._executor = None
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    @property
+    def executor(self):
+        with self._lock:
+            # A worker that died abruptly leaves the pool unusable; start a fresh one
+            if self._executor is not None and getattr(self._executor, '_broken', False):
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def submit(self, func, *args, on_success=None, description=None):
+        """
+        Queue `func(*args)` on the pool and return a job id.
+
+        `on_success(result)` runs in the parent process once the worker
+        finishes; its return value becomes the job result and any exception
+        it raises marks the job as failed.
+        """
+        job_id = uuid.uuid4().hex
+        job = {
+            'id': job_id,
+            'description': description,
+            'status': 'queued',
+            'created_at': time.time(),
+            'finished_at': None,
+            'result': None,
+            'error': None,
+            'version': 0
+        }
+
+        with self._lock:
+            self._jobs[job_id] = job
+            # Forget the oldest finished jobs once the table is full; running ones are
+            # passed over, so a stuck job can't keep later results in memory
+            excess = len(self._jobs) - self.max_jobs
+            if excess > 0:
+                finished = list(islice((old_id for old_id, old_job in self._jobs.items()
+                                        if old_job['status'] in TERMINAL_STATES), excess))
+                for old_id in finished:
+                    del self._jobs[old_id]
+
+        # Metrics recorded in the worker come back with the result
+        try:
+            future = self._submit(collect_metrics, func, *args)
+        except BrokenProcessPool as e:
+            print(f"Job {job_id} could not be queued: {e}")
+            self._update(job_id, status='failed', error=f"Worker pool unavailable: {e}")
+            return job_id
+        job['future'] = future
+
+        def _finish(done_future):
+            try:
+                result, samples = done_future.result()
+                REGISTRY.merge(samples)
+                if on_success is not None:
+                    result = on_success(result)
+                self._update(job_id, status='succeeded', result=result)
+            except Exception as e:
+                print(f"Job {job_id} failed: {e}")
+                self._update(job_id, status='failed', error=str(e))
+
+        future.add_done_callback(_finish)
+        return job_id
+
+    def _submit(self, func, *args):
+        """
+        Submit to the pool, retrying once on a fresh pool if the current one
+        broke since it was last checked
+        """
+        executor = self.executor
+        try:
+            return executor.submit(func, *args)
+        except BrokenProcessPool:
+            self._discard(executor)
+            return self.executor.submit(func, *args)
+
+    def _discard(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _update(self, job_id, **changes):
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(changes)
+            if job['status'] in TERMINAL_STATES:
+                job['finished_at'] = time.time()
+            job['version'] += 1
+            self._changed.notify_all()
+
+    def _snapshot(self, job):
+        # Caller must hold the lock
+        status = job['status']
+        future = job.get('future')
+        if status == 'queued' and future is not None and future.running():
+            status = 'running'
+
+        snapshot = {k: v for k, v in job.items() if k != 'future'}
+        snapshot['status'] = status
+        return snapshot
+
+    def get(self, job_id):
+        """
+        Return a JSON-serializable view of a job, or None if it is unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job is not None else None
+
+    def wait_for_change(self, job_id, last_status, timeout=15.0, poll_interval=0.5):
+        """
+        Block until the job's status differs from `last_status` or `timeout`
+        elapses, then return the current snapshot (None if the job is unknown)
+        """
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return None
+                snapshot = self._snapshot(job)
+                remaining = deadline - time.monotonic()
+                if snapshot['status'] != last_status or remaining <= 0:
+                    return snapshot
+                # queued -> running is not signalled by the pool, so re-check periodically
+                self._changed.wait(min(poll_interval, remaining))
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
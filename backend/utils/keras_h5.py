@@ -0,0 +1,238 @@
+import json
+import math
+
+import numpy as np
+
+
+def decode_attr(value):
+    """
+    Normalize an HDF5 attribute (bytes, numpy strings or arrays of them) to str / list of str
+    """
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    if isinstance(value, np.ndarray):
+        return [decode_attr(v) for v in value.tolist()]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def load_json_attr(h5_obj, key):
+    """
+    Parse a JSON-encoded attribute, returning None if it is missing or malformed
+    """
+    if key not in h5_obj.attrs:
+        return None
+    try:
+        return json.loads(decode_attr(h5_obj.attrs[key]))
+    except (TypeError, ValueError):
+        return None
+
+
+def _find_keras_history(node, found):
+    # Keras 3 serializes inbound tensors as nested dicts carrying a keras_history triple
+    if isinstance(node, dict):
+        history = node.get('config', {}).get('keras_history') if isinstance(node.get('config'), dict) else None
+        if history:
+            found.append(history[0])
+            return
+        for value in node.values():
+            _find_keras_history(value, found)
+    elif isinstance(node, list):
+        for value in node:
+            _find_keras_history(value, found)
+
+
+def parse_inbound_nodes(inbound_nodes):
+    """
+    Return the names of the layers feeding a layer, for both Keras 2 and Keras 3 configs
+    """
+    inbound = []
+    for node in inbound_nodes or []:
+        if isinstance(node, dict):
+            # Keras 3: {"args": [...], "kwargs": {...}}
+            _find_keras_history(node, inbound)
+        elif isinstance(node, list):
+            # Keras 2: [["layer_name", node_index, tensor_index, {...}], ...]
+            for tensor in node:
+                if isinstance(tensor, list) and tensor and isinstance(tensor[0], str):
+                    inbound.append(tensor[0])
+                else:
+                    _find_keras_history(tensor, inbound)
+
+    # Preserve order but drop repeats (a layer may consume the same tensor twice)
+    return list(dict.fromkeys(inbound))
+
+
+def iter_config_layers(model_config):
+    """
+    Yield the top-level layers of a Keras model config in execution order as
+    dicts with name, class_name, config and inbound layer names
+    """
+    if not isinstance(model_config, dict):
+        return
+
+    config = model_config.get('config', {})
+    # Very old Sequential configs store the layer list directly
+    layers = config if isinstance(config, list) else config.get('layers', [])
+    functional = any('inbound_nodes' in layer for layer in layers)
+
+    previous = None
+    for layer in layers:
+        layer_config = layer.get('config', {})
+        name = layer.get('name') or layer_config.get('name')
+
+        if functional:
+            inbound = parse_inbound_nodes(layer.get('inbound_nodes'))
+        else:
+            inbound = [previous] if previous else []
+
+        yield {
+            'name': name,
+            'class_name': layer.get('class_name', 'Unknown'),
+            'config': layer_config,
+            'inbound': inbound
+        }
+        previous = name
+
+
+def find_weights_root(model_file):
+    """
+    Locate the group holding per-layer weights: `model_weights` for full models,
+    the file root for `save_weights` files
+    """
+    if 'model_weights' in model_file and 'layer_names' in model_file['model_weights'].attrs:
+        return model_file['model_weights']
+    if 'layer_names' in model_file.attrs:
+        return model_file
+    return None
+
+
+def layer_weight_shapes(weights_root, layer_name):
+    """
+    Return [(weight_name, shape, dtype), ...] for a layer using only HDF5 metadata
+    """
+    if weights_root is None or layer_name not in weights_root:
+        return []
+
+    group = weights_root[layer_name]
+    weight_names = decode_attr(group.attrs.get('weight_names', []))
+    if not isinstance(weight_names, list):
+        weight_names = [weight_names]
+
+    weights = []
+    for weight_name in weight_names:
+        if not isinstance(weight_name, str) or weight_name not in group:
+            continue
+        dataset = group[weight_name]
+        # Opening a dataset reads its header only; the payload stays on disk
+        weights.append((weight_name, tuple(dataset.shape), dataset.dtype))
+    return weights
+
+
+def _class_name(value):
+    if isinstance(value, dict):
+        return value.get('class_name') or value.get('config', {}).get('name')
+    return value
+
+
+def describe_training_config(training_config, default='Not specified'):
+    """
+    Return (optimizer, loss_function) from a Keras `training_config` /
+    `compile_config` dict
+    """
+    if not isinstance(training_config, dict):
+        return default, default
+
+    # Keras 2 writes optimizer_config, Keras 3's compile_config writes optimizer
+    optimizer = _class_name(training_config.get('optimizer_config') or training_config.get('optimizer'))
+
+    loss = training_config.get('loss')
+    if isinstance(loss, dict) and 'class_name' not in loss:
+        # Multi-output models map output names to losses
+        loss = ', '.join(f"{k}: {_class_name(v)}" for k, v in loss.items())
+    elif isinstance(loss, list):
+        loss = ', '.join(str(_class_name(v)) for v in loss)
+    else:
+        loss = _class_name(loss)
+    return optimizer or default, loss or default
+
+
+def read_training_config(model_file):
+    """
+    Return (optimizer, loss_function) from `training_config`, falling back to legacy attrs
+    """
+    optimizer, loss_function = describe_training_config(load_json_attr(model_file, 'training_config'))
+
+    if optimizer == 'Not specified' and 'optimizer' in model_file.attrs:
+        optimizer = decode_attr(model_file.attrs['optimizer'])
+    if loss_function == 'Not specified' and 'loss' in model_file.attrs:
+        loss_function = decode_attr(model_file.attrs['loss'])
+
+    return optimizer, loss_function
+
+
+def build_keras_summary(model_config, model_name, optimizer, loss_function, weight_shapes):
+    """
+    Build a model summary from a parsed Keras model config.
+
+    `weight_shapes(layer_name)` returns [(weight_name, shape, dtype), ...]
+    for a layer, so the weights can come from any container (an H5 file, a
+    `.keras` archive). Returns None when the config lists no layers.
+    """
+    if not isinstance(model_config, dict):
+        return None
+
+    config_layers = list(iter_config_layers(model_config))
+    if not config_layers:
+        return None
+
+    model_summary = {
+        'model_name': model_name,
+        'model_class': model_config.get('class_name', 'Unknown'),
+        'total_layers': len(config_layers),
+        'total_parameters': 0,
+        'optimizer': optimizer,
+        'loss_function': loss_function,
+        'layers': []
+    }
+
+    for layer in config_layers:
+        weights = []
+        layer_params = 0
+        for weight_name, shape, _ in weight_shapes(layer['name']):
+            weight_params = math.prod(shape)
+            layer_params += weight_params
+            weights.append({
+                'name': weight_name,
+                'shape': list(shape),
+                'parameters': weight_params
+            })
+
+        model_summary['layers'].append({
+            'name': layer['name'],
+            'type': layer['class_name'],
+            'parameters': layer_params,
+            'inbound': layer['inbound'],
+            'weights': weights
+        })
+        model_summary['total_parameters'] += layer_params
+
+    return model_summary
+
+
+def extract_keras_summary(model_file, model_name):
+    """
+    Build a model summary from Keras metadata (`model_config`, `training_config`,
+    `layer_names` / `weight_names`) and dataset shapes, without reading any weight payload.
+
+    Returns None when the file carries no usable Keras model config.
+    """
+    model_config = load_json_attr(model_file, 'model_config')
+    if not isinstance(model_config, dict):
+        return None
+
+    weights_root = find_weights_root(model_file)
+    optimizer, loss_function = read_training_config(model_file)
+    return build_keras_summary(model_config, model_name, optimizer, loss_function,
+                               lambda layer_name: layer_weight_shapes(weights_root, layer_name))
@@ -0,0 +1,296 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+import requests
+
+from utils.metrics import LLM_ANALYSES, LLM_UPSTREAM_SECONDS, RATE_LIMIT_RETRIES, RATE_LIMIT_SLEEP_SECONDS
+
+
+PROMPT_VERSION = 1  # Bump when the prompt changes; cached completions are keyed on it
+DEFAULT_GROQ_MODEL = 'llama-3.3-70b-versatile'
+GROQ_CHAT_URL = 'https://api.groq.com/openai/v1/chat/completions'
+UPSTREAM_TIMEOUT = 60  # Seconds to wait for the provider to connect or send the next chunk
+RETRYABLE_STATUSES = (408, 429, 500, 502, 503, 504)
+
+SYSTEM_PROMPT = 'You are a detailed AI assistant analyzing machine learning model architectures.'
+USER_PROMPT = """Provide a comprehensive analysis of this machine learning model summary:
+Model Name: {model_name}
+Total Layers: {total_layers}
+Total Parameters: {total_parameters}
+Optimizer: {optimizer}
+Loss Function: {loss_function}
+
+Detailed Layer Information:
+{layers}
+
+Provide insights into the model's architecture, potential strengths, and areas for optimization."""
+
+
+def summary_hash(summary):
+    """
+    Stable hash of the (budgeted) summary a prompt is built from
+    """
+    return hashlib.sha256(json.dumps(summary, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+def build_messages(summary):
+    return [
+        {'role': 'system', 'content': SYSTEM_PROMPT},
+        {'role': 'user', 'content': USER_PROMPT.format(
+            model_name=summary.get('model_name') or 'Unnamed Model',
+            total_layers=summary.get('total_layers'),
+            total_parameters=summary.get('total_parameters'),
+            optimizer=summary.get('optimizer'),
+            loss_function=summary.get('loss_function'),
+            layers=json.dumps(summary.get('layers', []), indent=2)
+        )}
+    ]
+
+
+class ProviderError(Exception):
+    """
+    Upstream failure; `retryable` ones (rate limits, server errors) are retried with backoff
+    """
+
+    def __init__(self, message, status_code=502, retryable=False, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class OpenAICompatibleProvider:
+    """
+    Streaming chat completions from an OpenAI-compatible API (Groq by default)
+    """
+
+    def __init__(self, api_key, model=DEFAULT_GROQ_MODEL, url=GROQ_CHAT_URL, timeout=UPSTREAM_TIMEOUT):
+        self.name = 'groq' if url == GROQ_CHAT_URL else 'openai-compatible'
+        self.api_key = api_key
+        self.model = model
+        self.url = url
+        self.timeout = timeout
+
+    def stream(self, messages, max_tokens, temperature):
+        """
+        Yield the completion's text deltas as they arrive
+        """
+        if not self.api_key:
+            raise ProviderError('No API key configured for the analysis provider', 503)
+        try:
+            response = requests.post(
+                self.url,
+                json={'model': self.model, 'messages': messages, 'max_tokens': max_tokens,
+                      'temperature': temperature, 'stream': True},
+                headers={'Authorization': f"Bearer {self.api_key}"},
+                stream=True,
+                timeout=self.timeout
+            )
+        except requests.RequestException as e:
+            raise ProviderError(f"Analysis provider unreachable: {e}", 502, retryable=True)
+
+        with response:
+            if response.status_code != 200:
+                try:
+                    message = response.json().get('error', {}).get('message')
+                except ValueError:
+                    message = None
+                retry_after = response.headers.get('Retry-After')
+                raise ProviderError(
+                    message or f"Analysis provider error {response.status_code}",
+                    response.status_code if response.status_code < 500 else 502,
+                    retryable=response.status_code in RETRYABLE_STATUSES,
+                    retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None
+                )
+
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                data = line[len('data:'):].strip()
+                if data == '[DONE]':
+                    return
+                choices = json.loads(data).get('choices') or [{}]
+                text = (choices[0].get('delta') or {}).get('content')
+                if text:
+                    yield text
+
+
+class StubProvider:
+    """
+    Offline stand-in that streams a canned analysis built from the prompt,
+    for development and tests without an upstream service
+    """
+
+    name = 'stub'
+    model = 'stub'
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+
+    def stream(self, messages, max_tokens, temperature):
+        # Requests stream from several threads at once
+        with self._calls_lock:
+            self.calls += 1
+        header = messages[-1]['content'].splitlines()[1:6]
+        text = "Stub analysis of the model.\n" + '\n'.join(line.strip() for line in header)
+        for word in text.split(' ')[:max_tokens]:
+            if self.delay:
+                time.sleep(self.delay)
+            yield word + ' '
+
+
+def provider_from_env():
+    """
+    LLM_PROVIDER=stub selects the offline stub; anything else talks to Groq
+    with GROQ_API_KEY (or the frontend's REACT_APP_GROQ_API_KEY)
+    """
+    if os.getenv('LLM_PROVIDER', 'groq').lower() == 'stub':
+        return StubProvider(delay=float(os.getenv('LLM_STUB_DELAY', '0')))
+    return OpenAICompatibleProvider(
+        os.getenv('GROQ_API_KEY') or os.getenv('REACT_APP_GROQ_API_KEY'),
+        model=os.getenv('GROQ_MODEL', DEFAULT_GROQ_MODEL)
+    )
+
+
+class _Flight:
+    """
+    One upstream completion shared by every request that asked for it
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self._changed = threading.Condition()
+
+    def append(self, text):
+        with self._changed:
+            self.chunks.append(text)
+            self._changed.notify_all()
+
+    def finish(self, error=None):
+        with self._changed:
+            self.done = True
+            self.error = error
+            self._changed.notify_all()
+
+    def follow(self, keepalive=None):
+        """
+        Yield every chunk from the start, then new ones as they arrive. With
+        `keepalive` seconds, yields None whenever that long passes without one.
+        """
+        position = 0
+        while True:
+            with self._changed:
+                while position >= len(self.chunks) and not self.done:
+                    if not self._changed.wait(keepalive) and keepalive is not None:
+                        break
+                chunks = self.chunks[position:]
+                finished = self.done
+            if not chunks and not finished:
+                yield None
+            for chunk in chunks:
+                yield chunk
+            position += len(chunks)
+            if finished:
+                if self.error is not None:
+                    raise self.error
+                return
+
+
+class AnalysisService:
+    """
+    Cached, coalesced and rate-limited model analyses.
+
+    Completions are cached by (summary hash, prompt version, model) through
+    `load` / `store`. Concurrent requests for the same key share one
+    upstream call: it runs on a background thread, so it completes (and is
+    cached) even if the client that started it disconnects, and late
+    joiners replay the tokens already received. At most `max_concurrent`
+    upstream calls run at once. Rate limits and server errors are retried
+    with jittered exponential backoff (honoring Retry-After) while the
+    concurrency slot is released, as long as no text has been streamed yet.
+    """
+
+    def __init__(self, provider, load, store, max_concurrent=2, max_retries=3,
+                 backoff_base=1.0, backoff_max=30.0, max_tokens=1024, temperature=0.7):
+        self.provider = provider
+        self.load = load
+        self.store = store
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def cache_key(self, summary):
+        return summary_hash(summary), PROMPT_VERSION, self.provider.model
+
+    def analyze(self, summary, keepalive=None):
+        """
+        Yield ('token', text) events, then ('done', info). A failed upstream
+        call raises ProviderError. With `keepalive`, idle periods yield
+        ('keepalive', None).
+        """
+        key = self.cache_key(summary)
+        cached = self.load(*key)
+        if cached is not None:
+            LLM_ANALYSES.inc(source='cache')
+            yield 'token', cached['text']
+            yield 'done', {'cached': True, 'coalesced': False, 'model': key[2], 'summary_hash': key[0]}
+            return
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                threading.Thread(target=self._complete, args=(key, build_messages(summary), flight),
+                                 daemon=True).start()
+        LLM_ANALYSES.inc(source='upstream' if leader else 'coalesced')
+
+        for chunk in flight.follow(keepalive):
+            yield ('keepalive', None) if chunk is None else ('token', chunk)
+        yield 'done', {'cached': False, 'coalesced': not leader, 'model': key[2], 'summary_hash': key[0]}
+
+    def _backoff(self, attempt, error):
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+        if error.retry_after is not None:
+            delay = max(delay, error.retry_after)
+        return delay
+
+    def _complete(self, key, messages, flight):
+        error = None
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    with self._slots, LLM_UPSTREAM_SECONDS.time(provider=self.provider.name):
+                        for text in self.provider.stream(messages, self.max_tokens, self.temperature):
+                            flight.append(text)
+                    break
+                except ProviderError as e:
+                    # Clients already hold the partial text, so a broken stream can't be replayed
+                    if not e.retryable or attempt == self.max_retries or flight.chunks:
+                        raise
+                    delay = self._backoff(attempt, e)
+                    RATE_LIMIT_RETRIES.inc()
+                    RATE_LIMIT_SLEEP_SECONDS.inc(delay)
+                    time.sleep(delay)
+            self.store(*key, {'text': ''.join(flight.chunks), 'created_at': time.time()})
+        except ProviderError as e:
+            error = e
+        except Exception as e:
+            error = ProviderError(f"Analysis failed: {e}", 502)
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.finish(error)
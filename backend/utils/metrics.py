@@ -0,0 +1,209 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+
+METRIC_PREFIX = 'model_insights_'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = tuple(2 ** k for k in range(8, 27, 2))  # 256 B .. 64 MB
+THROUGHPUT_BUCKETS = tuple(2 ** k for k in range(16, 33, 2))  # 64 KB/s .. 4 GB/s
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = METRIC_PREFIX + name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if len(labels) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def drain(self):
+        """
+        Return and reset the recorded values
+        """
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        super().__init__(f"{name}_total", documentation, labels)
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def merge(self, values):
+        with self._lock:
+            for key, amount in values.items():
+                self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_number(value)}"
+                for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def merge(self, values):
+        with self._lock:
+            for key, (counts, total) in values.items():
+                state = self._values.get(key)
+                if state is None:
+                    state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+                state[0] = [a + b for a, b in zip(state[0], counts)]
+                state[1] += total
+
+    def render(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+
+        lines = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_format_number(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_number(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Process-wide set of counters and histograms rendered in the Prometheus
+    text format.
+
+    Worker processes record into their own copy of the registry;
+    collect_metrics() ships what a task recorded back with its result and
+    merge() folds it into the server's registry.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+
+    def _add(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labels=()):
+        return self._add(Counter(name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, documentation, labels, buckets))
+
+    def drain(self):
+        samples = {name: metric.drain() for name, metric in self._metrics.items()}
+        return {name: values for name, values in samples.items() if values}
+
+    def merge(self, samples):
+        for name, values in samples.items():
+            metric = self._metrics.get(name)
+            if metric is not None:
+                metric.merge(values)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    'http_request_duration_seconds', 'Time spent handling a request, by route',
+    labels=('method', 'route', 'status'))
+H5_OPEN_SECONDS = REGISTRY.histogram(
+    'h5_open_seconds', 'Time to open an HDF5 file', labels=('operation',))
+H5_WALK_SECONDS = REGISTRY.histogram(
+    'h5_walk_seconds', 'Time to walk an HDF5 file into a summary', labels=('strategy',))
+H5_OBJECTS_VISITED = REGISTRY.counter(
+    'h5_objects_visited', 'HDF5 groups and datasets visited while summarizing', labels=('kind',))
+H5_BYTES_READ = REGISTRY.counter(
+    'h5_bytes_read', 'Dataset payload bytes read from HDF5 files', labels=('operation',))
+SUMMARY_TRUNCATIONS = REGISTRY.counter(
+    'summary_truncations', 'Budgeted serializer passes, by chosen detail level', labels=('level',))
+SUMMARY_LAYERS_OMITTED = REGISTRY.counter(
+    'summary_layers_omitted', 'Layers dropped from summaries to fit a budget')
+SUMMARY_BUDGETED_BYTES = REGISTRY.histogram(
+    'summary_budgeted_bytes', 'Estimated encoded size of budgeted summaries', buckets=SIZE_BUCKETS)
+RATE_LIMIT_RETRIES = REGISTRY.counter(
+    'rate_limit_retries', 'Upstream LLM calls retried after a rate limit or server error')
+RATE_LIMIT_SLEEP_SECONDS = REGISTRY.counter(
+    'rate_limit_sleep_seconds', 'Time spent backing off before retries')
+LLM_ANALYSES = REGISTRY.counter(
+    'llm_analyses', 'Analysis requests, by where the completion came from', labels=('source',))
+LLM_UPSTREAM_SECONDS = REGISTRY.histogram(
+    'llm_upstream_seconds', 'Time spent streaming a completion from the provider', labels=('provider',))
+UPLOAD_BYTES = REGISTRY.counter(
+    'upload_bytes', 'Model bytes received', labels=('kind',))
+UPLOAD_THROUGHPUT = REGISTRY.histogram(
+    'upload_throughput_bytes_per_second', 'Receive throughput of uploads and upload chunks',
+    labels=('kind',), buckets=THROUGHPUT_BUCKETS)
+
+
+def collect_metrics(func, *args):
+    """
+    Run `func(*args)` in a worker process and return (result, metrics it recorded)
+    """
+    REGISTRY.drain()  # Leftovers from tasks that didn't ship their metrics
+    result = func(*args)
+    return result, REGISTRY.drain()
@@ -0,0 +1,667 @@
+import math
+
+import h5py
+import numpy as np
+
+from utils.keras_h5 import find_weights_root, iter_config_layers, layer_weight_shapes, load_json_attr
+from utils.model_formats import model_format, read_keras_archive
+from utils.numpy_runtime import IDENTITY_LAYERS, NESTED_MODELS
+
+
+COST_MODEL_VERSION = 2  # Bump when profiles change; cached profiles are keyed on it
+COST_FORMATS = ('h5', 'keras')  # Formats that carry a layer graph to estimate from
+DEFAULT_DTYPE = 'float32'
+DTYPE_BYTES = {'float64': 8, 'float32': 4, 'float16': 2, 'bfloat16': 2, 'int8': 1}
+COST_METRICS = ('macs', 'flops', 'activation_bytes', 'peak_activation_bytes', 'weight_bytes', 'peak_memory_bytes')
+
+# Approximate FLOPs per element of an elementwise activation
+ACTIVATION_FLOPS = {
+    'linear': 0, 'relu': 1, 'relu6': 2, 'leaky_relu': 2, 'hard_sigmoid': 3, 'elu': 3, 'selu': 4,
+    'sigmoid': 4, 'tanh': 4, 'softplus': 3, 'softsign': 3, 'swish': 5, 'silu': 5, 'gelu': 8,
+    'exponential': 1, 'softmax': 5
+}
+
+# Layers that reinterpret their input's buffer instead of writing a new one
+VIEW_LAYERS = IDENTITY_LAYERS | {'Flatten', 'Reshape'}
+KERNEL_LAYERS = {'Dense', 'Conv1D', 'Conv2D', 'Conv3D'}  # Kernels shaped (..., input channels / groups, filters)
+MAX_INPUT_ELEMENTS = 2 ** 30  # Per input and sample; larger input_shape overrides are refused
+INT64_MAX = np.iinfo(np.int64).max
+
+
+class CostError(Exception):
+    """
+    A cost estimate that can't be made; carries the HTTP status to answer with
+    """
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _tuple(value, rank):
+    return tuple(value) if isinstance(value, (list, tuple)) else (value,) * rank
+
+
+def _activation_flops(activation, elements):
+    if isinstance(activation, dict):
+        activation = activation.get('config', {}).get('name') or activation.get('class_name')
+    return ACTIVATION_FLOPS.get((activation or 'linear').lower(), 1) * elements
+
+
+def _epilogue_flops(config, shape):
+    """
+    Bias add and fused activation of a Dense / convolution output
+    """
+    elements = math.prod(shape)
+    return (elements if config.get('use_bias', True) else 0) + _activation_flops(config.get('activation'), elements)
+
+
+def _split_channels(shape, config):
+    if config.get('data_format') == 'channels_first':
+        return shape[1:], shape[0]
+    return shape[:-1], shape[-1]
+
+
+def _join_channels(spatial, channels, config):
+    if config.get('data_format') == 'channels_first':
+        return (channels,) + tuple(spatial)
+    return tuple(spatial) + (channels,)
+
+
+def _window_output(sizes, window, strides, padding, dilation=None):
+    """
+    Spatial output size of a convolution or pooling window, as Keras computes it
+    """
+    dilation = dilation or (1,) * len(sizes)
+    out = []
+    for size, kernel, stride, rate in zip(sizes, window, strides, dilation):
+        if padding in ('same', 'causal'):
+            out.append(-(-size // stride))
+        else:
+            out.append((size - (kernel - 1) * rate - 1) // stride + 1)
+    if min(out) < 1:
+        raise CostError(f"Window {window} does not fit the input {tuple(sizes)}", 422)
+    return tuple(out)
+
+
+# --- per-layer rules: (config, input shapes) -> (output shape, MACs, other FLOPs) ---------------------
+
+def _dense(config, shapes):
+    shape = shapes[0]
+    out = shape[:-1] + (config['units'],)
+    return out, math.prod(shape) * config['units'], _epilogue_flops(config, out)
+
+
+def _conv(rank):
+    def rule(config, shapes):
+        spatial, channels = _split_channels(shapes[0], config)
+        kernel = _tuple(config['kernel_size'], rank)
+        out_spatial = _window_output(spatial, kernel, _tuple(config.get('strides', 1), rank),
+                                     config.get('padding', 'valid'), _tuple(config.get('dilation_rate', 1), rank))
+        filters = config['filters']
+        out = _join_channels(out_spatial, filters, config)
+        macs = math.prod(out_spatial) * filters * math.prod(kernel) * (channels // (config.get('groups') or 1))
+        return out, macs, _epilogue_flops(config, out)
+    return rule
+
+
+def _conv_transpose(rank):
+    def rule(config, shapes):
+        spatial, channels = _split_channels(shapes[0], config)
+        kernel = _tuple(config['kernel_size'], rank)
+        strides = _tuple(config.get('strides', 1), rank)
+        dilation = _tuple(config.get('dilation_rate', 1), rank)
+        if config.get('padding', 'valid') == 'same':
+            out_spatial = tuple(size * stride for size, stride in zip(spatial, strides))
+        else:
+            out_spatial = tuple(size * stride + max((k - 1) * rate + 1 - stride, 0)
+                                for size, k, stride, rate in zip(spatial, kernel, strides, dilation))
+        filters = config['filters']
+        out = _join_channels(out_spatial, filters, config)
+        # Every input position scatters a full kernel into the output
+        macs = math.prod(spatial) * channels * filters * math.prod(kernel) // (config.get('groups') or 1)
+        return out, macs, _epilogue_flops(config, out)
+    return rule
+
+
+def _depthwise_conv(rank, separable=False):
+    def rule(config, shapes):
+        spatial, channels = _split_channels(shapes[0], config)
+        kernel = _tuple(config['kernel_size'], rank)
+        out_spatial = _window_output(spatial, kernel, _tuple(config.get('strides', 1), rank),
+                                     config.get('padding', 'valid'), _tuple(config.get('dilation_rate', 1), rank))
+        depth = channels * config.get('depth_multiplier', 1)
+        macs = math.prod(out_spatial) * depth * math.prod(kernel)
+        if separable:
+            macs += math.prod(out_spatial) * depth * config['filters']
+            depth = config['filters']
+        out = _join_channels(out_spatial, depth, config)
+        return out, macs, _epilogue_flops(config, out)
+    return rule
+
+
+def _pooling(rank):
+    def rule(config, shapes):
+        spatial, channels = _split_channels(shapes[0], config)
+        pool = _tuple(config.get('pool_size', 2), rank)
+        strides = _tuple(config.get('strides') or pool, rank)
+        out_spatial = _window_output(spatial, pool, strides, config.get('padding', 'valid'))
+        out = _join_channels(out_spatial, channels, config)
+        return out, 0, math.prod(out) * math.prod(pool)
+    return rule
+
+
+def _global_pooling(rank):
+    def rule(config, shapes):
+        _, channels = _split_channels(shapes[0], config)
+        out = _join_channels((1,) * rank, channels, config) if config.get('keepdims') else (channels,)
+        return out, 0, math.prod(shapes[0])
+    return rule
+
+
+def _padding(rank, sign):
+    # ZeroPadding (sign 1) adds and Cropping (sign -1) removes rows at both ends of each spatial axis
+    def rule(config, shapes):
+        spatial, channels = _split_channels(shapes[0], config)
+        amounts = config.get('padding' if sign > 0 else 'cropping', 1)
+        if rank == 1 and isinstance(amounts, (list, tuple)):
+            amounts = [amounts]  # One (left, right) pair
+        amounts = [_tuple(amount, 2) for amount in _tuple(amounts, rank)]
+        out_spatial = tuple(size + sign * sum(amount) for size, amount in zip(spatial, amounts))
+        return _join_channels(out_spatial, channels, config), 0, 0
+    return rule
+
+
+def _upsampling(rank):
+    def rule(config, shapes):
+        spatial, channels = _split_channels(shapes[0], config)
+        sizes = _tuple(config.get('size', 2), rank)
+        out = _join_channels(tuple(s * k for s, k in zip(spatial, sizes)), channels, config)
+        return out, 0, math.prod(out) if config.get('interpolation') == 'bilinear' else 0
+    return rule
+
+
+def _resizing(config, shapes):
+    _, channels = _split_channels(shapes[0], config)
+    out = _join_channels((config['height'], config['width']), channels, config)
+    # Bilinear interpolation blends four neighbours per output value
+    return out, 0, 0 if config.get('interpolation') == 'nearest' else 7 * math.prod(out)
+
+
+def _center_crop(config, shapes):
+    _, channels = _split_channels(shapes[0], config)
+    return _join_channels((config['height'], config['width']), channels, config), 0, 0
+
+
+def _elementwise(flops_per_element):
+    def rule(config, shapes):
+        return shapes[0], 0, flops_per_element * math.prod(shapes[0])
+    return rule
+
+
+def _activation(config, shapes):
+    return shapes[0], 0, _activation_flops(config.get('activation'), math.prod(shapes[0]))
+
+
+def _merge(extra_flops=0):
+    def rule(config, shapes):
+        out = tuple(np.broadcast_shapes(*shapes))
+        return out, 0, math.prod(out) * (len(shapes) - 1 + extra_flops)
+    return rule
+
+
+def _concatenate(config, shapes):
+    axis = config.get('axis', -1)
+    # Config axes count the batch axis
+    axis = axis - 1 if axis > 0 else axis
+    out = list(shapes[0])
+    out[axis] = sum(shape[axis] for shape in shapes)
+    return tuple(out), 0, 0
+
+
+def _flatten(config, shapes):
+    return (math.prod(shapes[0]),), 0, 0
+
+
+def _reshape(config, shapes):
+    target = list(config['target_shape'])
+    if -1 in target:
+        target[target.index(-1)] = math.prod(shapes[0]) // -math.prod(target)
+    return tuple(target), 0, 0
+
+
+def _permute(config, shapes):
+    return tuple(shapes[0][axis - 1] for axis in config['dims']), 0, 0
+
+
+def _repeat_vector(config, shapes):
+    return (config['n'],) + shapes[0], 0, 0
+
+
+def _embedding(config, shapes):
+    return shapes[0] + (config['output_dim'],), 0, 0
+
+
+RECURRENT_GATES = {'SimpleRNN': 1, 'GRU': 3, 'LSTM': 4}
+
+
+def _recurrent(gates):
+    def rule(config, shapes):
+        steps, features = shapes[0][0], shapes[0][-1]
+        units = config['units']
+        macs = steps * gates * (features + units) * units
+        # Gate bias adds and nonlinearities, plus the state update
+        flops = steps * units * (gates * 5 + 3)
+        out = (steps, units) if config.get('return_sequences') else (units,)
+        return out, macs, flops
+    return rule
+
+
+def _bidirectional(config, shapes):
+    inner = config['layer']
+    out, macs, flops = LAYER_RULES[inner['class_name']](inner['config'], shapes)
+    if config.get('merge_mode', 'concat') in ('concat', None):
+        out = out[:-1] + (out[-1] * 2,)
+    return out, 2 * macs, 2 * flops + math.prod(out)
+
+
+def _time_distributed(config, shapes):
+    inner = config['layer']
+    steps = shapes[0][0]
+    out, macs, flops = LAYER_RULES[inner['class_name']](inner['config'], [shapes[0][1:]])
+    return (steps,) + out, steps * macs, steps * flops
+
+
+def _multi_head_attention(config, shapes):
+    query, value = shapes[0], shapes[1] if len(shapes) > 1 else shapes[0]
+    key = shapes[2] if len(shapes) > 2 else value
+    heads, key_dim = config['num_heads'], config['key_dim']
+    value_dim = config.get('value_dim') or key_dim
+    target, source = math.prod(query[:-1]), math.prod(value[:-1])
+    output_dim = config.get('output_shape') or query[-1]
+    output_dim = math.prod(_tuple(output_dim, 1))
+
+    macs = (target * query[-1] * heads * key_dim            # query projection
+            + source * key[-1] * heads * key_dim            # key projection
+            + source * value[-1] * heads * value_dim        # value projection
+            + heads * target * source * (key_dim + value_dim)  # scores and weighted sum
+            + target * heads * value_dim * output_dim)      # output projection
+    flops = ACTIVATION_FLOPS['softmax'] * heads * target * source
+    return query[:-1] + (output_dim,), macs, flops
+
+
+def _attention(config, shapes):
+    query, value = shapes[0], shapes[1] if len(shapes) > 1 else shapes[0]
+    target, source = math.prod(query[:-1]), math.prod(value[:-1])
+    macs = target * source * (query[-1] + value[-1])
+    return query[:-1] + (value[-1],), macs, ACTIVATION_FLOPS['softmax'] * target * source
+
+
+LAYER_RULES = {
+    'Dense': _dense,
+    'Conv1D': _conv(1), 'Conv2D': _conv(2), 'Conv3D': _conv(3),
+    'Conv1DTranspose': _conv_transpose(1), 'Conv2DTranspose': _conv_transpose(2),
+    'Conv3DTranspose': _conv_transpose(3),
+    'DepthwiseConv1D': _depthwise_conv(1), 'DepthwiseConv2D': _depthwise_conv(2),
+    'SeparableConv1D': _depthwise_conv(1, separable=True), 'SeparableConv2D': _depthwise_conv(2, separable=True),
+    'MaxPooling1D': _pooling(1), 'MaxPooling2D': _pooling(2), 'MaxPooling3D': _pooling(3),
+    'AveragePooling1D': _pooling(1), 'AveragePooling2D': _pooling(2), 'AveragePooling3D': _pooling(3),
+    'GlobalMaxPooling1D': _global_pooling(1), 'GlobalMaxPooling2D': _global_pooling(2),
+    'GlobalMaxPooling3D': _global_pooling(3), 'GlobalAveragePooling1D': _global_pooling(1),
+    'GlobalAveragePooling2D': _global_pooling(2), 'GlobalAveragePooling3D': _global_pooling(3),
+    'ZeroPadding1D': _padding(1, 1), 'ZeroPadding2D': _padding(2, 1), 'ZeroPadding3D': _padding(3, 1),
+    'Cropping1D': _padding(1, -1), 'Cropping2D': _padding(2, -1), 'Cropping3D': _padding(3, -1),
+    'UpSampling1D': _upsampling(1), 'UpSampling2D': _upsampling(2), 'UpSampling3D': _upsampling(3),
+    'Resizing': _resizing, 'CenterCrop': _center_crop,
+    'BatchNormalization': _elementwise(2),  # Folded into one multiply-add at inference
+    'LayerNormalization': _elementwise(5), 'GroupNormalization': _elementwise(5),
+    'UnitNormalization': _elementwise(3), 'Normalization': _elementwise(2), 'Rescaling': _elementwise(2),
+    'Activation': _activation, 'ReLU': _elementwise(1), 'LeakyReLU': _elementwise(2), 'PReLU': _elementwise(2),
+    'ELU': _elementwise(3), 'ThresholdedReLU': _elementwise(1), 'Softmax': _elementwise(ACTIVATION_FLOPS['softmax']),
+    'Add': _merge(), 'Subtract': _merge(), 'Multiply': _merge(), 'Maximum': _merge(), 'Minimum': _merge(),
+    'Average': _merge(extra_flops=1), 'Concatenate': _concatenate,
+    'Flatten': _flatten, 'Reshape': _reshape, 'Permute': _permute, 'RepeatVector': _repeat_vector,
+    'Embedding': _embedding,
+    'SimpleRNN': _recurrent(1), 'GRU': _recurrent(3), 'LSTM': _recurrent(4),
+    'Bidirectional': _bidirectional, 'TimeDistributed': _time_distributed,
+    'MultiHeadAttention': _multi_head_attention, 'Attention': _attention, 'AdditiveAttention': _attention,
+}
+LAYER_RULES.update({name: _elementwise(0) for name in IDENTITY_LAYERS})
+LAYER_RULES.update({'MaxPool1D': LAYER_RULES['MaxPooling1D'], 'MaxPool2D': LAYER_RULES['MaxPooling2D'],
+                    'AvgPool1D': LAYER_RULES['AveragePooling1D'], 'AvgPool2D': LAYER_RULES['AveragePooling2D'],
+                    'GlobalAvgPool2D': LAYER_RULES['GlobalAveragePooling2D'],
+                    'GlobalMaxPool2D': LAYER_RULES['GlobalMaxPooling2D']})
+
+
+# --- graph profiles ------------------------------------------------------------------------------
+
+def _io_names(entries):
+    # [["name", 0, 0], ...] or a single ["name", 0, 0]
+    if entries and isinstance(entries[0], str):
+        entries = [entries]
+    return [entry[0] for entry in entries or []]
+
+
+def _declared_shape(config):
+    shape = config.get('batch_shape') or config.get('batch_input_shape')
+    return tuple(shape[1:]) if shape else None
+
+
+def _known(shape):
+    return shape is not None and all(isinstance(size, int) and size > 0 for size in shape)
+
+
+def _check_override(name, shape, configured):
+    if configured is not None and len(shape) != len(configured):
+        raise CostError(f"input_shape {tuple(shape)} has {len(shape)} axes but {name} takes "
+                        f"{len(configured)} ({', '.join(map(str, configured))})", 422)
+
+
+def _check_kernel(name, class_name, config, shape, kernel):
+    """
+    The input must carry as many channels as the layer's stored kernel was built for
+    """
+    if kernel is None or class_name not in KERNEL_LAYERS or len(kernel) < 2 or not shape:
+        return
+    _, channels = _split_channels(shape, config)
+    expected = kernel[-2] * (config.get('groups') or 1)
+    if channels != expected:
+        raise CostError(f"{name} has weights for {expected} input channels but gets {channels}; "
+                        f"check input_shape", 422)
+
+
+def live_elements(starts, ends, sizes, steps):
+    """
+    Elements alive at each of `steps` execution steps, for buffers alive over
+    the inclusive step ranges [starts[i], ends[i]]
+    """
+    delta = np.zeros(steps + 1, dtype=np.int64)
+    np.add.at(delta, np.asarray(starts, dtype=np.int64), np.asarray(sizes, dtype=np.int64))
+    np.add.at(delta, np.asarray(ends, dtype=np.int64) + 1, -np.asarray(sizes, dtype=np.int64))
+    return np.cumsum(delta[:-1])
+
+
+def profile_graph(model_config, weight_shapes, input_shapes=None, nested=False):
+    """
+    Per-sample cost profile of a Keras model config: every layer's output
+    shape, MACs, FLOPs, new activation elements and weight elements, plus the
+    activation elements alive while each layer runs.
+
+    `weight_shapes(layer_name)` returns [(weight_name, shape, dtype), ...] as
+    for build_keras_summary. `input_shapes` overrides the shapes the config
+    declares for its inputs (batch axis excluded). A nested model's inputs
+    alias the tensors that feed it instead of owning a buffer.
+    """
+    config_layers = list(iter_config_layers(model_config))
+    config = model_config.get('config', {}) if isinstance(model_config, dict) else {}
+    config = config if isinstance(config, dict) else {}
+    build_shape = config.get('build_input_shape')
+    input_shapes = list(input_shapes or [])
+
+    rows = []
+    shapes = {}
+    buffer_of = {}  # Layer name -> index of the buffer holding its output (None for aliased inputs)
+    buffers = []  # [elements, first step, last step]; a tensor lives until its last reader has run
+    nested_extra = np.zeros(len(config_layers), dtype=np.int64)
+    graph_inputs = []
+
+    for position, layer in enumerate(config_layers):
+        name, class_name, layer_config, inbound = layer['name'], layer['class_name'], layer['config'], layer['inbound']
+        row = {
+            'name': name,
+            'type': class_name,
+            'inbound': inbound,
+            'output_shape': None,
+            'macs': 0,
+            'flops': 0,
+            'activation_elements': 0,
+            'weight_elements': 0,
+            'stored_weight_bytes': 0,
+            'estimated': False
+        }
+        kernel = None
+        for weight_name, shape, dtype in weight_shapes(name):
+            row['weight_elements'] += math.prod(shape)
+            row['stored_weight_bytes'] += math.prod(shape) * np.dtype(dtype).itemsize
+            if weight_name.rsplit('/', 1)[-1].split(':')[0] == 'kernel':
+                kernel = shape
+        rows.append(row)
+
+        if class_name == 'InputLayer' or not inbound:
+            index = len(graph_inputs)
+            configured = _declared_shape(layer_config) or (tuple(build_shape[1:]) if build_shape and index == 0
+                                                           else None)
+            declared = configured
+            if index < len(input_shapes):
+                declared = input_shapes[index]
+                if not nested:
+                    _check_override(name, declared, configured)
+            if not _known(declared):
+                raise CostError(f"Input shape of {name} is unknown or variable ({declared}); pass input_shape", 422)
+            graph_inputs.append(list(declared))
+            in_shapes = [declared]
+            if not nested:
+                # The caller's input tensor, alive until this layer has read it
+                buffers.append([math.prod(declared), position, position])
+            if class_name == 'InputLayer':
+                row['output_shape'] = list(declared)
+                row['activation_elements'] = 0 if nested else math.prod(declared)
+                shapes[name] = declared
+                buffer_of[name] = None if nested else len(buffers) - 1
+                continue
+        else:
+            in_shapes = [shapes.get(source) for source in inbound]
+            if any(shape is None for shape in in_shapes):
+                continue
+            for source in inbound:
+                if buffer_of.get(source) is not None:
+                    buffers[buffer_of[source]][2] = position
+
+        view = class_name in VIEW_LAYERS
+        if class_name in NESTED_MODELS:
+            inner = profile_graph({'class_name': class_name, 'config': layer_config}, lambda _: [],
+                                  in_shapes, nested=True)
+            if not inner['output_shapes'] or inner['output_shapes'][0] is None:
+                row['estimated'] = True
+                continue
+            output_shape = inner['output_shapes'][0]
+            macs, flops = inner['totals']['macs'], inner['totals']['flops']
+            row['estimated'] = bool(inner['estimated'] or inner['unsupported'])
+            # A sub-model of views (e.g. augmentation, inactive at inference) passes its input through
+            view = not inner['totals']['activation_elements']
+            # Its intermediate tensors are alive only while it runs
+            nested_extra[position] = max(inner['totals']['peak_elements'] - math.prod(output_shape), 0)
+        elif class_name in LAYER_RULES:
+            _check_kernel(name, class_name, layer_config, in_shapes[0], kernel)
+            try:
+                output_shape, macs, other_flops = LAYER_RULES[class_name](layer_config, in_shapes)
+            except (KeyError, IndexError, TypeError, ValueError):
+                # A config this rule doesn't understand (or a wrapped layer without a rule)
+                continue
+            flops = 2 * macs + other_flops
+        elif len(in_shapes) == 1 and not row['weight_elements']:
+            # Unknown weightless layer: assume it maps its input elementwise
+            output_shape, macs, flops = in_shapes[0], 0, math.prod(in_shapes[0])
+            row['estimated'] = True
+        else:
+            continue
+
+        output_shape = tuple(int(size) for size in output_shape)
+        row.update(output_shape=list(output_shape), macs=int(macs), flops=int(flops))
+        shapes[name] = output_shape
+        if view and inbound:
+            buffer_of[name] = buffer_of.get(inbound[0])
+        else:
+            row['activation_elements'] = math.prod(output_shape)
+            buffer_of[name] = len(buffers)
+            buffers.append([row['activation_elements'], position, position])
+
+    output_names = _io_names(config.get('output_layers')) or [row['name'] for row in rows[-1:]]
+    for name in output_names:
+        # Outputs are handed back to the caller, so they outlive the graph
+        if buffer_of.get(name) is not None:
+            buffers[buffer_of[name]][2] = len(rows) - 1
+
+    live = nested_extra
+    if buffers:
+        sizes, starts, ends = zip(*buffers)
+        live = live + live_elements(starts, ends, sizes, len(rows))
+    for row, elements in zip(rows, live.tolist()):
+        row['live_elements'] = elements
+
+    peak = int(np.argmax(live)) if rows else None
+    return {
+        'version': COST_MODEL_VERSION,
+        'input_shapes': graph_inputs,
+        'output_shapes': [list(shapes[name]) if name in shapes else None for name in output_names],
+        'layers': rows,
+        'unsupported': [row['name'] for row in rows if row['output_shape'] is None],
+        'estimated': [row['name'] for row in rows if row['estimated'] and row['output_shape'] is not None],
+        'totals': {
+            'macs': sum(row['macs'] for row in rows),
+            'flops': sum(row['flops'] for row in rows),
+            'activation_elements': sum(row['activation_elements'] for row in rows),
+            'weight_elements': sum(row['weight_elements'] for row in rows),
+            'stored_weight_bytes': sum(row['stored_weight_bytes'] for row in rows),
+            'peak_elements': int(live[peak]) if rows else 0,
+            'peak_layer': rows[peak]['name'] if rows else None
+        }
+    }
+
+
+def profile_model(file_path, input_shapes=None):
+    """
+    Cost profile of a stored model from its config and weight headers; no weight payload is read
+    """
+    file_format = model_format(file_path)
+    if file_format not in COST_FORMATS:
+        raise CostError(f"Costs can't be estimated for {file_format} models", 415)
+    if file_format == 'h5':
+        with h5py.File(file_path, 'r') as model_file:
+            model_config = load_json_attr(model_file, 'model_config')
+            if not isinstance(model_config, dict):
+                raise CostError('File has no Keras model config to estimate costs from', 415)
+            weights_root = find_weights_root(model_file)
+            return profile_graph(model_config, lambda name: layer_weight_shapes(weights_root, name), input_shapes)
+
+    model_config, weight_shapes = read_keras_archive(file_path)
+    return profile_graph(model_config, lambda name: weight_shapes.get(name, []), input_shapes)
+
+
+def parse_input_shapes(value):
+    """
+    Parse an input_shape option: comma-separated sizes, one ';'-separated shape per model input
+    """
+    if not value:
+        return None
+    try:
+        shapes = [tuple(int(size) for size in shape.split(',')) for shape in value.split(';')]
+    except ValueError:
+        raise CostError('input_shape must look like 224,224,3 (use ; between several inputs)')
+    if not all(_known(shape) for shape in shapes):
+        raise CostError('input_shape sizes must be positive')
+    if any(math.prod(shape) > MAX_INPUT_ELEMENTS for shape in shapes):
+        raise CostError(f"input_shape is limited to {MAX_INPUT_ELEMENTS:,} elements per input")
+    return shapes
+
+
+def input_shapes_key(shapes):
+    return ';'.join(','.join(map(str, shape)) for shape in shapes or [])
+
+
+def _scales(batch_size, dtype):
+    # Per-sample column -> value at this batch size and dtype, in COST_METRICS order
+    if dtype not in DTYPE_BYTES:
+        raise CostError(f"dtype must be one of {', '.join(DTYPE_BYTES)}")
+    itemsize = DTYPE_BYTES[dtype]
+    return np.array([batch_size, batch_size, batch_size * itemsize, batch_size * itemsize, itemsize],
+                    dtype=np.int64)
+
+
+def _scaled(per_sample, batch_size, dtype):
+    """
+    Scale an (n, 5) table of per-sample columns, refusing results that don't fit in int64
+    """
+    scales = _scales(batch_size, dtype)
+    try:
+        per_sample = np.array(per_sample, dtype=np.int64).reshape(-1, 5)
+        # Checked in floats; doubled for peak_memory_bytes, the sum of two scaled columns
+        fits = not per_sample.size or (per_sample.max(axis=0) * scales.astype(float)).max() * 2 <= INT64_MAX
+    except OverflowError:
+        fits = False
+    if not fits:
+        raise CostError('Estimated costs are too large to represent; use a smaller input_shape or batch_size', 422)
+    return per_sample * scales
+
+
+def estimate_cost(profile, batch_size=1, dtype=DEFAULT_DTYPE):
+    """
+    Per-layer and whole-model costs of a profile at a batch size, with
+    activations and weights held in `dtype`
+    """
+    rows = profile['layers']
+    scaled = _scaled([[row['macs'], row['flops'], row['activation_elements'], row['live_elements'],
+                       row['weight_elements']] for row in rows], batch_size, dtype)
+
+    layers = []
+    for row, (macs, flops, activation_bytes, live_bytes, weight_bytes) in zip(rows, scaled.tolist()):
+        layers.append({
+            'name': row['name'],
+            'type': row['type'],
+            'inbound': row['inbound'],
+            'output_shape': [batch_size] + row['output_shape'] if row['output_shape'] is not None else None,
+            'parameters': row['weight_elements'],
+            'macs': macs,
+            'flops': flops,
+            'activation_bytes': activation_bytes,
+            'live_activation_bytes': live_bytes,
+            'weight_bytes': weight_bytes,
+            'estimated': row['estimated']
+        })
+
+    return {
+        'batch_size': batch_size,
+        'dtype': dtype,
+        'input_shapes': profile['input_shapes'],
+        'totals': _totals(profile, batch_size, dtype),
+        'unsupported_layers': profile['unsupported'],
+        'estimated_layers': profile['estimated'],
+        'layers': layers
+    }
+
+
+def _totals(profile, batch_size, dtype):
+    totals = profile['totals']
+    macs, flops, activation_bytes, peak_bytes, weight_bytes = _scaled([
+        totals['macs'], totals['flops'], totals['activation_elements'], totals['peak_elements'],
+        totals['weight_elements']], batch_size, dtype)[0].tolist()
+    return {
+        'parameters': totals['weight_elements'],
+        'macs': macs,
+        'flops': flops,
+        'activation_bytes': activation_bytes,
+        'peak_activation_bytes': peak_bytes,
+        'peak_layer': totals['peak_layer'],
+        'weight_bytes': weight_bytes,
+        'stored_weight_bytes': totals['stored_weight_bytes'],
+        'peak_memory_bytes': weight_bytes + peak_bytes
+    }
+
+
+def rank_costs(profiles, batch_size=1, dtype=DEFAULT_DTYPE, sort='flops'):
+    """
+    Order profiles by one of COST_METRICS at a batch size and dtype, cheapest
+    first. Returns [(index into `profiles`, totals), ...].
+    """
+    if sort not in COST_METRICS:
+        raise CostError(f"sort must be one of {', '.join(COST_METRICS)}")
+    if not profiles:
+        return []
+
+    scaled = _scaled([[p['totals']['macs'], p['totals']['flops'], p['totals']['activation_elements'],
+                       p['totals']['peak_elements'], p['totals']['weight_elements']]
+                      for p in profiles], batch_size, dtype)
+    # peak_memory_bytes = weights + peak activations
+    table = np.column_stack([scaled, scaled[:, 4] + scaled[:, 3]])
+    order = np.argsort(table[:, COST_METRICS.index(sort)], kind='stable')
+    return [(int(i), _totals(profiles[i], batch_size, dtype)) for i in order]
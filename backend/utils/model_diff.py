@@ -0,0 +1,211 @@
+import math
+
+import h5py
+import numpy as np
+
+from utils.keras_h5 import iter_config_layers, load_json_attr
+from utils.weight_stats import MAX_BLOCK_ELEMENTS, iter_block_slices, list_weight_datasets
+
+
+RAW_COMPARE_BLOCK = 4 * 1024 * 1024  # Bytes per read when comparing stored bytes
+
+
+def _short_weight_name(weight_name):
+    # 'sequential_2/dense/kernel' and 'sequential_3/dense/kernel' are the same weight
+    return weight_name.rsplit('/', 1)[-1]
+
+
+def index_model(file_path):
+    """
+    Return (layers, tensors) for a model: layers maps name -> type in order,
+    tensors maps (layer, weight, occurrence) -> dataset info
+    """
+    with h5py.File(file_path, 'r') as model_file:
+        model_config = load_json_attr(model_file, 'model_config')
+        layers = {layer['name']: layer['class_name'] for layer in iter_config_layers(model_config)}
+
+        tensors = {}
+        for layer_name, weight_name, dataset_path in list_weight_datasets(model_file):
+            dataset = model_file[dataset_path]
+            layers.setdefault(layer_name, 'Unknown')
+
+            # Nested models can repeat a short name within one layer; number the repeats
+            short_name = _short_weight_name(weight_name)
+            occurrence = 0
+            while (layer_name, short_name, occurrence) in tensors:
+                occurrence += 1
+
+            tensors[(layer_name, short_name, occurrence)] = {
+                'layer': layer_name,
+                'name': weight_name,
+                'path': dataset_path,
+                'shape': list(dataset.shape),
+                'dtype': str(dataset.dtype)
+            }
+
+    return layers, tensors
+
+
+def _raw_bytes_equal(file_a, dataset_a, file_b, dataset_b):
+    """
+    Compare the stored bytes of two datasets without decoding them.
+
+    Returns True / False when the storage layout allows a raw comparison
+    (identical chunk payloads, or contiguous byte ranges), None otherwise.
+    """
+    if dataset_a.dtype != dataset_b.dtype or dataset_a.shape != dataset_b.shape:
+        return False
+
+    if dataset_a.chunks is not None and dataset_a.chunks == dataset_b.chunks:
+        # Chunked storage: compare the encoded chunks (already checksummed / compressed)
+        if dataset_a.compression != dataset_b.compression:
+            return None
+        try:
+            chunk_count = dataset_a.id.get_num_chunks()
+            if chunk_count != dataset_b.id.get_num_chunks():
+                return False
+            for i in range(chunk_count):
+                info = dataset_a.id.get_chunk_info(i)
+                _, chunk_a = dataset_a.id.read_direct_chunk(info.chunk_offset)
+                _, chunk_b = dataset_b.id.read_direct_chunk(info.chunk_offset)
+                if chunk_a != chunk_b:
+                    return False
+            return True
+        except (AttributeError, KeyError, OSError):
+            return None
+
+    offset_a, offset_b = dataset_a.id.get_offset(), dataset_b.id.get_offset()
+    if dataset_a.chunks is None and dataset_b.chunks is None and None not in (offset_a, offset_b):
+        # Contiguous storage: compare the byte ranges directly in the files
+        remaining = dataset_a.id.get_storage_size()
+        with open(file_a, 'rb') as fa, open(file_b, 'rb') as fb:
+            fa.seek(offset_a)
+            fb.seek(offset_b)
+            while remaining > 0:
+                size = min(RAW_COMPARE_BLOCK, remaining)
+                if fa.read(size) != fb.read(size):
+                    return False
+                remaining -= size
+        return True
+
+    return None
+
+
+def compare_tensor(file_a, path_a, file_b, path_b):
+    """
+    Weight delta between two same-shaped tensors, streamed block by block.
+
+    Runs in a worker process. Stored bytes are compared first so unchanged
+    tensors never get decoded into floats.
+    """
+    with h5py.File(file_a, 'r') as model_a, h5py.File(file_b, 'r') as model_b:
+        dataset_a, dataset_b = model_a[path_a], model_b[path_b]
+        nbytes = dataset_a.size * dataset_a.dtype.itemsize
+
+        if _raw_bytes_equal(file_a, dataset_a, file_b, dataset_b):
+            return {
+                'identical': True,
+                'max_abs_diff': 0.0,
+                'relative_l2_change': 0.0,
+                'cosine_similarity': 1.0,
+                'bytes_read': 2 * nbytes
+            }
+
+        max_abs = 0.0
+        diff_sq = norm_a_sq = norm_b_sq = dot = 0.0
+        # Both files are read with the same hyperslabs so blocks line up element for element
+        for index in iter_block_slices(dataset_a.shape, dataset_a.chunks, MAX_BLOCK_ELEMENTS // 2):
+            block_a = np.asarray(dataset_a[index], dtype=np.float64).ravel()
+            block_b = np.asarray(dataset_b[index], dtype=np.float64).ravel()
+            delta = block_a - block_b
+            if delta.size:
+                max_abs = max(max_abs, float(np.abs(delta).max()))
+            diff_sq += float(np.dot(delta, delta))
+            norm_a_sq += float(np.dot(block_a, block_a))
+            norm_b_sq += float(np.dot(block_b, block_b))
+            dot += float(np.dot(block_a, block_b))
+
+        norms = math.sqrt(norm_a_sq) * math.sqrt(norm_b_sq)
+        return {
+            'identical': diff_sq == 0.0,
+            'max_abs_diff': max_abs,
+            'relative_l2_change': math.sqrt(diff_sq) / math.sqrt(norm_a_sq) if norm_a_sq else None,
+            'cosine_similarity': dot / norms if norms else None,
+            'bytes_read': 4 * nbytes
+        }
+
+
+def diff_models(file_a, file_b, executor=None):
+    """
+    Align two models by layer name and tensor shape and report what changed
+    """
+    layers_a, tensors_a = index_model(file_a)
+    layers_b, tensors_b = index_model(file_b)
+
+    added_layers = [name for name in layers_b if name not in layers_a]
+    removed_layers = [name for name in layers_a if name not in layers_b]
+    retyped_layers = [
+        {'name': name, 'type_a': layers_a[name], 'type_b': layers_b[name]}
+        for name in layers_a if name in layers_b and layers_a[name] != layers_b[name]
+    ]
+
+    comparable = []
+    reshaped = {}
+    added_tensors, removed_tensors = [], []
+    for key, tensor_a in tensors_a.items():
+        tensor_b = tensors_b.get(key)
+        if tensor_b is None:
+            if tensor_a['layer'] in layers_b:
+                removed_tensors.append(tensor_a['name'])
+        elif tensor_a['shape'] != tensor_b['shape']:
+            reshaped.setdefault(tensor_a['layer'], []).append({
+                'name': _short_weight_name(tensor_a['name']),
+                'shape_a': tensor_a['shape'],
+                'shape_b': tensor_b['shape']
+            })
+        else:
+            comparable.append((tensor_a, tensor_b))
+    for key, tensor_b in tensors_b.items():
+        if key not in tensors_a and tensor_b['layer'] in layers_a:
+            added_tensors.append(tensor_b['name'])
+
+    args = ([file_a] * len(comparable), [a['path'] for a, _ in comparable],
+            [file_b] * len(comparable), [b['path'] for _, b in comparable])
+    if executor is not None:
+        results = list(executor.map(compare_tensor, *args))
+    else:
+        results = [compare_tensor(*call) for call in zip(*args)]
+
+    tensors = []
+    bytes_read = 0
+    for (tensor_a, _), result in zip(comparable, results):
+        bytes_read += result.pop('bytes_read')
+        tensors.append({
+            'layer': tensor_a['layer'],
+            'name': _short_weight_name(tensor_a['name']),
+            'shape': tensor_a['shape'],
+            **result
+        })
+
+    changed_layers = list(dict.fromkeys(t['layer'] for t in tensors if not t['identical']))
+    identical = (not added_layers and not removed_layers and not retyped_layers and not reshaped
+                 and not added_tensors and not removed_tensors and not changed_layers)
+
+    return {
+        'identical': identical,
+        'layers': {
+            'added': added_layers,
+            'removed': removed_layers,
+            'retyped': retyped_layers,
+            'reshaped': [{'name': name, 'tensors': items} for name, items in reshaped.items()],
+            'changed': changed_layers
+        },
+        'tensors': tensors,
+        'added_tensors': added_tensors,
+        'removed_tensors': removed_tensors,
+        'stats': {
+            'tensors_compared': len(tensors),
+            'tensors_identical': sum(1 for t in tensors if t['identical']),
+            'bytes_read': bytes_read
+        }
+    }
@@ -0,0 +1,512 @@
+import io
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import zipfile
+
+import h5py
+import numpy as np
+
+from utils.keras_h5 import build_keras_summary, describe_training_config
+
+
+HDF5_SIGNATURE = b'\x89HDF\r\n\x1a\n'
+ZIP_SIGNATURE = b'PK\x03\x04'
+SIGNATURE_BYTES = 16  # Enough of a file's head to tell every supported format apart
+SAFETENSORS_MAX_HEADER_BYTES = 100 * 1024 * 1024  # The format's own cap on the JSON header
+
+# File extension -> format name
+MODEL_FORMATS = {
+    'h5': 'h5',
+    'keras': 'keras',
+    'safetensors': 'safetensors',
+    'onnx': 'onnx'
+}
+
+NOT_SPECIFIED = 'Not specified'
+
+
+def model_format(file_name):
+    """
+    Format of a model file from its extension, or None if unsupported
+    """
+    return MODEL_FORMATS.get(os.path.splitext(file_name)[1].lstrip('.').lower())
+
+
+def sniff_format(header):
+    """
+    Format of a model from the first SIGNATURE_BYTES of its content, or None
+    """
+    if header.startswith(HDF5_SIGNATURE):
+        return 'h5'
+    if header.startswith(ZIP_SIGNATURE):
+        return 'keras'
+    if len(header) >= 9 and header[8:9] == b'{' and \
+            struct.unpack('<Q', header[:8])[0] <= SAFETENSORS_MAX_HEADER_BYTES:
+        return 'safetensors'
+    # ModelProto serializers write ir_version (field 1, varint) first
+    if header[:1] == b'\x08':
+        return 'onnx'
+    return None
+
+
+def _natural_key(name):
+    # 'layers.10' sorts after 'layers.9'
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', name)]
+
+
+def _guess_layer_type(weights):
+    """
+    Best-effort layer type for formats that store tensors without a topology
+    """
+    names = {weight['name'] for weight in weights}
+    kernel = next((w for w in weights if w['name'] in ('weight', 'kernel')), None)
+    if kernel is None:
+        return 'Unknown'
+    if len(kernel['shape']) > 2:
+        return 'Convolutional'
+    if len(kernel['shape']) == 1:
+        return 'Normalization' if 'bias' in names or len(names) == 1 else 'Unknown'
+    return 'Linear'
+
+
+# --- .keras archives ------------------------------------------------------------------
+
+class _MemberWindow(io.RawIOBase):
+    """
+    Read-only file object over a byte range of another file, so h5py can open
+    an uncompressed zip member in place
+    """
+
+    def __init__(self, path, offset, size):
+        super().__init__()
+        self._file = open(path, 'rb')
+        self._offset = offset
+        self._size = size
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, pos, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self._size}[whence]
+        self._pos = max(0, base + pos)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def readinto(self, buffer):
+        count = max(0, min(len(buffer), self._size - self._pos))
+        self._file.seek(self._offset + self._pos)
+        read = self._file.readinto(memoryview(buffer)[:count])
+        self._pos += read
+        return read
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def _open_zip_member(archive, path, info):
+    """
+    File object for a zip member: a window onto the archive when the member is
+    stored uncompressed (Keras writes weights this way), else zipfile's own
+    decompressing reader
+    """
+    if info.compress_type != zipfile.ZIP_STORED:
+        return archive.open(info)
+    with open(path, 'rb') as f:
+        f.seek(info.header_offset)
+        local_header = f.read(30)
+    name_length, extra_length = struct.unpack('<HH', local_header[26:30])
+    return _MemberWindow(path, info.header_offset + 30 + name_length + extra_length, info.file_size)
+
+
+def _keras_weight_shapes(weights_file):
+    """
+    Map layer name -> [(weight_name, shape, dtype), ...] from a Keras 3
+    `model.weights.h5`, reading dataset headers only
+    """
+    shapes = {}
+    # Keras 3 writes layers/<name>/vars/<i>; Keras 2.13+ used _layer_checkpoint_dependencies
+    for root_name in ('layers', '_layer_checkpoint_dependencies'):
+        root = weights_file.get(root_name)
+        if not isinstance(root, h5py.Group):
+            continue
+        for layer_name in root:
+            weights = []
+
+            def collect(name, obj):
+                if isinstance(obj, h5py.Dataset):
+                    weights.append((name, tuple(obj.shape), obj.dtype))
+
+            root[layer_name].visititems(collect)
+            shapes.setdefault(layer_name, weights)
+    return shapes
+
+
+def read_keras_archive(file_path):
+    """
+    Return (model_config, {layer name: [(weight_name, shape, dtype), ...]})
+    for a Keras 3 `.keras` archive, reading `config.json` and the dataset
+    headers of its weights H5 without extracting the archive
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open('config.json') as f:
+            model_config = json.load(f)
+
+        weight_shapes = {}
+        members = {info.filename: info for info in archive.infolist()}
+        if 'model.weights.h5' in members:
+            with _open_zip_member(archive, file_path, members['model.weights.h5']) as member:
+                with h5py.File(member, 'r') as weights_file:
+                    weight_shapes = _keras_weight_shapes(weights_file)
+    return model_config, weight_shapes
+
+
+def summarize_keras_archive(file_path):
+    """
+    Summary of a Keras 3 `.keras` archive from its config and weight shapes
+    """
+    model_config, weight_shapes = read_keras_archive(file_path)
+    optimizer, loss_function = describe_training_config(model_config.get('compile_config'), NOT_SPECIFIED)
+
+    model_summary = build_keras_summary(model_config, os.path.basename(file_path), optimizer, loss_function,
+                                        lambda layer_name: weight_shapes.get(layer_name, []))
+    if model_summary is None:
+        raise ValueError('config.json describes no layers')
+    return model_summary
+
+
+# --- safetensors ----------------------------------------------------------------------
+
+SAFETENSORS_DTYPES = {
+    'F64': np.float64, 'F32': np.float32, 'F16': np.float16,
+    'I64': np.int64, 'I32': np.int32, 'I16': np.int16, 'I8': np.int8,
+    'U64': np.uint64, 'U32': np.uint32, 'U16': np.uint16, 'U8': np.uint8,
+    'BOOL': np.bool_
+}
+
+
+def read_safetensors_header(file_path):
+    """
+    Return (tensors, metadata, data_offset): the JSON header's tensor entries,
+    its `__metadata__` and the file offset where tensor data begins
+    """
+    with open(file_path, 'rb') as f:
+        prefix = f.read(8)
+        if len(prefix) < 8:
+            raise ValueError('File is too short to be safetensors')
+        header_size = struct.unpack('<Q', prefix)[0]
+        if header_size > SAFETENSORS_MAX_HEADER_BYTES:
+            raise ValueError(f"safetensors header of {header_size} bytes exceeds the format's limit")
+        header = json.loads(f.read(header_size))
+
+    metadata = header.pop('__metadata__', None) or {}
+    return header, metadata, 8 + header_size
+
+
+class _BFloat16Tensor:
+    """
+    bfloat16 tensor backed by a uint16 memmap; slices are widened to float32
+    """
+
+    dtype = np.dtype(np.float32)
+    chunks = None
+
+    def __init__(self, raw):
+        self._raw = raw
+        self.shape = raw.shape
+        self.size = raw.size
+
+    def __getitem__(self, index):
+        # bfloat16 is the high half of a float32
+        bits = np.asarray(self._raw[index]).astype(np.uint32) << 16
+        return bits.view(np.float32)
+
+
+def open_safetensors_tensor(file_path, name):
+    """
+    Memory-map one tensor of a safetensors file. Nothing is read until the
+    returned array is sliced.
+    """
+    tensors, _, data_offset = read_safetensors_header(file_path)
+    if name not in tensors:
+        raise KeyError(name)
+    info = tensors[name]
+    shape = tuple(info['shape'])
+    begin, _ = info['data_offsets']
+
+    dtype = np.uint16 if info['dtype'] == 'BF16' else SAFETENSORS_DTYPES.get(info['dtype'])
+    if dtype is None:
+        raise ValueError(f"Unsupported safetensors dtype {info['dtype']}")
+    if math.prod(shape) == 0:
+        raw = np.empty(shape, dtype=dtype)
+    else:
+        raw = np.memmap(file_path, dtype=dtype, mode='r', offset=data_offset + begin,
+                        shape=shape or (1,)).reshape(shape)
+    return _BFloat16Tensor(raw) if info['dtype'] == 'BF16' else raw
+
+
+def _group_tensors(tensors):
+    listed = []
+    for name in sorted(tensors, key=_natural_key):
+        layer_name, _, weight_name = name.rpartition('.')
+        listed.append((layer_name or name, weight_name, name))
+    return listed
+
+
+def list_safetensors(file_path):
+    """
+    Return [(layer_name, weight_name, tensor_name), ...] in natural name order
+    """
+    return _group_tensors(read_safetensors_header(file_path)[0])
+
+
+def summarize_safetensors(file_path):
+    """
+    Summary of a safetensors file from its JSON header. Tensors are grouped
+    into layers by their name up to the last dot; no tensor data is read.
+    """
+    tensors, metadata, _ = read_safetensors_header(file_path)
+
+    layers = {}
+    for layer_name, weight_name, name in _group_tensors(tensors):
+        shape = tensors[name]['shape']
+        layers.setdefault(layer_name, []).append({
+            'name': weight_name,
+            'shape': list(shape),
+            'parameters': math.prod(shape),
+            'dtype': tensors[name]['dtype']
+        })
+
+    model_summary = {
+        'model_name': os.path.basename(file_path),
+        'model_class': metadata.get('format', 'Unknown'),
+        'total_layers': len(layers),
+        'total_parameters': 0,
+        'optimizer': NOT_SPECIFIED,
+        'loss_function': NOT_SPECIFIED,
+        'layers': []
+    }
+    for layer_name, weights in layers.items():
+        layer_params = sum(weight['parameters'] for weight in weights)
+        model_summary['layers'].append({
+            'name': layer_name,
+            'type': _guess_layer_type(weights),
+            'parameters': layer_params,
+            'weights': weights
+        })
+        model_summary['total_parameters'] += layer_params
+    return model_summary
+
+
+# --- ONNX -----------------------------------------------------------------------------
+
+# Protobuf field numbers from onnx.proto
+_MODEL_IR_VERSION, _MODEL_PRODUCER, _MODEL_GRAPH, _MODEL_OPSET = 1, 2, 7, 8
+_GRAPH_NODE, _GRAPH_NAME, _GRAPH_INITIALIZER, _GRAPH_INPUT = 1, 2, 5, 11
+_NODE_INPUT, _NODE_OUTPUT, _NODE_NAME, _NODE_OP_TYPE = 1, 2, 3, 4
+_TENSOR_DIMS, _TENSOR_DATA_TYPE, _TENSOR_NAME = 1, 2, 8
+_OPSET_DOMAIN, _OPSET_VERSION = 1, 2
+_VALUE_NAME, _VALUE_TYPE = 1, 2
+_TYPE_TENSOR, _TENSOR_TYPE_SHAPE, _SHAPE_DIM, _DIM_VALUE, _DIM_PARAM = 1, 2, 1, 1, 2
+
+
+def _varint(buffer, pos):
+    result = shift = 0
+    while True:
+        byte = buffer[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _iter_fields(buffer, start, end):
+    """
+    Yield (field_number, wire_type, value) for a protobuf message in
+    buffer[start:end]. Length-delimited values come back as (start, end)
+    offsets, so large payloads such as raw_data are skipped without a copy.
+    """
+    pos = start
+    while pos < end:
+        key, pos = _varint(buffer, pos)
+        field, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, pos = _varint(buffer, pos)
+        elif wire_type == 1:
+            value, pos = None, pos + 8
+        elif wire_type == 2:
+            length, pos = _varint(buffer, pos)
+            value, pos = (pos, pos + length), pos + length
+        elif wire_type == 5:
+            value, pos = None, pos + 4
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire_type}")
+        if pos > end:
+            raise ValueError('Truncated protobuf message')
+        yield field, wire_type, value
+
+
+def _text(buffer, span):
+    return bytes(buffer[span[0]:span[1]]).decode('utf-8', 'replace')
+
+
+def _packed_varints(buffer, span):
+    values = []
+    pos = span[0]
+    while pos < span[1]:
+        value, pos = _varint(buffer, pos)
+        values.append(value)
+    return values
+
+
+def _onnx_tensor_header(buffer, span):
+    name, dims, data_type = '', [], 0
+    for field, wire_type, value in _iter_fields(buffer, *span):
+        if field == _TENSOR_DIMS:
+            dims.extend(_packed_varints(buffer, value) if wire_type == 2 else [value])
+        elif field == _TENSOR_DATA_TYPE:
+            data_type = value
+        elif field == _TENSOR_NAME:
+            name = _text(buffer, value)
+    return name, dims, data_type
+
+
+def _onnx_value_shape(buffer, span):
+    """
+    Shape of a graph input's tensor type; symbolic dimensions are kept as names
+    """
+    name, shape = '', None
+    for field, _, value in _iter_fields(buffer, *span):
+        if field == _VALUE_NAME:
+            name = _text(buffer, value)
+        elif field == _VALUE_TYPE:
+            for type_field, _, tensor_type in _iter_fields(buffer, *value):
+                if type_field != _TYPE_TENSOR:
+                    continue
+                for tensor_field, _, shape_span in _iter_fields(buffer, *tensor_type):
+                    if tensor_field != _TENSOR_TYPE_SHAPE:
+                        continue
+                    shape = []
+                    for dim_field, _, dim_span in _iter_fields(buffer, *shape_span):
+                        if dim_field != _SHAPE_DIM:
+                            continue
+                        dim = None
+                        for value_field, _, dim_value in _iter_fields(buffer, *dim_span):
+                            if value_field == _DIM_VALUE:
+                                dim = dim_value
+                            elif value_field == _DIM_PARAM:
+                                dim = _text(buffer, dim_value)
+                        shape.append(dim)
+    return name, shape
+
+
+def _onnx_node(buffer, span):
+    node = {'name': '', 'op_type': 'Unknown', 'inputs': [], 'outputs': []}
+    for field, _, value in _iter_fields(buffer, *span):
+        if field == _NODE_INPUT:
+            node['inputs'].append(_text(buffer, value))
+        elif field == _NODE_OUTPUT:
+            node['outputs'].append(_text(buffer, value))
+        elif field == _NODE_NAME:
+            node['name'] = _text(buffer, value)
+        elif field == _NODE_OP_TYPE:
+            node['op_type'] = _text(buffer, value)
+    return node
+
+
+def summarize_onnx(file_path):
+    """
+    Summary of an ONNX model from its graph: one layer per node, with the
+    initializers it consumes as weights. The file is memory-mapped and
+    walked as raw protobuf, so initializer payloads are skipped over and
+    never paged in.
+    """
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        buffer = memoryview(mapped)
+        try:
+            graph_span = None
+            producer, ir_version, opsets = None, None, {}
+            for field, _, value in _iter_fields(buffer, 0, len(buffer)):
+                if field == _MODEL_GRAPH:
+                    graph_span = value
+                elif field == _MODEL_PRODUCER:
+                    producer = _text(buffer, value)
+                elif field == _MODEL_IR_VERSION:
+                    ir_version = value
+                elif field == _MODEL_OPSET:
+                    opset = {key: item for key, _, item in _iter_fields(buffer, *value)}
+                    domain = _text(buffer, opset[_OPSET_DOMAIN]) if _OPSET_DOMAIN in opset else ''
+                    opsets[domain or 'ai.onnx'] = opset.get(_OPSET_VERSION)
+            if graph_span is None:
+                raise ValueError('ONNX model has no graph')
+
+            graph_name, nodes, initializers, inputs = None, [], {}, []
+            for field, _, value in _iter_fields(buffer, *graph_span):
+                if field == _GRAPH_NODE:
+                    nodes.append(_onnx_node(buffer, value))
+                elif field == _GRAPH_INITIALIZER:
+                    name, dims, _ = _onnx_tensor_header(buffer, value)
+                    initializers[name] = dims
+                elif field == _GRAPH_INPUT:
+                    inputs.append(_onnx_value_shape(buffer, value))
+                elif field == _GRAPH_NAME:
+                    graph_name = _text(buffer, value)
+        finally:
+            buffer.release()
+
+    model_summary = {
+        'model_name': os.path.basename(file_path),
+        'model_class': graph_name or 'Unknown',
+        'producer': producer,
+        'ir_version': ir_version,
+        'opsets': opsets,
+        'total_layers': 0,
+        'total_parameters': sum(math.prod(dims) for dims in initializers.values()),
+        'optimizer': NOT_SPECIFIED,
+        'loss_function': NOT_SPECIFIED,
+        'layers': []
+    }
+
+    # Older exporters list initializers among the graph inputs as well
+    producers = {}
+    for name, shape in inputs:
+        if name not in initializers:
+            producers[name] = name
+            model_summary['layers'].append({
+                'name': name, 'type': 'Input', 'output_shape': shape, 'parameters': 0, 'inbound': [], 'weights': []
+            })
+
+    for index, node in enumerate(nodes):
+        node_name = node['name'] or f"{node['op_type']}_{index}"
+        weights = [{'name': tensor, 'shape': initializers[tensor], 'parameters': math.prod(initializers[tensor])}
+                   for tensor in node['inputs'] if tensor in initializers]
+        model_summary['layers'].append({
+            'name': node_name,
+            'type': node['op_type'],
+            'parameters': sum(weight['parameters'] for weight in weights),
+            'inbound': list(dict.fromkeys(producers[tensor] for tensor in node['inputs'] if tensor in producers)),
+            'weights': weights
+        })
+        for tensor in node['outputs']:
+            producers[tensor] = node_name
+
+    model_summary['total_layers'] = len(model_summary['layers'])
+    return model_summary
+
+
+SUMMARIZERS = {
+    'keras': summarize_keras_archive,
+    'safetensors': summarize_safetensors,
+    'onnx': summarize_onnx
+}
@@ -1,126 +1,578 @@
-import os
+import ast
+import io
 import json
+import os
 import re
 from flask import Flask, request, jsonify
-from werkzeug.utils import secure_filename
+
+from utils.keras_h5 import describe_training_config, parse_inbound_nodes
 
 app = Flask(__name__)
 
 # Configure upload settings
-UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'txt', 'json', 'py'}
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+READ_CHUNK_SIZE = 64 * 1024  # Characters read at a time by the JSON reader
+NOT_AVAILABLE = 'N/A'
+
 
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def extract_model_details(content):
-    """
-    Custom parsing logic to extract model details from file content
-    This is a basic implementation and should be enhanced based on your specific file formats
-    """
-    model_data = {
+
+def _empty_summary(model_name=None):
+    return {
+        'model_name': model_name,
         'total_layers': 0,
         'total_parameters': 0,
-        'optimizer': 'N/A',
-        'loss_function': 'N/A',
+        'optimizer': NOT_AVAILABLE,
+        'loss_function': NOT_AVAILABLE,
         'layers': []
     }
 
-    # Extract total layers (example regex)
-    layers_match = re.findall(r'layer(\d+)', content, re.IGNORECASE)
-    model_data['total_layers'] = len(layers_match)
-
-    # Extract total parameters (example regex)
-    params_match = re.findall(r'(\d+)\s*parameters', content, re.IGNORECASE)
-    if params_match:
-        model_data['total_parameters'] = sum(int(p) for p in params_match)
-
-    # Try to find optimizer and loss function
-    if 'adam' in content.lower():
-        model_data['optimizer'] = 'Adam'
-    if 'sgd' in content.lower():
-        model_data['optimizer'] = 'SGD'
-    
-    if 'cross_entropy' in content.lower():
-        model_data['loss_function'] = 'Cross Entropy'
-    if 'mse' in content.lower():
-        model_data['loss_function'] = 'Mean Squared Error'
-
-    # Extract layer information
-    layer_matches = re.findall(r'(Dense|Conv2D|LSTM)\s*\(\s*(\d+)\s*\)', content)
-    model_data['layers'] = [
-        {
-            'name': f'{layer_type} Layer',
-            'type': layer_type,
-            'parameters': int(params)
-        } for layer_type, params in layer_matches
-    ]
-
-    return model_data
+
+# --- Keras model.summary() text -------------------------------------------------------
+
+_MODEL_NAME = re.compile(r'^\s*Model:\s*"?([^"]*)"?\s*$')
+_FOOTER = re.compile(r'^\s*(Total|Trainable|Non-trainable|Optimizer) params:\s*([\d,]+)')
+_NAME_AND_CLASS = re.compile(r'^(.*?)\s*\(([^()]+)\)$')
+_INBOUND = re.compile(r'([\w./:-]+)\[\d+\]\[\d+\]')
+_BOX_CELL = re.compile(r'[│┃]')
+_RULE_CHARS = set('=_-─━┡┩├┤┼╇└┘┴┏┓┳┃│ \t\r\n')
+
+_FOOTER_KEYS = {
+    'Total': 'total_parameters',
+    'Trainable': 'trainable_parameters',
+    'Non-trainable': 'non_trainable_parameters',
+    'Optimizer': 'optimizer_parameters'
+}
+
+
+def _balanced(text):
+    return text.count('(') == text.count(')') and text.count('[') == text.count(']')
+
+
+def _parse_shape(text):
+    """
+    '(None, 26, 26, 32)' -> [None, 26, 26, 32]; lists of shapes nest. Unparseable text is kept as is.
+    """
+    try:
+        return json.loads(text.replace('(', '[').replace(')', ']').replace('None', 'null')
+                          .replace(',]', ']').replace("'", '"'))
+    except ValueError:
+        return text or None
+
+
+def _parse_count(text):
+    digits = text.replace(',', '').strip()
+    return int(digits) if digits.isdigit() else 0
+
+
+class _SummaryTable:
+    """
+    Column layout of one summary table, taken from its 'Layer (type)' header
+    """
+
+    def __init__(self, header):
+        self.boxed = bool(_BOX_CELL.search(header))
+        if self.boxed:
+            self.columns = None
+            return
+        # Plain tables pad every cell to a fixed width; cut rows at the header's offsets
+        starts = [0] + sorted(header.find(title) for title in ('Output Shape', 'Param #', 'Connected to')
+                              if title in header)
+        self.columns = list(zip(starts, starts[1:] + [None]))
+
+    def cells(self, line):
+        line = line.rstrip('\r\n')
+        if self.boxed:
+            cells = [cell.strip() for cell in _BOX_CELL.split(line.strip())[1:-1]]
+        else:
+            cells = [line[start:end].strip() for start, end in self.columns]
+        return cells + [''] * (4 - len(cells))
+
+
+def _complete(row):
+    name, shape, params = row[0], row[1], row[2]
+    return bool(_NAME_AND_CLASS.match(name)) and _balanced(name) and _balanced(shape) and params != ''
+
+
+def _merge(row, cells):
+    # Wrapped cells continue mid-token; inbound lists continue with a new entry
+    return [row[0] + cells[0], row[1] + cells[1], row[2] + cells[2], f"{row[3]} {cells[3]}".strip()]
+
+
+def _summary_layer(row):
+    match = _NAME_AND_CLASS.match(row[0])
+    name, layer_type = (match.group(1), match.group(2)) if match else (row[0], 'Unknown')
+    return {
+        'name': name,
+        'type': layer_type,
+        'output_shape': _parse_shape(row[1]),
+        'parameters': _parse_count(row[2]),
+        'inbound': list(dict.fromkeys(_INBOUND.findall(row[3])))
+    }
+
+
+def iter_summary_text(lines):
+    """
+    Tokenize Keras `model.summary()` output in one pass over its lines.
+
+    Yields ('model', name), ('layer', layer dict) and ('footer', key, count)
+    events. Handles Keras 2 column tables (wrapped cells, blank or '_' row
+    separators, an optional 'Connected to' column) and Keras 3 box-drawn
+    tables. Only the row being assembled is held in memory.
+    """
+    table = None
+    row = None
+
+    for line in lines:
+        footer = _FOOTER.match(line)
+        if footer:
+            if row is not None:
+                yield 'layer', _summary_layer(row)
+                row = None
+            table = None
+            yield 'footer', _FOOTER_KEYS[footer.group(1)], _parse_count(footer.group(2))
+            continue
+
+        if table is None:
+            if 'Layer (type)' in line:
+                table = _SummaryTable(line)
+            else:
+                model_name = _MODEL_NAME.match(line)
+                if model_name:
+                    yield 'model', model_name.group(1)
+            continue
+
+        if set(line) <= _RULE_CHARS:
+            # Separator, border or blank line between rows
+            if row is not None and _complete(row):
+                yield 'layer', _summary_layer(row)
+                row = None
+            continue
+
+        cells = table.cells(line)
+        if row is None:
+            row = cells
+        elif not _complete(row) or not cells[0]:
+            row = _merge(row, cells)
+        else:
+            yield 'layer', _summary_layer(row)
+            row = cells
+
+    if row is not None:
+        yield 'layer', _summary_layer(row)
+
+
+def parse_summary_text(lines):
+    """
+    Model summary from the lines of `model.summary()` output (any iterable of str)
+    """
+    summary = _empty_summary()
+    layer_parameters = 0
+    footer = {}
+
+    for event in iter_summary_text(lines):
+        if event[0] == 'layer':
+            summary['layers'].append(event[1])
+            layer_parameters += event[1]['parameters']
+        elif event[0] == 'model':
+            summary['model_name'] = summary['model_name'] or event[1]
+        else:
+            footer[event[1]] = event[2]
+
+    summary['total_layers'] = len(summary['layers'])
+    summary['total_parameters'] = footer.pop('total_parameters', layer_parameters)
+    summary.update(footer)
+    return summary
+
+
+# --- Keras model_config JSON ----------------------------------------------------------
+
+class _JsonStream:
+    """
+    Pull reader over a text stream that decodes one JSON value at a time,
+    keeping only the unread tail of the input buffered
+    """
+
+    _decoder = json.JSONDecoder()
+
+    def __init__(self, stream, chunk_size=READ_CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, at_least):
+        if self.eof:
+            return False
+        self.buffer = self.buffer[self.pos:]
+        self.pos = 0
+        chunk = self.stream.read(max(self.chunk_size, at_least))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer += chunk
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill(0):
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos} of the buffered input")
+        self.pos += 1
+
+    def value(self):
+        """
+        Decode the next complete value, reading more input until it is whole
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Grow geometrically so a large value is re-scanned O(log n) times
+                if not self._fill(len(self.buffer) - self.pos):
+                    raise
+                continue
+            if end == len(self.buffer) and not self.eof and self.buffer[end - 1] not in '"]}':
+                # A number or literal may continue in the next chunk
+                if self._fill(0):
+                    continue
+            self.pos = end
+            return value
+
+
+# Keys descended into on the way to the layer list; anything else is decoded whole
+_CONFIG_CONTAINERS = ('config', 'model_config')
+_TRAINING_KEYS = ('training_config', 'compile_config')
+
+
+def iter_config_json(stream):
+    """
+    Read a Keras model config (`model.to_json()`, a `.keras` archive's
+    config.json or an H5 `model_config` attribute) incrementally.
+
+    Yields ('model', class_name, name), ('layer', layer dict) and
+    ('training', optimizer, loss) events. Layers are decoded one element at a
+    time from the `layers` array, so memory is bounded by the largest layer.
+    """
+    reader = _JsonStream(stream)
+
+    def walk_object(path):
+        reader.expect('{')
+        class_name = name = None
+        first = True
+        while reader.peek() != '}':
+            if not first:
+                reader.expect(',')
+            first = False
+            key = reader.value()
+            reader.expect(':')
+
+            if key == 'layers' and reader.peek() == '[':
+                reader.expect('[')
+                while reader.peek() != ']':
+                    if reader.peek() == ',':
+                        reader.expect(',')
+                    yield 'layer', reader.value()
+                reader.expect(']')
+            elif key in _CONFIG_CONTAINERS and reader.peek() == '{' and len(path) < 3:
+                yield from walk_object(path + (key,))
+            else:
+                value = reader.value()
+                if key == 'class_name':
+                    class_name = value
+                elif key == 'name':
+                    name = value
+                elif key in _TRAINING_KEYS:
+                    yield ('training',) + describe_training_config(value, NOT_AVAILABLE)
+        reader.expect('}')
+        if class_name is not None or name is not None:
+            yield 'model', class_name, name
+
+    if reader.peek() == '{':
+        yield from walk_object(())
+    elif reader.peek() == '[':
+        # A bare layer list
+        reader.expect('[')
+        while reader.peek() != ']':
+            if reader.peek() == ',':
+                reader.expect(',')
+            yield 'layer', reader.value()
+        reader.expect(']')
+
+
+def _config_layer(layer, previous):
+    layer_config = layer.get('config', {}) if isinstance(layer.get('config'), dict) else {}
+    name = layer.get('name') or layer_config.get('name')
+    inbound_nodes = layer.get('inbound_nodes')
+    return {
+        'name': name,
+        'type': layer.get('class_name', 'Unknown'),
+        # Configs describe topology only; weights and their counts live elsewhere
+        'parameters': 0,
+        'inbound': parse_inbound_nodes(inbound_nodes) if inbound_nodes is not None else
+                   ([previous] if previous else [])
+    }
+
+
+def parse_config_json(stream):
+    """
+    Model summary from a Keras model config JSON stream
+    """
+    summary = _empty_summary()
+    previous = None
+
+    for event in iter_config_json(stream):
+        if event[0] == 'layer':
+            if not isinstance(event[1], dict):
+                raise ValueError(f"Expected a layer object, got {type(event[1]).__name__}")
+            layer = _config_layer(event[1], previous)
+            summary['layers'].append(layer)
+            previous = layer['name']
+        elif event[0] == 'training':
+            summary['optimizer'], summary['loss_function'] = event[1], event[2]
+        else:
+            # Objects close innermost first: the name sits in the inner `config`,
+            # the model's class on the outermost object
+            summary['model_class'] = event[1] or summary.get('model_class')
+            summary['model_name'] = summary['model_name'] or event[2]
+
+    summary['total_layers'] = len(summary['layers'])
+    return summary
+
+
+# --- Python model definitions ---------------------------------------------------------
+
+KERAS_LAYER_NAMES = {
+    'Input', 'InputLayer', 'Dense', 'Conv1D', 'Conv2D', 'Conv3D', 'Conv1DTranspose', 'Conv2DTranspose',
+    'Conv3DTranspose', 'SeparableConv1D', 'SeparableConv2D', 'DepthwiseConv2D', 'LSTM', 'GRU', 'SimpleRNN',
+    'Bidirectional', 'TimeDistributed', 'Embedding', 'Dropout', 'SpatialDropout1D', 'SpatialDropout2D',
+    'Flatten', 'Reshape', 'Permute', 'RepeatVector', 'BatchNormalization', 'LayerNormalization',
+    'MaxPooling1D', 'MaxPooling2D', 'MaxPooling3D', 'AveragePooling1D', 'AveragePooling2D',
+    'AveragePooling3D', 'GlobalMaxPooling1D', 'GlobalMaxPooling2D', 'GlobalAveragePooling1D',
+    'GlobalAveragePooling2D', 'Activation', 'ReLU', 'LeakyReLU', 'Softmax', 'Concatenate', 'Add',
+    'Multiply', 'Average', 'Attention', 'MultiHeadAttention', 'ZeroPadding2D', 'UpSampling2D', 'Rescaling',
+    'Resizing'
+}
+_LAYER_MODULES = ('layers', 'nn')
+_CONTAINER_NAMES = {'Sequential', 'Model', 'Module', 'ModuleList', 'ModuleDict', 'Functional'}
+_OPTIMIZER_MODULES = ('optimizers', 'optim')
+
+
+def _dotted_name(node):
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+        return '.'.join(reversed(parts))
+    return None
+
+
+def _literal(node):
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return None
+
+
+def _torch_parameters(layer_type, args, kwargs):
+    """
+    Parameter count of the common torch.nn layers, when their sizes are literals
+    """
+    def arg(index, key, default=None):
+        value = kwargs.get(key, args[index] if index < len(args) else default)
+        return value if isinstance(value, int) else None
+
+    bias = kwargs.get('bias', True) is not False
+    if layer_type == 'Linear':
+        inputs, outputs = arg(0, 'in_features'), arg(1, 'out_features')
+        return inputs * outputs + (outputs if bias else 0) if inputs and outputs else 0
+    if layer_type in ('Conv1d', 'Conv2d', 'Conv3d'):
+        inputs, outputs, kernel = arg(0, 'in_channels'), arg(1, 'out_channels'), kwargs.get(
+            'kernel_size', args[2] if len(args) > 2 else None)
+        groups = kwargs.get('groups') if isinstance(kwargs.get('groups'), int) else 1
+        dims = int(layer_type[-2])
+        if isinstance(kernel, int):
+            kernel = (kernel,) * dims
+        if inputs and outputs and isinstance(kernel, tuple) and all(isinstance(k, int) for k in kernel):
+            weights = inputs // groups * outputs
+            for k in kernel:
+                weights *= k
+            return weights + (outputs if bias else 0)
+        return 0
+    if layer_type == 'Embedding':
+        count, dim = arg(0, 'num_embeddings'), arg(1, 'embedding_dim')
+        return count * dim if count and dim else 0
+    if layer_type in ('BatchNorm1d', 'BatchNorm2d', 'BatchNorm3d', 'LayerNorm'):
+        features = arg(0, 'num_features' if layer_type != 'LayerNorm' else 'normalized_shape')
+        return 2 * features if features else 0
+    return 0
+
+
+class _DefinitionVisitor:
+    """
+    Collect layer constructor calls, optimizers and losses in source order.
+
+    Only class definitions and calls are of interest, so nodes come from a
+    flat ast.walk() instead of NodeVisitor's per-node dispatch, which costs
+    several times the parse itself on large generated sources.
+    """
+
+    def __init__(self):
+        self.layers = []
+        self.optimizer = NOT_AVAILABLE
+        self.loss_function = NOT_AVAILABLE
+        self.model_class = None
+        self._positions = {}
+
+    def visit(self, tree):
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call):
+                self.visit_Call(node)
+            elif isinstance(node, ast.ClassDef):
+                self.visit_ClassDef(node)
+        # ast.walk is breadth-first
+        self.layers.sort(key=lambda layer: layer.pop('_position'))
+        for index, layer in enumerate(self.layers):
+            layer['name'] = layer['name'] or f"{layer['type'].lower()}_{index}"
+
+    def _record(self, attribute, node, value):
+        """
+        Keep the candidate that comes last in the source, not the last one ast.walk reaches
+        """
+        position = (node.lineno, node.col_offset)
+        if position >= self._positions.get(attribute, (0, -1)):
+            self._positions[attribute] = position
+            setattr(self, attribute, value)
+
+    def visit_ClassDef(self, node):
+        if self.model_class is None and any((_dotted_name(base) or '').split('.')[-1] in _CONTAINER_NAMES
+                                            for base in node.bases):
+            self.model_class = node.name
+
+    def visit_Call(self, node):
+        dotted = _dotted_name(node.func) or ''
+        parts = dotted.split('.')
+        short = parts[-1]
+        kwargs = {kw.arg: _literal(kw.value) for kw in node.keywords if kw.arg}
+
+        if short == 'compile':
+            for kw in node.keywords:
+                if kw.arg in ('optimizer', 'loss'):
+                    value = _literal(kw.value)
+                    if value is None and isinstance(kw.value, ast.Call):
+                        value = (_dotted_name(kw.value.func) or '').split('.')[-1]
+                    if value is not None:
+                        self._record('optimizer' if kw.arg == 'optimizer' else 'loss_function',
+                                     kw.value, str(value))
+        elif any(module in parts[:-1] for module in _OPTIMIZER_MODULES) and short[:1].isupper():
+            self._record('optimizer', node, short)
+        elif short.endswith('Loss') and short[:1].isupper():
+            self._record('loss_function', node, short)
+        elif short not in _CONTAINER_NAMES and short[:1].isupper() and (
+                short in KERAS_LAYER_NAMES or any(module in parts[:-1] for module in _LAYER_MODULES)):
+            args = [_literal(arg) for arg in node.args]
+            torch_layer = 'nn' in parts[:-1]
+            self.layers.append({
+                '_position': (node.lineno, node.col_offset),
+                'name': kwargs.get('name') if isinstance(kwargs.get('name'), str) else None,
+                'type': short,
+                'parameters': _torch_parameters(short, args, kwargs) if torch_layer else 0,
+                'config': {
+                    'args': args,
+                    **{key: value for key, value in kwargs.items() if key != 'name'}
+                }
+            })
+
+
+def parse_python_source(source, filename='<model>'):
+    """
+    Model summary from Python source defining a Keras or PyTorch model,
+    found by walking its AST rather than matching text
+    """
+    visitor = _DefinitionVisitor()
+    visitor.visit(ast.parse(source, filename=filename))
+
+    summary = _empty_summary(visitor.model_class)
+    summary['layers'] = visitor.layers
+    summary['total_layers'] = len(visitor.layers)
+    summary['total_parameters'] = sum(layer['parameters'] for layer in visitor.layers)
+    summary['optimizer'] = visitor.optimizer
+    summary['loss_function'] = visitor.loss_function
+    return summary
+
+
+# --- Dispatch ------------------------------------------------------------------------
+
+def parse_model_stream(stream, file_ext):
+    """
+    Parse a text stream by file extension: '.json' configs, '.py' sources,
+    anything else as `model.summary()` output
+    """
+    if file_ext == '.json':
+        return parse_config_json(stream)
+    if file_ext == '.py':
+        # The AST needs the whole module, but source files are small
+        return parse_python_source(stream.read())
+    return parse_summary_text(stream)
+
 
 def parse_model_file(file_path):
     try:
         # Detect file type and parse accordingly
         file_ext = os.path.splitext(file_path)[1].lower()
-        
-        with open(file_path, 'r') as f:
-            content = f.read()
-        
-        if file_ext == '.json':
-            # If it's a JSON file, load directly
-            model_data = json.load(f)
-        else:
-            # Use custom parsing for text/Python files
-            model_data = extract_model_details(content)
-        
-        return {
-            'total_layers': model_data.get('total_layers', 0),
-            'total_parameters': model_data.get('total_parameters', 0),
-            'optimizer': model_data.get('optimizer', 'N/A'),
-            'loss_function': model_data.get('loss_function', 'N/A'),
-            'layers': model_data.get('layers', [])
-        }
+
+        with open(file_path, 'r', encoding='utf-8') as f:
+            model_data = parse_model_stream(f, file_ext)
+
+        model_data['model_name'] = model_data.get('model_name') or os.path.basename(file_path)
+        return model_data
     except Exception as e:
         return {
             'error': str(e)
         }
 
+
 @app.route('/upload-model-file', methods=['POST'])
 def upload_model_file():
     # Check if file is present in the request
     if 'file' not in request.files:
         return jsonify({'error': 'No file part'}), 400
-    
+
     file = request.files['file']
-    
+
     # Check if filename is empty
     if file.filename == '':
         return jsonify({'error': 'No selected file'}), 400
-    
+
     # Check if file is allowed
     if file and allowed_file(file.filename):
-        # Secure the filename and save it
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        
-        # Ensure upload folder exists
-        os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-        
-        # Save the file
-        file.save(filepath)
-        
-        # Parse the model file
-        model_summary = parse_model_file(filepath)
-        
-        # Optional: Remove the file after processing
-        os.remove(filepath)
-        
+        file_ext = os.path.splitext(file.filename)[1].lower()
+
+        # Parse straight from the upload stream; nothing is written to disk
+        try:
+            model_summary = parse_model_stream(io.TextIOWrapper(file.stream, encoding='utf-8'), file_ext)
+        except Exception as e:
+            return jsonify({'error': str(e)}), 422
+
+        model_summary['model_name'] = model_summary.get('model_name') or file.filename
         return jsonify(model_summary)
-    
+
     return jsonify({'error': 'File type not allowed'}), 400
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
@@ -0,0 +1,259 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content_hash TEXT NOT NULL UNIQUE,
+    filename TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    uploaded_at REAL NOT NULL,
+    summary TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_models_uploaded_at ON models (uploaded_at, id);
+CREATE INDEX IF NOT EXISTS idx_models_path ON models (path, uploaded_at);
+CREATE TABLE IF NOT EXISTS model_diffs (
+    hash_a TEXT NOT NULL,
+    hash_b TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (hash_a, hash_b)
+);
+CREATE TABLE IF NOT EXISTS explanations (
+    model_hash TEXT NOT NULL,
+    input_hash TEXT NOT NULL,
+    method TEXT NOT NULL,
+    params TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (model_hash, input_hash, method, params)
+);
+CREATE TABLE IF NOT EXISTS analyses (
+    summary_hash TEXT NOT NULL,
+    prompt_version INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (summary_hash, prompt_version, model)
+);
+CREATE TABLE IF NOT EXISTS cost_profiles (
+    content_hash TEXT NOT NULL,
+    input_shapes TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (content_hash, input_shapes, version)
+);
+"""
+
+RECORD_COLUMNS = 'id, content_hash, filename, path, size, uploaded_at, summary IS NOT NULL AS has_summary'
+
+
+class ModelRegistry:
+    """
+    SQLite index of uploaded models, deduplicated by content hash.
+
+    Every lookup (by id, by hash, latest, keyset pages ordered by upload
+    time) is served from a B-tree index, so nothing ever rescans the uploads
+    folder. Connections are per thread; WAL mode lets readers run alongside
+    the single writer.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _record(row, include_summary=False):
+        if row is None:
+            return None
+        record = {key: row[key] for key in row.keys() if key not in ('summary', 'has_summary')}
+        record['has_summary'] = bool(row['has_summary'])
+        if include_summary:
+            record['summary'] = json.loads(row['summary']) if row['summary'] else None
+        return record
+
+    def _fetch_one(self, where, params, include_summary):
+        columns = f"{RECORD_COLUMNS}, summary" if include_summary else RECORD_COLUMNS
+        row = self._connect().execute(f"SELECT {columns} FROM models {where}", params).fetchone()
+        return self._record(row, include_summary)
+
+    def register(self, path, content_hash, size, filename=None):
+        """
+        Record an upload. Returns (record, created); when a model with the same
+        content already exists its record is returned (with a refreshed upload
+        time) and created is False.
+        """
+        now = time.time()
+        filename = filename or os.path.basename(path)
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO models (content_hash, filename, path, size, uploaded_at) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (content_hash) DO NOTHING",
+                (content_hash, filename, os.path.abspath(path), size, now)
+            )
+            created = cursor.rowcount == 1
+            if not created:
+                existing = self.get_by_hash(content_hash)
+                if existing is not None and not os.path.exists(existing['path']):
+                    # The stored copy went missing; adopt the new one
+                    conn.execute("UPDATE models SET path = ?, filename = ? WHERE id = ?",
+                                 (os.path.abspath(path), filename, existing['id']))
+                conn.execute("UPDATE models SET uploaded_at = ? WHERE content_hash = ?", (now, content_hash))
+
+        return self.get_by_hash(content_hash), created
+
+    def set_summary(self, model_id, summary):
+        conn = self._connect()
+        with conn:
+            conn.execute("UPDATE models SET summary = ? WHERE id = ?", (json.dumps(summary), model_id))
+
+    def get(self, model_id, include_summary=False):
+        return self._fetch_one("WHERE id = ?", (model_id,), include_summary)
+
+    def get_by_hash(self, content_hash, include_summary=False):
+        return self._fetch_one("WHERE content_hash = ?", (content_hash.lower(),), include_summary)
+
+    def get_by_path(self, path, include_summary=False):
+        return self._fetch_one("WHERE path = ? ORDER BY uploaded_at DESC LIMIT 1",
+                               (os.path.abspath(path),), include_summary)
+
+    def latest(self, include_summary=False):
+        return self._fetch_one("ORDER BY uploaded_at DESC, id DESC LIMIT 1", (), include_summary)
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM models").fetchone()[0]
+
+    def list(self, limit=20, cursor=None):
+        """
+        Newest-first keyset pagination. `cursor` is the opaque `next_cursor`
+        from the previous page; returns (records, next_cursor or None).
+        """
+        params = []
+        where = ''
+        if cursor:
+            uploaded_at, model_id = cursor.split(':', 1)
+            where = "WHERE (uploaded_at, id) < (?, ?)"
+            params = [float(uploaded_at), int(model_id)]
+
+        rows = self._connect().execute(
+            f"SELECT {RECORD_COLUMNS} FROM models {where} "
+            "ORDER BY uploaded_at DESC, id DESC LIMIT ?",
+            params + [limit + 1]
+        ).fetchall()
+
+        records = [self._record(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = records[-1]
+            next_cursor = f"{last['uploaded_at']!r}:{last['id']}"
+        return records, next_cursor
+
+    def get_diff(self, hash_a, hash_b):
+        """
+        Cached diff between two model contents, or None
+        """
+        row = self._connect().execute(
+            "SELECT result FROM model_diffs WHERE hash_a = ? AND hash_b = ?", (hash_a, hash_b)
+        ).fetchone()
+        return json.loads(row['result']) if row is not None else None
+
+    def put_diff(self, hash_a, hash_b, result):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO model_diffs (hash_a, hash_b, result, created_at) VALUES (?, ?, ?, ?)",
+                (hash_a, hash_b, json.dumps(result), time.time())
+            )
+
+    def get_explanation(self, model_hash, input_hash, method, params):
+        """
+        Cached explanation for (model content, input array, method, canonical params), or None
+        """
+        row = self._connect().execute(
+            "SELECT result FROM explanations "
+            "WHERE model_hash = ? AND input_hash = ? AND method = ? AND params = ?",
+            (model_hash, input_hash, method, params)
+        ).fetchone()
+        return json.loads(row['result']) if row is not None else None
+
+    def put_explanation(self, model_hash, input_hash, method, params, result):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO explanations "
+                "(model_hash, input_hash, method, params, result, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (model_hash, input_hash, method, params, json.dumps(result), time.time())
+            )
+
+    def get_analysis(self, summary_hash, prompt_version, model):
+        """
+        Cached LLM analysis of a summary for a prompt version and model, or None
+        """
+        row = self._connect().execute(
+            "SELECT result FROM analyses WHERE summary_hash = ? AND prompt_version = ? AND model = ?",
+            (summary_hash, prompt_version, model)
+        ).fetchone()
+        return json.loads(row['result']) if row is not None else None
+
+    def put_analysis(self, summary_hash, prompt_version, model, result):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO analyses "
+                "(summary_hash, prompt_version, model, result, created_at) VALUES (?, ?, ?, ?, ?)",
+                (summary_hash, prompt_version, model, json.dumps(result), time.time())
+            )
+
+    def get_cost_profile(self, content_hash, input_shapes, version):
+        """
+        Cached cost profile of a model content for an input-shape override and profile version, or None
+        """
+        row = self._connect().execute(
+            "SELECT result FROM cost_profiles WHERE content_hash = ? AND input_shapes = ? AND version = ?",
+            (content_hash, input_shapes, version)
+        ).fetchone()
+        return json.loads(row['result']) if row is not None else None
+
+    def put_cost_profile(self, content_hash, input_shapes, version, result):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cost_profiles "
+                "(content_hash, input_shapes, version, result, created_at) VALUES (?, ?, ?, ?, ?)",
+                (content_hash, input_shapes, version, json.dumps(result), time.time())
+            )
+
+    def import_directory(self, directory, is_model_file, hash_file):
+        """
+        One-off backfill of model files that predate the registry, oldest first
+        """
+        entries = [
+            entry for entry in os.scandir(directory)
+            if entry.is_file() and is_model_file(entry.name)
+        ]
+        for entry in sorted(entries, key=lambda e: e.stat().st_mtime):
+            record, created = self.register(entry.path, hash_file(entry.path), entry.stat().st_size)
+            if created:
+                # Keep the original ordering rather than the import time
+                with self._connect() as conn:
+                    conn.execute("UPDATE models SET uploaded_at = ? WHERE id = ?",
+                                 (entry.stat().st_mtime, record['id']))
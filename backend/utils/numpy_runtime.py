@@ -0,0 +1,660 @@
+import time
+import threading
+from collections import OrderedDict
+
+import h5py
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from utils.keras_h5 import decode_attr, find_weights_root, iter_config_layers, load_json_attr
+
+
+DEFAULT_BATCH_SIZE = 64
+COMPUTE_DTYPE = np.float32
+
+# Layers that only matter during training
+IDENTITY_LAYERS = {
+    'InputLayer', 'Dropout', 'SpatialDropout1D', 'SpatialDropout2D', 'SpatialDropout3D',
+    'GaussianNoise', 'GaussianDropout', 'AlphaDropout', 'ActivityRegularization',
+    'RandomFlip', 'RandomRotation', 'RandomZoom', 'RandomTranslation', 'RandomContrast',
+    'RandomBrightness', 'RandomCrop', 'RandomHeight', 'RandomWidth', 'Masking'
+}
+NESTED_MODELS = {'Sequential', 'Functional', 'Model'}
+
+
+class UnsupportedModelError(ValueError):
+    """
+    The model uses a layer or option the NumPy runtime does not implement
+    """
+
+
+def _softmax(x, axis=-1, out=None):
+    shifted = np.subtract(x, x.max(axis=axis, keepdims=True), out=out)
+    np.exp(shifted, out=shifted)
+    shifted /= shifted.sum(axis=axis, keepdims=True)
+    return shifted
+
+
+def _sigmoid(x, out=None):
+    out = np.negative(x, out=out)
+    np.exp(out, out=out)
+    out += 1
+    return np.reciprocal(out, out=out)
+
+
+def _erf(x, out=None):
+    """
+    Abramowitz & Stegun 7.1.26, |error| < 1.5e-7 (a couple of float32 ulps near 1)
+    """
+    z = np.abs(x)
+    t = 1 / (1 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    result = 1 - poly * np.exp(-z * z)
+    return np.multiply(np.sign(x), result, out=out)
+
+
+def _gelu(x, out=None, approximate=False):
+    """
+    Keras' gelu: the exact x * Phi(x) by default, the tanh form with approximate=True
+    """
+    if not approximate:
+        inner = _erf(x * np.float32(1 / np.sqrt(2)))
+    else:
+        inner = np.multiply(x, x, out=np.empty_like(x))
+        inner *= 0.044715 * x
+        inner += x
+        inner *= np.sqrt(2 / np.pi)
+        np.tanh(inner, out=inner)
+    inner += 1
+    return np.multiply(x * 0.5, inner, out=out)
+
+
+ACTIVATIONS = {
+    'linear': lambda x, out: x if out is None else np.copyto(out, x) or out,
+    'relu': lambda x, out: np.maximum(x, 0, out=out),
+    'relu6': lambda x, out: np.clip(x, 0, 6, out=out),
+    'sigmoid': lambda x, out: _sigmoid(x, out=out),
+    'hard_sigmoid': lambda x, out: np.clip(x / 6 + 0.5, 0, 1, out=out),
+    'tanh': lambda x, out: np.tanh(x, out=out),
+    'softmax': lambda x, out: _softmax(x, out=out),
+    'softplus': lambda x, out: np.logaddexp(x, 0, out=out),
+    'softsign': lambda x, out: np.divide(x, 1 + np.abs(x), out=out),
+    'elu': lambda x, out: np.where(x > 0, x, np.expm1(np.minimum(x, 0)), out=out),
+    'selu': lambda x, out: np.multiply(
+        1.0507009873554805, np.where(x > 0, x, 1.6732632423543772 * np.expm1(np.minimum(x, 0))), out=out),
+    'swish': lambda x, out: np.multiply(x, _sigmoid(x), out=out),
+    'silu': lambda x, out: np.multiply(x, _sigmoid(x), out=out),
+    'gelu': lambda x, out: _gelu(x, out=out),
+    'exponential': lambda x, out: np.exp(x, out=out),
+    'leaky_relu': lambda x, out: np.where(x > 0, x, 0.2 * x, out=out),
+}
+
+
+def _activation_name(activation):
+    if isinstance(activation, dict):
+        activation = activation.get('config', {}).get('name') or activation.get('class_name')
+    return (activation or 'linear').lower()
+
+
+def get_activation(activation):
+    name = _activation_name(activation)
+    if name not in ACTIVATIONS:
+        raise UnsupportedModelError(f"Unsupported activation: {name}")
+    settings = activation.get('config') if isinstance(activation, dict) else None
+    if name == 'gelu' and isinstance(settings, dict) and settings.get('approximate'):
+        return lambda x, out: _gelu(x, out=out, approximate=True)
+    return ACTIVATIONS[name]
+
+
+def _pair(value):
+    return tuple(value) if isinstance(value, (list, tuple)) else (value, value)
+
+
+def _same_padding(size, kernel, stride, dilation=1):
+    effective = (kernel - 1) * dilation + 1
+    out = -(-size // stride)
+    total = max((out - 1) * stride + effective - size, 0)
+    return total // 2, total - total // 2
+
+
+class WeightStore:
+    """
+    Lazily reads weight tensors from an H5 file the first time a layer runs
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+
+    def load(self, dataset_paths):
+        with self._lock, h5py.File(self.file_path, 'r') as model_file:
+            return {name: np.asarray(model_file[path][...], dtype=COMPUTE_DTYPE)
+                    for name, path in dataset_paths.items()}
+
+
+class Layer:
+    """
+    One executable layer. Subclasses implement `build` (turn raw weights into
+    what the forward pass needs) and `call`; outputs go to per-shape buffers
+    that are reused across batches.
+    """
+
+    def __init__(self, name, config, weight_paths=None, store=None):
+        self.name = name
+        self.config = config
+        self._weight_paths = weight_paths or {}
+        self._store = store
+        self._built = False
+        self._buffers = OrderedDict()
+
+    def buffer(self, shape, key='out'):
+        """
+        Preallocated activation buffer for this layer and shape (kept for the last two shapes)
+        """
+        shape = tuple(shape)
+        buf = self._buffers.get((key, shape))
+        if buf is None:
+            buf = np.empty(shape, dtype=COMPUTE_DTYPE)
+            self._buffers[(key, shape)] = buf
+            while len(self._buffers) > 4:
+                self._buffers.popitem(last=False)
+        return buf
+
+    def __call__(self, *inputs):
+        if not self._built:
+            weights = self._store.load(self._weight_paths) if self._weight_paths else {}
+            self.build(weights)
+            self._built = True
+        return self.call(*inputs)
+
+    def build(self, weights):
+        pass
+
+    def call(self, x):
+        raise NotImplementedError
+
+
+class Identity(Layer):
+    def call(self, *inputs):
+        return inputs[0]
+
+
+class Dense(Layer):
+    def build(self, weights):
+        self.kernel = weights['kernel']
+        self.bias = weights.get('bias') if self.config.get('use_bias', True) else None
+        self.activation = get_activation(self.config.get('activation'))
+
+    def call(self, x):
+        out = self.buffer(x.shape[:-1] + (self.kernel.shape[1],))
+        np.matmul(x, self.kernel, out=out)
+        if self.bias is not None:
+            out += self.bias
+        return self.activation(out, out)
+
+
+class Conv2D(Layer):
+    """
+    channels_last 2-D convolution via im2col: a strided window view gathered
+    into a reusable column buffer, then one matmul against the flattened kernel
+    """
+
+    def build(self, weights):
+        if self.config.get('data_format', 'channels_last') != 'channels_last':
+            raise UnsupportedModelError(f"{self.name}: only channels_last convolutions are supported")
+        if self.config.get('groups', 1) != 1:
+            raise UnsupportedModelError(f"{self.name}: grouped convolutions are not supported")
+
+        kernel = weights['kernel']
+        self.kh, self.kw, self.cin, self.filters = kernel.shape
+        self.kernel = np.ascontiguousarray(kernel.reshape(-1, self.filters))
+        self.bias = weights.get('bias') if self.config.get('use_bias', True) else None
+        self.strides = _pair(self.config.get('strides', 1))
+        self.dilation = _pair(self.config.get('dilation_rate', 1))
+        self.padding = self.config.get('padding', 'valid')
+        self.activation = get_activation(self.config.get('activation'))
+
+    def call(self, x):
+        (sh, sw), (dh, dw) = self.strides, self.dilation
+        if self.padding == 'same':
+            pad_h = _same_padding(x.shape[1], self.kh, sh, dh)
+            pad_w = _same_padding(x.shape[2], self.kw, sw, dw)
+            if any(pad_h + pad_w):
+                x = np.pad(x, ((0, 0), pad_h, pad_w, (0, 0)))
+
+        eff_h, eff_w = (self.kh - 1) * dh + 1, (self.kw - 1) * dw + 1
+        # (N, OH, OW, C, eff_h, eff_w) view; no data is copied yet
+        windows = sliding_window_view(x, (eff_h, eff_w), axis=(1, 2))[:, ::sh, ::sw, :, ::dh, ::dw]
+        n, oh, ow = windows.shape[:3]
+
+        cols = self.buffer((n, oh, ow, self.kh, self.kw, self.cin), key='cols')
+        np.copyto(cols, windows.transpose(0, 1, 2, 4, 5, 3))
+
+        out = self.buffer((n, oh, ow, self.filters))
+        np.matmul(cols.reshape(n * oh * ow, -1), self.kernel, out=out.reshape(n * oh * ow, self.filters))
+        if self.bias is not None:
+            out += self.bias
+        return self.activation(out, out)
+
+
+class Pooling2D(Layer):
+    reducer = None
+
+    def build(self, weights):
+        if self.config.get('data_format', 'channels_last') != 'channels_last':
+            raise UnsupportedModelError(f"{self.name}: only channels_last pooling is supported")
+        self.pool = _pair(self.config.get('pool_size', 2))
+        self.strides = _pair(self.config.get('strides') or self.pool)
+        self.padding = self.config.get('padding', 'valid')
+
+    def _windows(self, x, fill):
+        (ph, pw), (sh, sw) = self.pool, self.strides
+        if self.padding == 'same':
+            pad_h = _same_padding(x.shape[1], ph, sh)
+            pad_w = _same_padding(x.shape[2], pw, sw)
+            x = np.pad(x, ((0, 0), pad_h, pad_w, (0, 0)), constant_values=fill)
+        return sliding_window_view(x, (ph, pw), axis=(1, 2))[:, ::sh, ::sw]
+
+
+class MaxPooling2D(Pooling2D):
+    def call(self, x):
+        windows = self._windows(x, -np.inf)
+        out = self.buffer(windows.shape[:4])
+        return np.max(windows, axis=(4, 5), out=out)
+
+
+class AveragePooling2D(Pooling2D):
+    def call(self, x):
+        windows = self._windows(x, 0)
+        out = self.buffer(windows.shape[:4])
+        np.sum(windows, axis=(4, 5), out=out)
+        if self.padding == 'same':
+            # Padded positions don't count towards the average
+            counts = self._windows(np.ones((1,) + x.shape[1:3] + (1,), dtype=COMPUTE_DTYPE), 0)
+            out /= counts.sum(axis=(4, 5))
+        else:
+            out /= self.pool[0] * self.pool[1]
+        return out
+
+
+class GlobalPooling2D(Layer):
+    def call(self, x):
+        keepdims = self.config.get('keepdims', False)
+        reduce = np.max if self.__class__.__name__.startswith('GlobalMax') else np.mean
+        return reduce(x, axis=(1, 2), keepdims=keepdims).astype(COMPUTE_DTYPE, copy=False)
+
+
+class GlobalMaxPooling2D(GlobalPooling2D):
+    pass
+
+
+class GlobalAveragePooling2D(GlobalPooling2D):
+    pass
+
+
+class BatchNormalization(Layer):
+    def build(self, weights):
+        axis = self.config.get('axis', -1)
+        self.axis = axis[0] if isinstance(axis, list) else axis
+        eps = self.config.get('epsilon', 1e-3)
+        mean, variance = weights['moving_mean'], weights['moving_variance']
+        gamma = weights.get('gamma', np.ones_like(mean))
+        beta = weights.get('beta', np.zeros_like(mean))
+        # Fold the normalization into one multiply-add
+        self.scale = gamma / np.sqrt(variance + eps)
+        self.shift = beta - mean * self.scale
+
+    def call(self, x):
+        if self.axis % x.ndim != x.ndim - 1:
+            raise UnsupportedModelError(f"{self.name}: only last-axis batch normalization is supported")
+        out = self.buffer(x.shape)
+        np.multiply(x, self.scale, out=out)
+        out += self.shift
+        return out
+
+
+class Flatten(Layer):
+    def call(self, x):
+        return x.reshape(x.shape[0], -1)
+
+
+class Reshape(Layer):
+    def call(self, x):
+        return x.reshape((x.shape[0],) + tuple(self.config['target_shape']))
+
+
+class Activation(Layer):
+    def build(self, weights):
+        self.activation = get_activation(self.config.get('activation'))
+
+    def call(self, x):
+        # Write to our own buffer: the input may feed other branches
+        return self.activation(x, self.buffer(x.shape))
+
+
+class ReLU(Layer):
+    def call(self, x):
+        max_value = self.config.get('max_value')
+        slope = self.config.get('negative_slope', 0.0) or 0.0
+        threshold = self.config.get('threshold', 0.0) or 0.0
+        out = np.where(x >= threshold, x, slope * (x - threshold), out=self.buffer(x.shape))
+        if max_value is not None:
+            np.minimum(out, max_value, out=out)
+        return out
+
+
+class LeakyReLU(Layer):
+    def call(self, x):
+        slope = self.config.get('negative_slope', self.config.get('alpha', 0.3))
+        return np.where(x > 0, x, slope * x, out=self.buffer(x.shape))
+
+
+class Softmax(Layer):
+    def call(self, x):
+        return _softmax(x, axis=self.config.get('axis', -1), out=self.buffer(x.shape))
+
+
+class Rescaling(Layer):
+    def call(self, x):
+        out = np.multiply(x, self.config.get('scale', 1.0), out=self.buffer(x.shape))
+        out += self.config.get('offset', 0.0)
+        return out
+
+
+def resize_images(x, height, width, interpolation='bilinear'):
+    """
+    Bilinear / nearest resize of an (N, H, W, C) batch with half-pixel centers,
+    matching tf.image.resize
+    """
+    if x.shape[1:3] == (height, width):
+        return x
+
+    def coords(out_size, in_size):
+        scale = in_size / out_size
+        return np.clip((np.arange(out_size) + 0.5) * scale - 0.5, 0, in_size - 1)
+
+    ys, xs = coords(height, x.shape[1]), coords(width, x.shape[2])
+    if interpolation == 'nearest':
+        return x[:, np.round(ys).astype(int)][:, :, np.round(xs).astype(int)]
+
+    y0, x0 = np.floor(ys).astype(int), np.floor(xs).astype(int)
+    y1, x1 = np.minimum(y0 + 1, x.shape[1] - 1), np.minimum(x0 + 1, x.shape[2] - 1)
+    wy = (ys - y0).astype(COMPUTE_DTYPE)[None, :, None, None]
+    wx = (xs - x0).astype(COMPUTE_DTYPE)[None, None, :, None]
+    top = x[:, y0][:, :, x0] * (1 - wx) + x[:, y0][:, :, x1] * wx
+    bottom = x[:, y1][:, :, x0] * (1 - wx) + x[:, y1][:, :, x1] * wx
+    return top * (1 - wy) + bottom * wy
+
+
+class Resizing(Layer):
+    def call(self, x):
+        return resize_images(x, self.config['height'], self.config['width'],
+                             self.config.get('interpolation', 'bilinear'))
+
+
+class ZeroPadding2D(Layer):
+    def call(self, x):
+        padding = self.config.get('padding', 1)
+        if isinstance(padding, int):
+            padding = ((padding, padding), (padding, padding))
+        elif isinstance(padding[0], int):
+            padding = ((padding[0], padding[0]), (padding[1], padding[1]))
+        return np.pad(x, ((0, 0), tuple(padding[0]), tuple(padding[1]), (0, 0)))
+
+
+class Merge(Layer):
+    def call(self, *inputs):
+        out = self.buffer(np.broadcast_shapes(*(i.shape for i in inputs)))
+        np.copyto(out, inputs[0])
+        for other in inputs[1:]:
+            self.combine(out, other)
+        return self.finish(out, len(inputs))
+
+    def finish(self, out, count):
+        return out
+
+
+class Add(Merge):
+    combine = staticmethod(lambda out, x: np.add(out, x, out=out))
+
+
+class Subtract(Merge):
+    combine = staticmethod(lambda out, x: np.subtract(out, x, out=out))
+
+
+class Multiply(Merge):
+    combine = staticmethod(lambda out, x: np.multiply(out, x, out=out))
+
+
+class Maximum(Merge):
+    combine = staticmethod(lambda out, x: np.maximum(out, x, out=out))
+
+
+class Minimum(Merge):
+    combine = staticmethod(lambda out, x: np.minimum(out, x, out=out))
+
+
+class Average(Add):
+    def finish(self, out, count):
+        out /= count
+        return out
+
+
+class Concatenate(Layer):
+    def call(self, *inputs):
+        axis = self.config.get('axis', -1)
+        shape = list(inputs[0].shape)
+        shape[axis] = sum(i.shape[axis] for i in inputs)
+        return np.concatenate(inputs, axis=axis, out=self.buffer(shape))
+
+
+LAYER_TYPES = {
+    cls.__name__: cls for cls in (
+        Dense, Conv2D, MaxPooling2D, AveragePooling2D, GlobalMaxPooling2D, GlobalAveragePooling2D,
+        BatchNormalization, Flatten, Reshape, Activation, ReLU, LeakyReLU, Softmax, Rescaling,
+        Resizing, ZeroPadding2D, Add, Subtract, Multiply, Maximum, Minimum, Average, Concatenate
+    )
+}
+LAYER_TYPES.update({'MaxPool2D': MaxPooling2D, 'AvgPool2D': AveragePooling2D,
+                    'GlobalAvgPool2D': GlobalAveragePooling2D, 'GlobalMaxPool2D': GlobalMaxPooling2D})
+
+
+def _io_names(entries):
+    # [["name", 0, 0], ...] or a single ["name", 0, 0]
+    if entries and isinstance(entries[0], str):
+        entries = [entries]
+    return [entry[0] for entry in entries or []]
+
+
+def _input_shape(model_config):
+    config = model_config.get('config', {})
+    for layer in config.get('layers', []) if isinstance(config, dict) else []:
+        layer_config = layer.get('config', {})
+        shape = layer_config.get('batch_shape') or layer_config.get('batch_input_shape')
+        if shape:
+            return tuple(shape[1:])
+    shape = config.get('build_input_shape') if isinstance(config, dict) else None
+    return tuple(shape[1:]) if shape else None
+
+
+class Graph:
+    """
+    Executable DAG of layers built from a Keras model config. Nested
+    Sequential / Functional models become sub-graphs that run as one layer.
+    """
+
+    def __init__(self, model_config, weight_lookup, store):
+        self.layers = {}
+        self.inbound = {}
+        self.order = []
+        self.input_shape = _input_shape(model_config)
+
+        for layer in iter_config_layers(model_config):
+            name, class_name, config = layer['name'], layer['class_name'], layer['config']
+            if class_name in NESTED_MODELS:
+                nested = {'class_name': class_name, 'config': config}
+                runner = SubGraph(name, config, graph=Graph(nested, weight_lookup.scoped(name), store))
+            elif class_name in IDENTITY_LAYERS:
+                runner = Identity(name, config)
+            elif class_name in LAYER_TYPES:
+                runner = LAYER_TYPES[class_name](name, config, weight_lookup.for_layer(name), store)
+            else:
+                raise UnsupportedModelError(f"Unsupported layer type: {class_name} ({name})")
+
+            self.layers[name] = runner
+            self.inbound[name] = layer['inbound']
+            self.order.append(name)
+
+        config = model_config.get('config', {})
+        self.input_names = _io_names(config.get('input_layers')) or self.order[:1]
+        self.output_names = _io_names(config.get('output_layers')) or self.order[-1:]
+
+        # Last consumer of every tensor, so activations can be dropped as soon as possible
+        self.last_use = {}
+        for position, name in enumerate(self.order):
+            for source in self.inbound[name]:
+                self.last_use[source] = position
+
+    def run(self, x):
+        values = {}
+        for position, name in enumerate(self.order):
+            sources = self.inbound[name]
+            if name in self.input_names and not sources:
+                inputs = (x,)
+            else:
+                inputs = tuple(values[source] for source in sources) or (x,)
+            values[name] = self.layers[name](*inputs)
+
+            for source in sources:
+                if self.last_use.get(source) == position and source not in self.output_names:
+                    del values[source]
+
+        outputs = [values[name] for name in self.output_names]
+        return outputs[0] if len(outputs) == 1 else outputs
+
+
+class SubGraph(Layer):
+    def __init__(self, name, config, graph):
+        super().__init__(name, config)
+        self.graph = graph
+
+    def call(self, x):
+        return self.graph.run(x)
+
+
+class WeightLookup:
+    """
+    Maps layer names to dataset paths using each H5 layer group's `weight_names`
+    """
+
+    def __init__(self, weights_root, group_name=None, scope=None):
+        self.weights_root = weights_root
+        self.group_name = group_name
+        self.scope = scope
+
+    def _entries(self, group_name):
+        if self.weights_root is None or group_name not in self.weights_root:
+            return []
+        group = self.weights_root[group_name]
+        names = decode_attr(group.attrs.get('weight_names', []))
+        return [(name, f"{group.name}/{name}") for name in (names if isinstance(names, list) else [names])]
+
+    def scoped(self, nested_name):
+        return WeightLookup(self.weights_root, group_name=nested_name, scope=nested_name)
+
+    def for_layer(self, layer_name):
+        if self.scope is None:
+            entries = self._entries(layer_name)
+        else:
+            # Nested layers share their parent's group; pick the weights under this layer
+            entries = [(name, path) for name, path in self._entries(self.group_name)
+                       if f"/{layer_name}/" in f"/{name}"]
+        # 'dense/kernel:0' -> 'kernel'
+        return {name.rsplit('/', 1)[-1].split(':')[0]: path for name, path in entries}
+
+
+class NumpyModel:
+    """
+    CPU-only forward pass for a Keras H5 model: the graph comes from
+    `model_config`, weights are read from `model_weights` on first use.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        with h5py.File(file_path, 'r') as model_file:
+            model_config = load_json_attr(model_file, 'model_config')
+            if not isinstance(model_config, dict):
+                raise UnsupportedModelError('File has no Keras model_config')
+            weights_root = find_weights_root(model_file)
+            self.graph = Graph(model_config, WeightLookup(weights_root), WeightStore(file_path))
+        self.input_shape = self.graph.input_shape
+        self._lock = threading.Lock()
+
+    def predict(self, inputs, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Run the model over `inputs` (first axis is the sample axis) in batches
+        """
+        inputs = np.asarray(inputs, dtype=COMPUTE_DTYPE)
+        if self.input_shape and None not in self.input_shape and inputs.shape[1:] != self.input_shape:
+            raise ValueError(f"Expected input shape (N, {', '.join(map(str, self.input_shape))}), "
+                             f"got {inputs.shape}")
+
+        outputs = None
+        # Layer buffers are shared, so one batch runs at a time per model
+        with self._lock:
+            for start in range(0, len(inputs), batch_size):
+                batch_out = self.graph.run(inputs[start:start + batch_size])
+                if outputs is None:
+                    outputs = np.empty((len(inputs),) + batch_out.shape[1:], dtype=COMPUTE_DTYPE)
+                # Copy out of the reused activation buffer before the next batch overwrites it
+                outputs[start:start + len(batch_out)] = batch_out
+        return outputs
+
+
+def measure_throughput(model, inputs, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Samples/sec of batched execution versus naive one-sample-at-a-time evaluation
+    """
+    model.predict(inputs[:1])  # Load weights and allocate buffers outside the timings
+
+    start = time.perf_counter()
+    model.predict(inputs, batch_size=batch_size)
+    batched = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for sample in inputs:
+        model.predict(sample[None], batch_size=1)
+    per_sample = time.perf_counter() - start
+
+    return {
+        'samples': len(inputs),
+        'batch_size': batch_size,
+        'batched_samples_per_sec': len(inputs) / batched if batched else None,
+        'per_sample_samples_per_sec': len(inputs) / per_sample if per_sample else None,
+        'speedup': per_sample / batched if batched else None
+    }
+
+
+class ModelPool:
+    """
+    Small LRU of loaded models keyed by content hash
+    """
+
+    def __init__(self, max_models=4):
+        self.max_models = max_models
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, content_hash, file_path):
+        with self._lock:
+            model = self._models.get(content_hash)
+            if model is not None:
+                self._models.move_to_end(content_hash)
+                return model
+
+        model = NumpyModel(file_path)
+        with self._lock:
+            self._models[content_hash] = model
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+        return model
@@ -0,0 +1,204 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+HASH_CHUNK_SIZE = 1024 * 1024  # Read files in 1 MB blocks when hashing
+
+
+def file_fingerprint(file_path):
+    """
+    Cheap identity of a file on disk: absolute path, size and mtime (ns)
+    """
+    stat = os.stat(file_path)
+    return {
+        'path': os.path.abspath(file_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns
+    }
+
+
+def hash_file(file_path, chunk_size=HASH_CHUNK_SIZE):
+    """
+    Stream a file through SHA-256 without loading it into memory
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SummaryCache:
+    """
+    Two-level cache for results derived from a file (e.g. model summaries).
+
+    Entries are keyed on the file's absolute path and validated against its
+    size and mtime, so a replaced file is never served a stale result.
+    The in-memory level is an LRU bounded by entry count and by the
+    approximate encoded size of the cached values. The disk level keeps one
+    JSON file per source path so results survive a restart. Bump `version`
+    whenever the cached value's format changes to orphan older disk entries.
+    """
+
+    def __init__(self, cache_dir, max_entries=128, max_bytes=64 * 1024 * 1024, version=1):
+        self.cache_dir = cache_dir
+        self.version = version
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+    def _disk_path(self, path):
+        key = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _matches(self, entry, fingerprint):
+        return (entry.get('version') == self.version and
+                entry['fingerprint']['size'] == fingerprint['size'] and
+                entry['fingerprint']['mtime_ns'] == fingerprint['mtime_ns'])
+
+    def _remember(self, path, entry):
+        # Caller must hold the lock
+        old = self._entries.pop(path, None)
+        if old is not None:
+            self._total_bytes -= old['nbytes']
+
+        self._entries[path] = entry
+        self._total_bytes += entry['nbytes']
+
+        # Evict least recently used entries until both bounds hold
+        while self._entries and (len(self._entries) > self.max_entries or
+                                 self._total_bytes > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._total_bytes -= evicted['nbytes']
+
+    def _load_from_disk(self, path, fingerprint):
+        disk_path = self._disk_path(path)
+        try:
+            with open(disk_path, 'r') as f:
+                raw = f.read()
+            entry = json.loads(raw)
+        except (OSError, ValueError):
+            return None
+
+        if not self._matches(entry, fingerprint):
+            return None
+
+        entry['nbytes'] = len(raw)
+        return entry
+
+    def get_entry(self, file_path):
+        """
+        Return the cached entry (fingerprint, content_hash, value) for a file,
+        or None if nothing valid is cached
+        """
+        path = os.path.abspath(file_path)
+        try:
+            fingerprint = file_fingerprint(path)
+        except OSError:
+            self.invalidate(path)
+            return None
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and self._matches(entry, fingerprint):
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+
+        entry = self._load_from_disk(path, fingerprint)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self._remember(path, entry)
+            self.hits += 1
+            return entry
+
+    def get(self, file_path):
+        entry = self.get_entry(file_path)
+        return entry['value'] if entry is not None else None
+
+    def put(self, file_path, value, content_hash=None, fingerprint=None):
+        """
+        Store a value for a file in memory and on disk.
+
+        Pass the fingerprint taken *before* computing the value so that a
+        file replaced mid-computation is detected on the next lookup.
+        """
+        path = os.path.abspath(file_path)
+        if fingerprint is None:
+            fingerprint = file_fingerprint(path)
+        if content_hash is None:
+            content_hash = hash_file(path)
+
+        entry = {
+            'version': self.version,
+            'fingerprint': fingerprint,
+            'content_hash': content_hash,
+            'value': value
+        }
+        raw = json.dumps(entry)
+        entry['nbytes'] = len(raw)
+
+        # Write atomically so readers never see a half-written cache file
+        disk_path = self._disk_path(path)
+        tmp_path = f"{disk_path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                f.write(raw)
+            os.replace(tmp_path, disk_path)
+        except OSError as e:
+            print(f"Error writing cache file for {path}: {e}")
+
+        with self._lock:
+            self._remember(path, entry)
+        return entry
+
+    def get_or_compute(self, file_path, compute):
+        """
+        Return the cached value for a file, computing and storing it on a miss
+        """
+        entry = self.get_entry(file_path)
+        if entry is not None:
+            return entry['value']
+
+        fingerprint = file_fingerprint(file_path)
+        value = compute(file_path)
+        if isinstance(value, dict) and 'error' in value:
+            # Don't cache failures; the file may be mid-upload
+            return value
+        self.put(file_path, value, fingerprint=fingerprint)
+        return value
+
+    def invalidate(self, file_path):
+        """
+        Drop any cached result for a file, e.g. before it is overwritten
+        """
+        path = os.path.abspath(file_path)
+        with self._lock:
+            entry = self._entries.pop(path, None)
+            if entry is not None:
+                self._total_bytes -= entry['nbytes']
+        try:
+            os.remove(self._disk_path(path))
+        except OSError:
+            pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
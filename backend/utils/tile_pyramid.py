@@ -0,0 +1,299 @@
+import hashlib
+import json
+import math
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from utils.weight_stats import MAX_BLOCK_ELEMENTS, iter_dataset_blocks, open_weight_tensor
+
+
+TILE_SIZE = 256  # Tiles are TILE_SIZE x TILE_SIZE uint8 cells
+TILE_FORMAT_VERSION = 1  # Bump when the on-disk pyramid layout changes
+TILE_MODES = ('mean', 'max')
+MAX_SLICE_ELEMENTS = 1024 * 1024  # Largest raw slice served in one request
+
+
+class TileError(Exception):
+    """
+    A tile or slice request that can't be served; carries the HTTP status to answer with
+    """
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def matrix_shape(shape):
+    """
+    2-D view of a weight tensor: the last axis becomes columns and every
+    leading axis is folded into rows, so a (kh, kw, in, out) kernel is
+    shown as (kh * kw * in, out)
+    """
+    if len(shape) == 0:
+        return 1, 1
+    if len(shape) == 1:
+        return 1, int(shape[0])
+    return int(np.prod(shape[:-1])), int(shape[-1])
+
+
+def max_zoom_for(rows, cols, tile_size=TILE_SIZE):
+    """
+    Zoom level of the full-resolution matrix; zoom 0 fits the whole matrix in one tile
+    """
+    longest = max(rows, cols)
+    return math.ceil(math.log2(longest / tile_size)) if longest > tile_size else 0
+
+
+def pyramid_dir(cache_dir, content_hash, dataset_path):
+    key = hashlib.sha1(f"{TILE_FORMAT_VERSION}:{dataset_path}".encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, content_hash, key)
+
+
+def _iter_row_bands(dataset, cols, band_rows):
+    """
+    Yield the matrix view of a dataset as float64 row bands of `band_rows`
+    rows (the last band may be shorter), reading bounded hyperslabs
+    """
+    pending = []
+    pending_size = 0
+    band_size = band_rows * cols
+    for block in iter_dataset_blocks(dataset):
+        pending.append(np.asarray(block, dtype=np.float64).ravel())
+        pending_size += pending[-1].size
+        while pending_size >= band_size:
+            values = np.concatenate(pending)
+            yield values[:band_size].reshape(band_rows, cols)
+            pending = [values[band_size:]]
+            pending_size = pending[0].size
+
+    if pending_size:
+        yield np.concatenate(pending).reshape(-1, cols)
+
+
+def _pool_pairs(total, count, peak):
+    """
+    Merge 2 x 2 cells of an even-height band; an odd last column is paired with an empty one
+    """
+    if total.shape[1] % 2:
+        pad = ((0, 0), (0, 1))
+        total, count, peak = np.pad(total, pad), np.pad(count, pad), np.pad(peak, pad)
+    rows, cols = total.shape[0] // 2, total.shape[1] // 2
+    return (total.reshape(rows, 2, cols, 2).sum(axis=(1, 3)),
+            count.reshape(rows, 2, cols, 2).sum(axis=(1, 3)),
+            peak.reshape(rows, 2, cols, 2).max(axis=(1, 3)))
+
+
+class _LevelWriter:
+    """
+    One zoom level of a pyramid being built: quantizes incoming rows into its
+    memory-mapped files and forwards 2 x 2 pooled rows to the next coarser level
+    """
+
+    def __init__(self, directory, z, rows, cols, scale, coarser):
+        self.z = z
+        self.rows = rows
+        self.cols = cols
+        self.scale = scale
+        self.coarser = coarser
+        self.cursor = 0
+        self.carry = None
+        self.maps = {
+            mode: np.memmap(os.path.join(directory, f"z{z}_{mode}.u8"), dtype=np.uint8,
+                            mode='w+', shape=(rows, cols))
+            for mode in TILE_MODES
+        }
+
+    def push(self, total, count, peak):
+        mean = np.divide(total, count, out=np.zeros_like(total), where=count > 0)
+        end = self.cursor + len(total)
+        # Mean is centered so 128 is zero; max is the largest magnitude in the cell
+        self.maps['mean'][self.cursor:end] = np.rint(np.clip((mean / self.scale + 1) * 127.5, 0, 255))
+        self.maps['max'][self.cursor:end] = np.rint(np.clip(peak / self.scale * 255, 0, 255))
+        self.cursor = end
+
+        if self.coarser is None:
+            return
+        if self.carry is not None:
+            total, count, peak = (np.concatenate([c, x]) for c, x in zip(self.carry, (total, count, peak)))
+            self.carry = None
+        if len(total) % 2:
+            self.carry = (total[-1:], count[-1:], peak[-1:])
+            total, count, peak = total[:-1], count[:-1], peak[:-1]
+        if len(total):
+            self.coarser.push(*_pool_pairs(total, count, peak))
+
+    def close(self):
+        if self.carry is not None:
+            # An odd last row is pooled with an empty one
+            total, count, peak = (np.concatenate([c, np.zeros_like(c)]) for c in self.carry)
+            self.carry = None
+            self.coarser.push(*_pool_pairs(total, count, peak))
+        for memmap in self.maps.values():
+            memmap.flush()
+        if self.coarser is not None:
+            self.coarser.close()
+
+
+def build_pyramid(file_path, dataset_path, target_dir, tile_size=TILE_SIZE):
+    """
+    Build the uint8 tile pyramid of one weight tensor into `target_dir`.
+
+    Runs in a worker process. The tensor is streamed twice: once for its
+    magnitude (the quantization scale) and once to fill every zoom level,
+    each level pooling 2 x 2 cells of the next finer one, so memory stays
+    bounded by one row band per level. Files are built in a scratch
+    directory and renamed into place, so readers never see a partial pyramid.
+    """
+    if os.path.exists(os.path.join(target_dir, 'meta.json')):
+        return target_dir
+
+    parent = os.path.dirname(target_dir)
+    os.makedirs(parent, exist_ok=True)
+    scratch = tempfile.mkdtemp(dir=parent, prefix='.building-')
+    try:
+        with open_weight_tensor(file_path, dataset_path) as dataset:
+            rows, cols = matrix_shape(dataset.shape)
+            if rows * cols == 0:
+                raise ValueError(f"{dataset_path} is empty")
+
+            magnitude = 0.0
+            for block in iter_dataset_blocks(dataset):
+                values = np.abs(np.asarray(block, dtype=np.float64))
+                values = values[np.isfinite(values)]
+                if values.size:
+                    magnitude = max(magnitude, float(values.max()))
+            scale = magnitude or 1.0
+
+            max_zoom = max_zoom_for(rows, cols, tile_size)
+            levels = []
+            writer = None
+            for z in range(max_zoom + 1):
+                factor = 2 ** (max_zoom - z)
+                level_rows, level_cols = -(-rows // factor), -(-cols // factor)
+                writer = _LevelWriter(scratch, z, level_rows, level_cols, scale, writer)
+                levels.append({
+                    'z': z,
+                    'factor': factor,
+                    'rows': level_rows,
+                    'cols': level_cols,
+                    'tiles_y': -(-level_rows // tile_size),
+                    'tiles_x': -(-level_cols // tile_size)
+                })
+
+            band_rows = max(2, MAX_BLOCK_ELEMENTS // cols)
+            band_rows -= band_rows % 2
+            for band in _iter_row_bands(dataset, cols, band_rows):
+                finite = np.isfinite(band)
+                values = np.where(finite, band, 0.0)
+                writer.push(values, finite.astype(np.float64), np.abs(values))
+            writer.close()
+
+            meta = {
+                'path': dataset_path,
+                'shape': list(dataset.shape),
+                'dtype': str(dataset.dtype),
+                'matrix_shape': [rows, cols],
+                'tile_size': tile_size,
+                'max_zoom': max_zoom,
+                'modes': list(TILE_MODES),
+                'range': {'mean': [-scale, scale], 'max': [0.0, scale]},
+                'levels': levels
+            }
+        with open(os.path.join(scratch, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+
+        try:
+            os.rename(scratch, target_dir)
+        except OSError:
+            # Another worker finished the same pyramid first
+            shutil.rmtree(scratch, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(scratch, ignore_errors=True)
+        raise
+    return target_dir
+
+
+def load_pyramid_meta(target_dir):
+    """
+    Metadata of a built pyramid, or None if it hasn't been built yet
+    """
+    try:
+        with open(os.path.join(target_dir, 'meta.json')) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def read_tile(target_dir, meta, z, x, y, mode='mean'):
+    """
+    Return one tile as a C-contiguous uint8 array (edge tiles are smaller).
+    Only the tile's rows are paged in from the memory-mapped level.
+    """
+    if mode not in TILE_MODES:
+        raise TileError(f"mode must be one of {', '.join(TILE_MODES)}")
+    if not 0 <= z <= meta['max_zoom']:
+        raise TileError(f"z must be between 0 and {meta['max_zoom']}", 404)
+
+    level = meta['levels'][z]
+    if not (0 <= x < level['tiles_x'] and 0 <= y < level['tiles_y']):
+        raise TileError('Tile out of range', 404)
+
+    size = meta['tile_size']
+    level_map = np.memmap(os.path.join(target_dir, f"z{z}_{mode}.u8"), dtype=np.uint8,
+                          mode='r', shape=(level['rows'], level['cols']))
+    return np.ascontiguousarray(level_map[y * size:(y + 1) * size, x * size:(x + 1) * size])
+
+
+def parse_span(value, length, name):
+    """
+    Parse 'start:stop' (either side optional) into a clamped (start, stop) pair
+    """
+    if value is None:
+        return 0, length
+    start, sep, stop = value.partition(':')
+    try:
+        start = int(start) if start else 0
+        stop = int(stop) if stop else length
+    except ValueError:
+        raise TileError(f"{name} must look like start:stop")
+    if not sep or not 0 <= start < stop:
+        raise TileError(f"{name} must look like start:stop with start < stop")
+    if start >= length:
+        raise TileError(f"{name} starts past the end ({length})", 416)
+    return start, min(stop, length)
+
+
+def read_matrix_slice(file_path, dataset_path, rows, cols):
+    """
+    Read rows [r0, r1) x cols [c0, c1) of a tensor's matrix view.
+
+    Folded rows are split into runs that share every leading index but the
+    innermost one, and each run is read as a single HDF5 hyperslab, so only
+    the requested values are decoded.
+    """
+    (r0, r1), (c0, c1) = rows, cols
+    if (r1 - r0) * (c1 - c0) > MAX_SLICE_ELEMENTS:
+        raise TileError(f"Slice exceeds {MAX_SLICE_ELEMENTS} values", 413)
+
+    with open_weight_tensor(file_path, dataset_path) as dataset:
+        shape = dataset.shape
+        if len(shape) < 2:
+            flat = dataset[()] if len(shape) == 0 else dataset[c0:c1]
+            return np.asarray(flat).reshape(1, -1)
+        if len(shape) == 2:
+            return np.asarray(dataset[r0:r1, c0:c1])
+
+        leading, inner = shape[:-1], shape[-2]
+        parts = []
+        row = r0
+        while row < r1:
+            index = np.unravel_index(row, leading)
+            run_end = min(r1, row - index[-1] + inner)
+            prefix = tuple(int(i) for i in index[:-1])
+            parts.append(np.asarray(dataset[prefix + (slice(int(index[-1]), int(index[-1]) + run_end - row),
+                                                      slice(c0, c1))]))
+            row = run_end
+        return np.concatenate(parts)
@@ -0,0 +1,270 @@
+import math
+from contextlib import contextmanager
+
+import h5py
+import numpy as np
+
+from utils.keras_h5 import find_weights_root, iter_config_layers, layer_weight_shapes, load_json_attr
+from utils.model_formats import list_safetensors, model_format, open_safetensors_tensor
+
+
+MAX_BLOCK_ELEMENTS = 4 * 1024 * 1024  # ~32 MB of float64 per block while reducing
+DEFAULT_HISTOGRAM_BINS = 32
+SKIPPED_GROUPS = ('optimizer_weights',)
+TENSOR_FORMATS = ('h5', 'safetensors')  # Formats whose weight tensors can be read
+
+
+def iter_block_slices(shape, chunks=None, max_elements=MAX_BLOCK_ELEMENTS):
+    """
+    Yield index tuples that cut an array of `shape` into hyperslabs of at most
+    `max_elements` values.
+
+    Blocks are cut along the outermost axis whose trailing sub-array fits the
+    budget, so a huge kernel is never materialized at once. With `chunks`,
+    block boundaries follow the HDF5 chunking so each chunk is decoded once.
+    """
+    if not shape:
+        yield ()
+        return
+    if 0 in shape:
+        return
+
+    # Find the axis to block along: everything after it must fit in one block
+    axis = None
+    trailing = 1
+    for k in range(len(shape) - 1, -1, -1):
+        if trailing * shape[k] > max_elements:
+            axis = k
+            break
+        trailing *= shape[k]
+
+    if axis is None:
+        yield (Ellipsis,)
+        return
+
+    step = max(1, max_elements // trailing)
+    if chunks:
+        chunk_len = chunks[axis]
+        step = max(chunk_len, step - step % chunk_len)
+
+    for outer in np.ndindex(*shape[:axis]):
+        for start in range(0, shape[axis], step):
+            yield outer + (slice(start, min(start + step, shape[axis])),)
+
+
+def iter_dataset_blocks(dataset, max_elements=MAX_BLOCK_ELEMENTS):
+    """
+    Yield a dataset as a sequence of bounded hyperslabs (see iter_block_slices)
+    """
+    for index in iter_block_slices(dataset.shape, getattr(dataset, 'chunks', None), max_elements):
+        yield np.asarray(dataset[index])
+
+
+def block_stats(block):
+    """
+    Partial statistics of one block, in a form that merges associatively
+    """
+    values = np.asarray(block, dtype=np.float64).ravel()
+    nan_count = int(np.count_nonzero(np.isnan(values)))
+    inf_count = int(np.count_nonzero(np.isinf(values)))
+    zeros = int(np.count_nonzero(values == 0))
+
+    if nan_count or inf_count:
+        values = values[np.isfinite(values)]
+
+    count = values.size
+    if count == 0:
+        return {'count': 0, 'mean': 0.0, 'm2': 0.0, 'min': math.inf, 'max': -math.inf,
+                'l1': 0.0, 'l2_sq': 0.0, 'zeros': zeros, 'nan': nan_count, 'inf': inf_count}
+
+    mean = float(values.mean())
+    centered = values - mean
+    return {
+        'count': count,
+        'mean': mean,
+        'm2': float(np.dot(centered, centered)),
+        'min': float(values.min()),
+        'max': float(values.max()),
+        'l1': float(np.abs(values).sum()),
+        'l2_sq': float(np.dot(values, values)),
+        'zeros': zeros,
+        'nan': nan_count,
+        'inf': inf_count
+    }
+
+
+def merge_stats(a, b):
+    """
+    Combine two partial statistics with Chan et al.'s parallel variance update
+    """
+    count = a['count'] + b['count']
+    if count == 0:
+        mean, m2 = 0.0, 0.0
+    else:
+        delta = b['mean'] - a['mean']
+        mean = a['mean'] + delta * b['count'] / count
+        m2 = a['m2'] + b['m2'] + delta * delta * a['count'] * b['count'] / count
+
+    return {
+        'count': count,
+        'mean': mean,
+        'm2': m2,
+        'min': min(a['min'], b['min']),
+        'max': max(a['max'], b['max']),
+        'l1': a['l1'] + b['l1'],
+        'l2_sq': a['l2_sq'] + b['l2_sq'],
+        'zeros': a['zeros'] + b['zeros'],
+        'nan': a['nan'] + b['nan'],
+        'inf': a['inf'] + b['inf']
+    }
+
+
+def finalize_stats(partial):
+    """
+    Turn merged partial statistics into the reported values
+    """
+    total = partial['count'] + partial['nan'] + partial['inf']
+    has_values = partial['count'] > 0
+    return {
+        'count': total,
+        'min': partial['min'] if has_values else None,
+        'max': partial['max'] if has_values else None,
+        'mean': partial['mean'] if has_values else None,
+        'std': math.sqrt(partial['m2'] / partial['count']) if has_values else None,
+        'l1_norm': partial['l1'],
+        'l2_norm': math.sqrt(partial['l2_sq']),
+        'sparsity': partial['zeros'] / total if total else 0.0,
+        'nan_count': partial['nan'],
+        'inf_count': partial['inf']
+    }
+
+
+def dataset_stats(file_path, dataset_path, bins=DEFAULT_HISTOGRAM_BINS):
+    """
+    Stream one dataset and return its partial statistics and histogram.
+
+    Runs in a worker process, so it opens the file itself. The histogram needs
+    the value range, which costs a second streaming pass over the dataset.
+    """
+    with open_weight_tensor(file_path, dataset_path) as dataset:
+        partial = block_stats(np.empty(0))
+        for block in iter_dataset_blocks(dataset):
+            partial = merge_stats(partial, block_stats(block))
+
+        counts = np.zeros(bins, dtype=np.int64)
+        edges = None
+        if partial['count'] > 0:
+            value_range = (partial['min'], partial['max'])
+            if value_range[0] == value_range[1]:
+                value_range = (value_range[0] - 0.5, value_range[1] + 0.5)
+            edges = np.linspace(value_range[0], value_range[1], bins + 1)
+            for block in iter_dataset_blocks(dataset):
+                values = np.asarray(block, dtype=np.float64).ravel()
+                block_counts, _ = np.histogram(values[np.isfinite(values)], bins=edges)
+                counts += block_counts
+
+        return {
+            'path': dataset_path,
+            'shape': list(dataset.shape),
+            'dtype': str(dataset.dtype),
+            'partial': partial,
+            'histogram': {
+                'bin_edges': edges.tolist() if edges is not None else [],
+                'counts': counts.tolist()
+            },
+            'bytes_read': 2 * dataset.size * dataset.dtype.itemsize
+        }
+
+
+def list_weight_datasets(model_file):
+    """
+    Return [(layer_name, weight_name, dataset_path), ...] for every weight tensor
+    """
+    weights_root = find_weights_root(model_file)
+    model_config = load_json_attr(model_file, 'model_config')
+
+    if weights_root is not None and model_config is not None:
+        tensors = []
+        for layer in iter_config_layers(model_config):
+            for weight_name, _, _ in layer_weight_shapes(weights_root, layer['name']):
+                tensors.append((layer['name'], weight_name,
+                                f"{weights_root.name}/{layer['name']}/{weight_name}".lstrip('/')))
+        return tensors
+
+    # Non-Keras files: every dataset outside the optimizer state, grouped by parent
+    tensors = []
+
+    def collect(name, obj):
+        if isinstance(obj, h5py.Dataset) and not name.startswith(SKIPPED_GROUPS):
+            layer_name, _, weight_name = name.rpartition('/')
+            tensors.append((layer_name or '/', weight_name, name))
+
+    model_file.visititems(collect)
+    return tensors
+
+
+def list_model_tensors(file_path):
+    """
+    list_weight_datasets() for any format in TENSOR_FORMATS
+    """
+    if model_format(file_path) == 'safetensors':
+        return list_safetensors(file_path)
+    with h5py.File(file_path, 'r') as model_file:
+        return list_weight_datasets(model_file)
+
+
+@contextmanager
+def open_weight_tensor(file_path, tensor_path):
+    """
+    Dataset-like view of one weight tensor: an h5py dataset, or a lazy
+    memmap for safetensors. Slicing it reads only the selected values.
+    """
+    if model_format(file_path) == 'safetensors':
+        yield open_safetensors_tensor(file_path, tensor_path)
+        return
+    with h5py.File(file_path, 'r') as model_file:
+        yield model_file[tensor_path]
+
+
+def compute_weight_stats(file_path, bins=DEFAULT_HISTOGRAM_BINS, executor=None):
+    """
+    Per-layer and per-tensor weight diagnostics for an H5 model.
+
+    Tensors are processed independently (on `executor` when given) and
+    merged layer by layer, so peak memory is bounded by one block per worker.
+    """
+    tensors = list_model_tensors(file_path)
+
+    paths = [dataset_path for _, _, dataset_path in tensors]
+    if executor is not None:
+        results = list(executor.map(dataset_stats, [file_path] * len(paths), paths, [bins] * len(paths)))
+    else:
+        results = [dataset_stats(file_path, path, bins) for path in paths]
+
+    layers = {}
+    model_partial = block_stats(np.empty(0))
+    bytes_read = 0
+    for (layer_name, weight_name, _), result in zip(tensors, results):
+        layer = layers.setdefault(layer_name, {'name': layer_name, 'partial': block_stats(np.empty(0)), 'tensors': []})
+        layer['partial'] = merge_stats(layer['partial'], result['partial'])
+        layer['tensors'].append({
+            'name': weight_name,
+            'path': result['path'],
+            'shape': result['shape'],
+            'dtype': result['dtype'],
+            'stats': finalize_stats(result['partial']),
+            'histogram': result['histogram']
+        })
+        model_partial = merge_stats(model_partial, result['partial'])
+        bytes_read += result['bytes_read']
+
+    return {
+        'bins': bins,
+        'total_tensors': len(tensors),
+        'bytes_read': bytes_read,
+        'stats': finalize_stats(model_partial),
+        'layers': [
+            {'name': layer['name'], 'stats': finalize_stats(layer['partial']), 'tensors': layer['tensors']}
+            for layer in layers.values()
+        ]
+    }
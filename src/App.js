@@ -5,6 +5,7 @@ import {
   Layers, 
   Zap, 
   PieChart, 
+  BarChart2, 
   Moon, 
   Sun 
 } from 'lucide-react';
@@ -81,6 +82,14 @@ function App() {
             >
               <PieChart className="mr-2" size={20} /> SHAP
             </NavLink>
+            <NavLink 
+              to="/visualization" 
+              className={({ isActive }) => 
+                `nav-link flex items-center ${isActive ? 'active' : ''}`
+              }
+            >
+              <BarChart2 className="mr-2" size={20} /> Visualization
+            </NavLink>
           </nav>
 
           <Routes>
@@ -0,0 +1,177 @@
+import React, { useState, useEffect, useRef } from "react";
+import axios from "axios";
+import "./ModelDetails.css";
+
+const BACKEND_URL = "http://localhost:5000";
+const MAX_IMAGE_SIDE = 256; // The backend resizes to the model's input shape
+const GRID_OPTIONS = [4, 6, 8, 12, 16];
+
+// Draw the image, then tint every grid cell: red pushes towards the target class, blue away from it
+const drawOverlay = (canvas, image, weights) => {
+  const context = canvas.getContext("2d");
+  context.drawImage(image, 0, 0, canvas.width, canvas.height);
+  if (!weights) return;
+
+  const rows = weights.length;
+  const cols = weights[0].length;
+  const peak = Math.max(...weights.flat().map(Math.abs), 1e-12);
+  const cellWidth = canvas.width / cols;
+  const cellHeight = canvas.height / rows;
+
+  weights.forEach((row, r) =>
+    row.forEach((value, c) => {
+      const alpha = (0.6 * Math.abs(value)) / peak;
+      context.fillStyle = value >= 0 ? `rgba(220, 38, 38, ${alpha})` : `rgba(37, 99, 235, ${alpha})`;
+      context.fillRect(c * cellWidth, r * cellHeight, cellWidth, cellHeight);
+    })
+  );
+};
+
+// Read the image's pixels as a nested [height][width][rgb] array
+const imageToArray = (image) => {
+  const scale = Math.min(1, MAX_IMAGE_SIDE / Math.max(image.width, image.height));
+  const width = Math.max(1, Math.round(image.width * scale));
+  const height = Math.max(1, Math.round(image.height * scale));
+
+  const canvas = document.createElement("canvas");
+  canvas.width = width;
+  canvas.height = height;
+  const context = canvas.getContext("2d");
+  context.drawImage(image, 0, 0, width, height);
+  const { data } = context.getImageData(0, 0, width, height);
+
+  const rows = [];
+  for (let y = 0; y < height; y++) {
+    const row = [];
+    for (let x = 0; x < width; x++) {
+      const offset = (y * width + x) * 4;
+      row.push([data[offset], data[offset + 1], data[offset + 2]]);
+    }
+    rows.push(row);
+  }
+  return rows;
+};
+
+const ExplanationView = ({ method, title, description, defaultSamples }) => {
+  const [model, setModel] = useState(null);
+  const [image, setImage] = useState(null);
+  const [numSamples, setNumSamples] = useState(defaultSamples);
+  const [grid, setGrid] = useState(8);
+  const [target, setTarget] = useState("");
+  const [explanation, setExplanation] = useState(null);
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState(null);
+  const canvasRef = useRef(null);
+
+  useEffect(() => {
+    axios
+      .get(`${BACKEND_URL}/api/models/latest`)
+      .then((response) => setModel(response.data))
+      .catch((err) => setError(err.response?.data?.error || "No model uploaded yet"));
+  }, []);
+
+  useEffect(() => {
+    if (image && canvasRef.current) {
+      drawOverlay(canvasRef.current, image, explanation?.segments.grid ? explanation.weights : null);
+    }
+  }, [image, explanation]);
+
+  const handleImageSelection = (e) => {
+    const selected = e.target.files[0];
+    if (!selected) return;
+
+    const reader = new FileReader();
+    reader.onload = () => {
+      const loaded = new Image();
+      loaded.onload = () => {
+        setImage(loaded);
+        setExplanation(null);
+      };
+      loaded.src = reader.result;
+    };
+    reader.readAsDataURL(selected);
+  };
+
+  const runExplanation = async () => {
+    setLoading(true);
+    setError(null);
+    try {
+      const response = await axios.post(
+        `${BACKEND_URL}/api/models/${model.id}/explain/${method}`,
+        {
+          input: imageToArray(image),
+          num_samples: Number(numSamples),
+          grid: Number(grid),
+          target: target === "" ? null : Number(target),
+        },
+        { timeout: 600000 }
+      );
+      setExplanation(response.data);
+    } catch (err) {
+      console.error(`${title} error:`, err);
+      const data = err.response?.data;
+      setError(data ? `${data.error}${data.details ? `: ${data.details}` : ""}` : err.message);
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  return (
+    <div className="p-4 text-center">
+      <h2 className="text-2xl font-bold">{title}</h2>
+      <p className="mt-2 text-gray-600">{description}</p>
+
+      {model && (
+        <p className="text-secondary">
+          Model: {model.filename} (#{model.id})
+        </p>
+      )}
+      {error && <div className="error">Error: {error}</div>}
+
+      <div className="layer-details card">
+        <input type="file" accept="image/*" onChange={handleImageSelection} />
+        <label>
+          Samples{" "}
+          <input type="number" min="16" max="20000" value={numSamples} onChange={(e) => setNumSamples(e.target.value)} />
+        </label>
+        <label>
+          Grid{" "}
+          <select value={grid} onChange={(e) => setGrid(e.target.value)}>
+            {GRID_OPTIONS.map((size) => (
+              <option key={size} value={size}>{`${size} x ${size}`}</option>
+            ))}
+          </select>
+        </label>
+        <label>
+          Target class{" "}
+          <input type="number" min="0" placeholder="predicted" value={target} onChange={(e) => setTarget(e.target.value)} />
+        </label>
+        <button onClick={runExplanation} disabled={!model || !image || loading}>
+          {loading ? "Explaining..." : "Explain"}
+        </button>
+      </div>
+
+      {image && (
+        <div className="layer-details card">
+          <canvas ref={canvasRef} width={image.width} height={image.height} style={{ maxWidth: "100%" }} />
+        </div>
+      )}
+
+      {explanation && (
+        <div className="layer-details card">
+          <h3>
+            Class {explanation.target} (predicted {explanation.predicted_class},
+            p = {explanation.prediction[explanation.target].toFixed(4)})
+          </h3>
+          <p className="text-secondary">
+            {explanation.evaluations} model evaluations in {(explanation.elapsed_ms / 1000).toFixed(1)}s
+            {explanation.score !== undefined && `, surrogate R² ${explanation.score.toFixed(3)}`}
+            {explanation.base_value !== undefined && `, base value ${explanation.base_value.toFixed(4)}`}
+          </p>
+        </div>
+      )}
+    </div>
+  );
+};
+
+export default ExplanationView;
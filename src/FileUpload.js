@@ -3,6 +3,12 @@ import axios from 'axios';
 import { Upload, CheckCircle, AlertCircle } from 'lucide-react';
 import { useNavigate } from 'react-router-dom';
 
+const BACKEND_URL = 'http://localhost:5000';
+const JOB_POLL_INTERVAL_MS = 1000;
+const CHUNK_SIZE = 4 * 1024 * 1024;
+const MAX_CHUNK_RETRIES = 5;
+const MODEL_EXTENSIONS = ['.h5', '.keras', '.safetensors', '.onnx'];
+
 const FileUpload = () => {
   const [file, setFile] = useState(null);
   const [isDragging, setIsDragging] = useState(false);
@@ -11,6 +17,7 @@ const FileUpload = () => {
   const [status, setStatus] = useState(null); // 'success' | 'error' | null
   const [errorMessage, setErrorMessage] = useState('');
   const [showDetailsButton, setShowDetailsButton] = useState(false); // NEW STATE
+  const [isProcessing, setIsProcessing] = useState(false);
   const fileInputRef = useRef(null);
   const navigate = useNavigate(); // NAVIGATION HOOK
 
@@ -32,15 +39,15 @@ const FileUpload = () => {
   };
 
   const handleFileSelection = (selectedFile) => {
-    // Check if it's an h5 file
-    if (selectedFile && selectedFile.name.endsWith('.h5')) {
+    // Check if it's a supported model file
+    if (selectedFile && MODEL_EXTENSIONS.some((ext) => selectedFile.name.toLowerCase().endsWith(ext))) {
       setFile(selectedFile);
       setStatus(null);
       setErrorMessage('');
     } else {
       setFile(null);
       setStatus('error');
-      setErrorMessage('Please select a valid .h5 model file');
+      setErrorMessage(`Please select a valid model file (${MODEL_EXTENSIONS.join(', ')})`);
     }
   };
 
@@ -48,6 +55,77 @@ const FileUpload = () => {
     handleFileSelection(e.target.files[0]);
   };
 
+  // Poll the parse job until the backend reports it finished
+  const waitForJob = async (jobId) => {
+    while (true) {
+      const { data: job } = await axios.get(`${BACKEND_URL}/api/jobs/${jobId}`);
+
+      if (job.status === 'succeeded') return job.result;
+      if (job.status === 'failed') {
+        const error = new Error(job.error);
+        error.jobError = `Processing failed: ${job.error}`;
+        throw error;
+      }
+
+      await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    }
+  };
+
+  // Remember in-flight uploads so a reload or dropped connection can resume them
+  const sessionKey = (selectedFile) =>
+    `upload:${selectedFile.name}:${selectedFile.size}:${selectedFile.lastModified}`;
+
+  const startOrResumeSession = async (selectedFile) => {
+    const savedId = localStorage.getItem(sessionKey(selectedFile));
+    if (savedId) {
+      try {
+        const { data } = await axios.get(`${BACKEND_URL}/upload/chunked/${savedId}`);
+        return data;
+      } catch (error) {
+        localStorage.removeItem(sessionKey(selectedFile));
+      }
+    }
+
+    const { data } = await axios.post(`${BACKEND_URL}/upload/chunked`, {
+      filename: selectedFile.name,
+      size: selectedFile.size,
+    });
+    localStorage.setItem(sessionKey(selectedFile), data.upload_id);
+    return data;
+  };
+
+  const uploadInChunks = async (selectedFile) => {
+    const session = await startOrResumeSession(selectedFile);
+    let offset = session.offset;
+    let retries = 0;
+
+    while (offset < selectedFile.size) {
+      const chunk = selectedFile.slice(offset, offset + CHUNK_SIZE);
+      try {
+        const { data } = await axios.put(
+          `${BACKEND_URL}/upload/chunked/${session.upload_id}?offset=${offset}`,
+          chunk,
+          { headers: { 'Content-Type': 'application/octet-stream' } }
+        );
+        offset = data.offset;
+        retries = 0;
+      } catch (error) {
+        const status = error.response?.status;
+        if (status && status !== 409 && status < 500) throw error;
+        if (++retries > MAX_CHUNK_RETRIES) throw error;
+
+        // Ask the server how much it actually kept and continue from there
+        const { data } = await axios.get(`${BACKEND_URL}/upload/chunked/${session.upload_id}`);
+        offset = data.offset;
+      }
+      setProgress(Math.round((offset * 100) / selectedFile.size));
+    }
+
+    const response = await axios.post(`${BACKEND_URL}/upload/chunked/${session.upload_id}/complete`);
+    localStorage.removeItem(sessionKey(selectedFile));
+    return response;
+  };
+
   const handleUpload = async () => {
     if (!file) return;
 
@@ -55,33 +133,24 @@ const FileUpload = () => {
     setProgress(0);
     setStatus(null);
 
-    // Create form data to send to the backend
-    const formData = new FormData();
-    formData.append('model', file);
-
     try {
-      // Send file to the backend via axios
-      const response = await axios.post('http://localhost:5000/upload', formData, {
-        headers: {
-          'Content-Type': 'multipart/form-data',
-        },
-        // Monitor upload progress
-        onUploadProgress: (progressEvent) => {
-          const percent = Math.round((progressEvent.loaded * 100) / progressEvent.total);
-          setProgress(percent);
-        },
-      });
-
-      // Handle success response
-      if (response.status === 200) {
-        setStatus('success');
-        setShowDetailsButton(true);
+      // Send the file in resumable chunks; an interrupted upload picks up where it stopped
+      const response = await uploadInChunks(file);
+
+      // The backend parses the model in the background and hands back a job to poll
+      if (response.status === 202) {
+        setIsProcessing(true);
+        await waitForJob(response.data.id);
       }
+
+      setStatus('success');
+      setShowDetailsButton(true);
     } catch (error) {
       setStatus('error');
-      setErrorMessage('Upload failed. Please try again.');
+      setErrorMessage(error.jobError || error.response?.data?.error || 'Upload failed. Please try again.');
       console.error('Upload error:', error);
     } finally {
+      setIsProcessing(false);
       setIsLoading(false);
     }
   };
@@ -105,7 +174,7 @@ const FileUpload = () => {
         <input
           ref={fileInputRef}
           type="file"
-          accept=".h5"
+          accept={MODEL_EXTENSIONS.join(',')}
           onChange={handleFileInput}
           style={{ display: 'none' }}
         />
@@ -120,6 +189,10 @@ const FileUpload = () => {
         </div>
       )}
 
+      {isProcessing && (
+        <p className="text-secondary">Processing model...</p>
+      )}
+
       {status === 'success' && (
         <div className="success">
           <CheckCircle size={20} />
@@ -1,11 +1,14 @@
 import React from "react";
+import ExplanationView from "./ExplanationView";
 
 const LimePage = () => {
   return (
-    <div className="p-4 text-center">
-      <h2 className="text-2xl font-bold">LIME Explanation</h2>
-      <p className="mt-2 text-gray-600">Details about LIME explanation will be displayed here.</p>
-    </div>
+    <ExplanationView
+      method="lime"
+      title="LIME Explanation"
+      description="Fits a local linear surrogate over randomly hidden image regions."
+      defaultSamples={1000}
+    />
   );
 };
 
@@ -6,17 +6,17 @@ const ModelDetails = () => {
   const [modelSummary, setModelSummary] = useState(null);
   const [analysis, setAnalysis] = useState(null);
   const [loading, setLoading] = useState(false);
+  const [analyzing, setAnalyzing] = useState(false);
   const [error, setError] = useState(null);
   const [isDarkMode, setIsDarkMode] = useState(false);
 
   // Fetch model summary from backend
   const fetchModelSummary = async () => {
     try {
+      // No custom headers: a simple GET skips the CORS preflight and lets the
+      // browser revalidate its cached copy with If-None-Match (304 on repeat loads)
       const response = await axios.get('http://localhost:5000/api/model-summary', {
-        timeout: 10000,
-        headers: {
-          'Content-Type': 'application/json'
-        }
+        timeout: 10000
       });
       
       setModelSummary(response.data);
@@ -28,71 +28,37 @@ const ModelDetails = () => {
     }
   };
 
-  // Analyze model using Groq
-  const handleAnalyzeModel = async () => {
+  // Stream the model analysis from the backend, which builds the prompt,
+  // caches completions and talks to the LLM provider
+  const handleAnalyzeModel = () => {
     if (!modelSummary) {
       setError('No model summary available');
       return;
     }
 
-    const GROQ_API_KEY = process.env.REACT_APP_GROQ_API_KEY;
-    setLoading(true);
+    setAnalyzing(true);
+    setAnalysis('');
     setError(null);
 
-    try {
-      const response = await axios.post(
-        'https://api.groq.com/openai/v1/chat/completions',
-        {
-          model: 'llama-3.3-70b-versatile',
-          messages: [
-            {
-              role: 'system',
-              content: 'You are a detailed AI assistant analyzing machine learning model architectures.'
-            },
-            {
-              role: 'user',
-              content: `Provide a comprehensive analysis of this machine learning model summary:
-                Model Name: ${modelSummary.model_name || 'Unnamed Model'}
-                Total Layers: ${modelSummary.total_layers}
-                Total Parameters: ${modelSummary.total_parameters}
-                Optimizer: ${modelSummary.optimizer}
-                Loss Function: ${modelSummary.loss_function}
-                
-                Detailed Layer Information:
-                ${JSON.stringify(modelSummary.layers, null, 2)}
-                
-                Provide insights into the model's architecture, potential strengths, and areas for optimization.`
-            }
-          ],
-          temperature: 0.7,
-          max_tokens: 500
-        },
-        {
-          headers: {
-            'Authorization': `Bearer ${GROQ_API_KEY}`,
-            'Content-Type': 'application/json'
-          }
-        }
-      );
-
-      const groqAnalysis = response.data?.choices?.[0]?.message?.content || 'No analysis available';
-      setAnalysis(groqAnalysis);
-
-    } catch (err) {
-      console.error('Analysis error:', err);
-      
-      let errorMessage = 'An unexpected error occurred';
-      if (err.response) {
-        errorMessage = err.response.data?.error?.message || 
-                       `Groq API Error: ${err.response.status}`;
-      } else if (err.message) {
-        errorMessage = err.message;
-      }
-
-      setError(errorMessage);
-    } finally {
-      setLoading(false);
-    }
+    // Analyze the model this summary describes, even if a newer one was uploaded since
+    const source = new EventSource(
+      `http://localhost:5000/api/analyze?model_id=${encodeURIComponent(modelSummary.model_id)}`
+    );
+    source.addEventListener('token', (event) => {
+      const { text } = JSON.parse(event.data);
+      setAnalysis((previous) => (previous || '') + text);
+    });
+    source.addEventListener('done', () => {
+      source.close();
+      setAnalyzing(false);
+    });
+    source.addEventListener('error', (event) => {
+      source.close();
+      setAnalyzing(false);
+      // Server-sent error events carry a payload; connection failures don't
+      const message = event.data ? JSON.parse(event.data).error : 'Lost connection to the analysis service';
+      setError(message);
+    });
   };
 
   // Toggle dark mode
@@ -156,76 +122,22 @@ const ModelDetails = () => {
 
           <button 
             onClick={handleAnalyzeModel}
-            disabled={loading}
+            disabled={analyzing}
             className="analyze-button"
           >
-            {loading ? 'Analyzing...' : 'Analyze Model with Groq'}
+            {analyzing ? 'Analyzing...' : 'Analyze Model'}
           </button>
 
           {analysis && (
-  <div className="analysis-result card">
-    <h3>Groq Model Analysis</h3>
-    <div className="analysis-section">
-      <div className="section-header">🏗️ Model Architecture Overview</div>
-      <div className="section-content">
-        <p className="bullet-point">
-          A deep neural network architecture, specifically a <span className="highlight">Convolutional Neural Network (CNN)</span>
-        </p>
-      </div>
-    </div>
-
-    <div className="analysis-section">
-      <div className="section-header">📊 Layer Breakdown</div>
-      <div className="section-content">
-        <div className="bullet-point">
-          <span className="highlight">Convolutional Layers</span>: 6 layers with varying filter sizes
-          <ul>
-            <li><code>conv2d</code>: 3x3x32</li>
-            <li><code>conv2d_1</code>: 3x3x32x64</li>
-            <li><code>conv2d_5</code>: 3x3x32x64 (or 3x3x64x64)</li>
-          </ul>
-        </div>
-        <div className="bullet-point">
-          <span className="highlight">Dense Layers</span>: 2 layers with 16,448 and 130 parameters
-          <ul>
-            <li><code>dense</code>: 256x64</li>
-            <li><code>dense_1</code>: 1x64x2</li>
-          </ul>
-        </div>
-      </div>
-    </div>
-
-    <div className="analysis-section">
-      <div className="section-header">💪 Potential Strengths</div>
-      <div className="section-content">
-        <div className="bullet-point">
-          <span className="highlight">Deep Architecture</span>: Suitable for complex tasks
-        </div>
-        <div className="bullet-point">
-          <span className="highlight">Multiple Convolutional Layers</span>: Enhanced feature extraction
-        </div>
-        <div className="bullet-point">
-          <span className="highlight">Dense Layers</span>: High-level performance capabilities
-        </div>
-      </div>
-    </div>
-
-    <div className="analysis-section">
-      <div className="section-header">🔧 Areas for Optimization</div>
-      <div className="section-content">
-        <div className="bullet-point">
-          <span className="highlight">Optimizer Uncertainty</span>: Loss function and optimizer not specified
-        </div>
-        <div className="bullet-point">
-          <span className="highlight">Model Complexity</span>: 551,048 parameters risk potential overfitting
-        </div>
-        <div className="bullet-point">
-          <span className="highlight">Convolutional Layer Parameters</span>: High parameter count in conv layers
-        </div>
-      </div>
-    </div>
-  </div>
-)}
+            <div className="analysis-result card">
+              <h3>Model Analysis</h3>
+              <div className="analysis-section">
+                <div className="section-content" style={{ whiteSpace: 'pre-wrap' }}>
+                  {analysis}
+                </div>
+              </div>
+            </div>
+          )}
           <div className="layer-details card">
             <h3>Layer Breakdown</h3>
             <table>
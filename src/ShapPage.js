@@ -1,11 +1,14 @@
 import React from "react";
+import ExplanationView from "./ExplanationView";
 
 const ShapPage = () => {
   return (
-    <div className="p-4 text-center">
-      <h2 className="text-2xl font-bold">SHAP Explanation</h2>
-      <p className="mt-2 text-gray-600">Details about SHAP explanation will be displayed here.</p>
-    </div>
+    <ExplanationView
+      method="shap"
+      title="SHAP Explanation"
+      description="KernelSHAP estimates each image region's Shapley value for the chosen class."
+      defaultSamples={2048}
+    />
   );
 };
 
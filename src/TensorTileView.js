@@ -0,0 +1,160 @@
+import React, { useState, useEffect, useRef, useCallback } from "react";
+import axios from "axios";
+
+const BACKEND_URL = "http://localhost:5000";
+const VIEWPORT = 512; // Canvas side in pixels; one pixel per cell of the current zoom level
+
+// Quantized value -> RGBA. Mean tiles are centered on 128 (blue negative, red positive),
+// max tiles run from 0 to the tensor's largest magnitude
+const colorFor = (value, mode) => {
+  if (mode === "max") {
+    return [255, 255 - value, 255 - value, 255];
+  }
+  const offset = value - 127.5;
+  const fade = 255 - Math.round((Math.abs(offset) * 255) / 127.5);
+  return offset >= 0 ? [255, fade, fade, 255] : [fade, fade, 255, 255];
+};
+
+const tileToImageData = (bytes, rows, cols, mode) => {
+  const image = new ImageData(cols, rows);
+  for (let i = 0; i < bytes.length; i++) {
+    image.data.set(colorFor(bytes[i], mode), i * 4);
+  }
+  return image;
+};
+
+const TensorTileView = ({ modelId, tensorPath }) => {
+  const [meta, setMeta] = useState(null);
+  const [zoom, setZoom] = useState(0);
+  const [origin, setOrigin] = useState({ x: 0, y: 0 });
+  const [mode, setMode] = useState("mean");
+  const [error, setError] = useState(null);
+  const [transferred, setTransferred] = useState(0);
+  const canvasRef = useRef(null);
+  const tilesRef = useRef(new Map());
+  const dragRef = useRef(null);
+
+  const baseUrl = `${BACKEND_URL}/api/models/${modelId}/tensors/${tensorPath}/tiles`;
+
+  useEffect(() => {
+    tilesRef.current = new Map();
+    setMeta(null);
+    setZoom(0);
+    setOrigin({ x: 0, y: 0 });
+    setTransferred(0);
+    axios
+      .get(baseUrl, { timeout: 120000 })
+      .then((response) => setMeta(response.data))
+      .catch((err) => setError(err.response?.data?.error || err.message || "Failed to load tiles"));
+  }, [baseUrl]);
+
+  const draw = useCallback(() => {
+    const canvas = canvasRef.current;
+    if (!canvas || !meta) return;
+    const context = canvas.getContext("2d");
+    context.fillStyle = "#eee";
+    context.fillRect(0, 0, VIEWPORT, VIEWPORT);
+    const size = meta.tile_size;
+    tilesRef.current.forEach((tile, key) => {
+      const [tileMode, z, x, y] = key.split("/").map((part, i) => (i ? Number(part) : part));
+      if (tileMode === mode && z === zoom && tile) {
+        context.putImageData(tile, x * size - origin.x, y * size - origin.y);
+      }
+    });
+  }, [meta, zoom, origin, mode]);
+
+  // Fetch only the tiles that intersect the viewport at the current zoom
+  useEffect(() => {
+    if (!meta) return;
+    const level = meta.levels[zoom];
+    const size = meta.tile_size;
+    const firstX = Math.max(0, Math.floor(origin.x / size));
+    const firstY = Math.max(0, Math.floor(origin.y / size));
+    const lastX = Math.min(level.tiles_x - 1, Math.floor((origin.x + VIEWPORT - 1) / size));
+    const lastY = Math.min(level.tiles_y - 1, Math.floor((origin.y + VIEWPORT - 1) / size));
+
+    for (let y = firstY; y <= lastY; y++) {
+      for (let x = firstX; x <= lastX; x++) {
+        const key = `${mode}/${zoom}/${x}/${y}`;
+        if (tilesRef.current.has(key)) continue;
+        tilesRef.current.set(key, null);
+        axios
+          .get(`${baseUrl}/${zoom}/${x}/${y}`, { params: { mode }, responseType: "arraybuffer" })
+          .then((response) => {
+            const [rows, cols] = response.headers["x-tile-shape"].split(",").map(Number);
+            tilesRef.current.set(key, tileToImageData(new Uint8Array(response.data), rows, cols, mode));
+            setTransferred((total) => total + response.data.byteLength);
+            draw();
+          })
+          .catch((err) => {
+            tilesRef.current.delete(key);
+            console.error("Tile error:", err);
+          });
+      }
+    }
+    draw();
+  }, [meta, zoom, origin, mode, baseUrl, draw]);
+
+  const clampOrigin = (x, y, z) => {
+    const level = meta.levels[z];
+    return {
+      x: Math.max(0, Math.min(x, level.cols - VIEWPORT)),
+      y: Math.max(0, Math.min(y, level.rows - VIEWPORT)),
+    };
+  };
+
+  // Keep the viewport center fixed while changing level (each level doubles the resolution)
+  const changeZoom = (step) => {
+    const next = zoom + step;
+    if (next < 0 || next > meta.max_zoom) return;
+    const factor = step > 0 ? 2 : 0.5;
+    const centerX = (origin.x + VIEWPORT / 2) * factor;
+    const centerY = (origin.y + VIEWPORT / 2) * factor;
+    setZoom(next);
+    setOrigin(clampOrigin(centerX - VIEWPORT / 2, centerY - VIEWPORT / 2, next));
+  };
+
+  const handleMouseDown = (e) => {
+    dragRef.current = { x: e.clientX, y: e.clientY, origin };
+  };
+
+  const handleMouseMove = (e) => {
+    const drag = dragRef.current;
+    if (!drag) return;
+    setOrigin(clampOrigin(drag.origin.x - (e.clientX - drag.x), drag.origin.y - (e.clientY - drag.y), zoom));
+  };
+
+  if (error) return <div className="error">Error: {error}</div>;
+  if (!meta) return <p className="mt-2 text-gray-600">Building tile pyramid...</p>;
+
+  const level = meta.levels[zoom];
+  return (
+    <div>
+      <p className="text-secondary">
+        {tensorPath}: {meta.shape.join(" x ")} shown as {meta.matrix_shape.join(" x ")}, zoom {zoom}/{meta.max_zoom}
+        {" "}(1 cell = {level.factor} x {level.factor} weights), range ±{meta.range.mean[1].toPrecision(4)},
+        {" "}{(transferred / 1024).toFixed(1)} KB transferred
+      </p>
+      <div>
+        <button onClick={() => changeZoom(-1)} disabled={zoom === 0}>Zoom out</button>
+        <button onClick={() => changeZoom(1)} disabled={zoom === meta.max_zoom}>Zoom in</button>
+        <select value={mode} onChange={(e) => setMode(e.target.value)}>
+          <option value="mean">Block mean</option>
+          <option value="max">Block max |w|</option>
+        </select>
+      </div>
+      <canvas
+        ref={canvasRef}
+        width={VIEWPORT}
+        height={VIEWPORT}
+        style={{ imageRendering: "pixelated", cursor: "grab", width: VIEWPORT, maxWidth: "100%" }}
+        onMouseDown={handleMouseDown}
+        onMouseMove={handleMouseMove}
+        onMouseUp={() => (dragRef.current = null)}
+        onMouseLeave={() => (dragRef.current = null)}
+      />
+    </div>
+  );
+};
+
+export default TensorTileView;
@@ -1,10 +1,124 @@
-import React from "react";
+import React, { useState, useEffect } from "react";
+import axios from "axios";
+import TensorTileView from "./TensorTileView";
+import "./ModelDetails.css";
+
+const BACKEND_URL = "http://localhost:5000";
+
+const formatNumber = (value, digits = 4) =>
+  value === null || value === undefined ? "N/A" : Number(value).toPrecision(digits);
+
+// Tiny inline histogram: one bar per bin, scaled to the tallest bin
+const Histogram = ({ counts }) => {
+  const peak = Math.max(...counts, 1);
+  return (
+    <div style={{ display: "flex", alignItems: "flex-end", height: 32, gap: 1 }}>
+      {counts.map((count, index) => (
+        <div
+          key={index}
+          style={{
+            width: 3,
+            height: `${(count * 100) / peak}%`,
+            backgroundColor: "var(--primary-dark, #4a90e2)",
+          }}
+        />
+      ))}
+    </div>
+  );
+};
 
 const VisualizationPage = () => {
+  const [weightStats, setWeightStats] = useState(null);
+  const [loading, setLoading] = useState(true);
+  const [error, setError] = useState(null);
+  const [modelId, setModelId] = useState(null);
+  const [selectedTensor, setSelectedTensor] = useState(null);
+
+  useEffect(() => {
+    axios
+      .get(`${BACKEND_URL}/api/models/latest`)
+      .then((response) => setModelId(response.data.id))
+      .catch((err) => console.error("Latest model error:", err));
+  }, []);
+
+  useEffect(() => {
+    const fetchWeightStats = async () => {
+      try {
+        const response = await axios.get(`${BACKEND_URL}/api/weight-stats`, { timeout: 120000 });
+        setWeightStats(response.data);
+      } catch (err) {
+        console.error("Weight statistics error:", err);
+        setError(err.response?.data?.error || err.message || "Failed to load weight statistics");
+      } finally {
+        setLoading(false);
+      }
+    };
+
+    fetchWeightStats();
+  }, []);
+
   return (
     <div className="p-4 text-center">
       <h2 className="text-2xl font-bold">Model Visualization</h2>
-      <p className="mt-2 text-gray-600">Interactive visualizations of the model will be displayed here.</p>
+
+      {loading && <p className="mt-2 text-gray-600">Computing weight statistics...</p>}
+      {error && <div className="error">Error: {error}</div>}
+
+      {modelId && selectedTensor && (
+        <div className="layer-details card">
+          <h3>Weight Heatmap</h3>
+          <TensorTileView modelId={modelId} tensorPath={selectedTensor} />
+        </div>
+      )}
+
+      {weightStats && (
+        <div className="layer-details card">
+          <h3>Weight Statistics: {weightStats.model_name}</h3>
+          <p className="text-secondary">
+            {weightStats.total_tensors} tensors, mean {formatNumber(weightStats.stats.mean)},
+            std {formatNumber(weightStats.stats.std)}, sparsity {formatNumber(weightStats.stats.sparsity * 100, 3)}%
+          </p>
+          <p className="text-secondary">Select a tensor to browse it as a zoomable heatmap.</p>
+          <table>
+            <thead>
+              <tr>
+                <th>Tensor</th>
+                <th>Shape</th>
+                <th>Min</th>
+                <th>Max</th>
+                <th>Mean</th>
+                <th>Std</th>
+                <th>L2 Norm</th>
+                <th>Sparsity</th>
+                <th>NaN / Inf</th>
+                <th>Histogram</th>
+              </tr>
+            </thead>
+            <tbody>
+              {weightStats.layers.flatMap((layer) =>
+                layer.tensors.map((tensor) => (
+                  <tr
+                    key={tensor.path}
+                    onClick={() => setSelectedTensor(tensor.path)}
+                    style={{ cursor: "pointer", fontWeight: tensor.path === selectedTensor ? "bold" : undefined }}
+                  >
+                    <td>{`${layer.name}/${tensor.name}`}</td>
+                    <td>{tensor.shape.join(" x ")}</td>
+                    <td>{formatNumber(tensor.stats.min)}</td>
+                    <td>{formatNumber(tensor.stats.max)}</td>
+                    <td>{formatNumber(tensor.stats.mean)}</td>
+                    <td>{formatNumber(tensor.stats.std)}</td>
+                    <td>{formatNumber(tensor.stats.l2_norm)}</td>
+                    <td>{`${formatNumber(tensor.stats.sparsity * 100, 3)}%`}</td>
+                    <td>{`${tensor.stats.nan_count} / ${tensor.stats.inf_count}`}</td>
+                    <td><Histogram counts={tensor.histogram.counts} /></td>
+                  </tr>
+                ))
+              )}
+            </tbody>
+          </table>
+        </div>
+      )}
     </div>
   );
 };